@@ -4,136 +4,38 @@ AI 面试应用 - FastAPI 后端
 """
 
 import asyncio
-import base64
+import functools
 import json
 import logging
-import queue
-import re
 import sys
+import threading
+import time
 import concurrent.futures
 from contextlib import asynccontextmanager
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
 from config import settings
 from services import ASRService, TTSService, InterviewService
-
-
-def clean_text_for_tts(text: str) -> str:
-    """
-    清理并优化文本以供 TTS 朗读
-    1. 移除 Markdown 语法符号和表情符号
-    2. 优化韵律，让语音更自然
-    """
-    if not text:
-        return ""
-    
-    # ===== 第一步：移除 Markdown 语法 =====
-    
-    # 移除代码块（整块移除）
-    text = re.sub(r'```[\s\S]*?```', '', text)
-    
-    # 移除行内代码，保留内容
-    text = re.sub(r'`([^`]+)`', r'\1', text)
-    
-    # 移除标题符号，保留文字
-    text = re.sub(r'^#{1,6}\s*', '', text, flags=re.MULTILINE)
-    
-    # 移除粗体符号，保留文字
-    text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)
-    text = re.sub(r'__(.+?)__', r'\1', text)
-    
-    # 移除斜体符号，保留文字
-    text = re.sub(r'\*(.+?)\*', r'\1', text)
-    text = re.sub(r'_(.+?)_', r'\1', text)
-    
-    # 移除链接，保留文字
-    text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)
-    
-    # 移除图片
-    text = re.sub(r'!\[([^\]]*)\]\([^)]+\)', '', text)
-    
-    # 移除引用符号
-    text = re.sub(r'^>\s*', '', text, flags=re.MULTILINE)
-    
-    # 移除无序列表符号
-    text = re.sub(r'^[\*\-\+]\s+', '', text, flags=re.MULTILINE)
-    
-    # 移除有序列表符号
-    text = re.sub(r'^\d+\.\s+', '', text, flags=re.MULTILINE)
-    
-    # 移除分隔线
-    text = re.sub(r'^[-*_]{3,}\s*$', '', text, flags=re.MULTILINE)
-    
-    # ===== 第二步：移除表情和特殊符号 =====
-    
-    emoji_pattern = re.compile(
-        "["
-        "\U0001F600-\U0001F64F"
-        "\U0001F300-\U0001F5FF"
-        "\U0001F680-\U0001F6FF"
-        "\U0001F1E0-\U0001F1FF"
-        "\U0001F900-\U0001F9FF"
-        "\U0001FA00-\U0001FAFF"
-        "\U00002702-\U000027B0"
-        "\U0001F004-\U0001F0CF"
-        "]+"
-    )
-    text = emoji_pattern.sub('', text)
-    
-    # 移除特殊装饰符号
-    text = re.sub(r'[◆◇●○■□▲△▼▽★☆♠♣♥♦→←↑↓↔↕【】「」『』〖〗]', '', text)
-    
-    # ===== 第三步：韵律优化 =====
-    
-    # 将英文句号转为中文句号（更自然的停顿）
-    text = re.sub(r'\.(\s|$)', '。', text)
-    
-    # 将英文逗号转为中文逗号
-    text = re.sub(r',(\s|$)', '，', text)
-    
-    # 将英文问号转为中文问号
-    text = re.sub(r'\?(\s|$)', '？', text)
-    
-    # 将英文感叹号转为中文感叹号
-    text = re.sub(r'!(\s|$)', '！', text)
-    
-    # 将冒号后添加短暂停顿（用逗号代替）
-    text = re.sub(r'：\s*', '，', text)
-    text = re.sub(r':\s*', '，', text)
-    
-    # 括号内容转为逗号分隔（让TTS能读出来）
-    text = re.sub(r'[（(]([^）)]+)[）)]', r'，\1，', text)
-    
-    # 处理破折号，转为逗号
-    text = re.sub(r'——', '，', text)
-    text = re.sub(r'--', '，', text)
-    
-    # 处理省略号，保留但限制长度
-    text = re.sub(r'\.{3,}', '...', text)
-    text = re.sub(r'。{2,}', '。', text)
-    
-    # 连续标点简化
-    text = re.sub(r'[，,]{2,}', '，', text)
-    text = re.sub(r'[。.]{2,}', '。', text)
-    
-    # ===== 第四步：清理空白 =====
-    
-    # 换行转为逗号（让段落连贯）
-    text = re.sub(r'\n+', '，', text)
-    
-    # 清理多余空格
-    text = re.sub(r' {2,}', ' ', text)
-    text = re.sub(r'\s*([，。！？])\s*', r'\1', text)
-    
-    # 开头不要标点
-    text = re.sub(r'^[，。！？、]+', '', text)
-    
-    text = text.strip()
-    
-    return text
+from services.interview_service import EvaluationResult, InterviewAction
+from services.asr_service import asr_pool
+from services.audio_cache import audio_cache
+from services.filler_audio import filler_library
+from services.latency import decision_latency, evaluation_latency
+from services.async_queue import AsyncBridgeQueue
+from services.metrics import metrics
+from services.text_segmenter import SentenceSegmenter
+from services.tts_service import tts_pool
+from services.ws_protocol import AudioChannel, select_subprotocol
+from services.audio_output import PcmRingBuffer, frame_bytes_for
+from services.audio_input import AudioInputBatcher
+from services.backpressure import SessionBackpressure, partial_transcript_key
+from services.turn_dispatcher import TurnDispatcher
+from services.session_scope import SessionScope
+from services.session_reaper import SessionReaper
+from services.tts_text import StreamingMarkdownCleaner, clean_fragment_for_tts, clean_text_for_tts
 
 
 # 配置日志
@@ -144,39 +46,82 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 每轮 TTS 文本块数的直方图分桶
+TURN_CHUNK_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34)
+
 # 线程池执行器
 executor = concurrent.futures.ThreadPoolExecutor(max_workers=10)
+# 评估请求整段阻塞、耗时较长（超时后线程仍会占用到请求结束），使用单独的有界线程池，不挤占上行音频与 TTS 发送
+evaluation_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=settings.EVALUATION_CONCURRENCY,
+    thread_name_prefix="evaluation"
+)
+# 会话清理（关闭 ASR/TTS 连接）在后台专用线程池中排队执行，不阻塞事件循环
+session_reaper = SessionReaper()
 
 
 class InterviewSession:
     """面试会话管理"""
     
-    def __init__(self, websocket: WebSocket, session_id: str):
+    def __init__(self, websocket: WebSocket, session_id: str, audio_protocol: Optional[str] = None):
         self.websocket = websocket
         self.session_id = session_id
+        self.scope = SessionScope(session_id, executor)  # 本会话的任务与线程池调用，断开时一并取消
+        self.evaluation_executor = self.scope.bind(evaluation_executor)  # 评估在专用线程池中执行
+        self.audio_channel = AudioChannel(websocket, audio_protocol)  # 音频按握手结果走 Opus、二进制帧或 base64 JSON
+        # TTS 音频按 AUDIO_FRAME_MS 的整数倍分帧下发，按节奏发送时每帧一个 AUDIO_FRAME_MS；为 0 时有多少发多少
+        self._frame_quantum = frame_bytes_for(settings.AUDIO_FRAME_MS) if settings.AUDIO_FRAME_MS > 0 else 0
+        self._max_frame_bytes = frame_bytes_for(
+            settings.AUDIO_FRAME_MS if settings.AUDIO_PACING_ENABLED and self._frame_quantum else settings.AUDIO_MAX_FRAME_MS
+        )
         
-        # 创建队列
-        self.event_queue = queue.Queue()  # ASR/TTS 事件队列
-        self.audio_queue = queue.Queue()  # TTS 音频数据队列
-        self.llm_queue = queue.Queue()    # LLM 输出队列
+        # 创建队列（回调线程写入，事件循环中等待读取）
+        self.event_queue = AsyncBridgeQueue(        # ASR/TTS 事件队列，积压时只保留最新的识别中间结果
+            "event", coalesce=partial_transcript_key
+        )
+        self.audio_queue = PcmRingBuffer(           # TTS 音频环形缓冲区（固定大小）
+            "audio_ring", frame_bytes_for(settings.AUDIO_RING_MS), self._max_frame_bytes
+        )
+        self.llm_queue = AsyncBridgeQueue("llm")      # LLM 输出队列
+        self.backpressure = SessionBackpressure(self.audio_queue, self.event_queue)  # 客户端收不动时暂停 TTS、超时断开
+        self.turns = TurnDispatcher(session_id)     # 按顺序处理轮次，接收循环不等待
         
         # 初始化服务
         self.asr_service = ASRService(self.event_queue)
         self.interview_service = InterviewService()
-        self.tts_service = TTSService(self.audio_queue, self.event_queue)
+        self.tts_service = TTSService(self.audio_queue, self.event_queue, cancel_token=self.scope.cancelled)
+        # 上行音频攒批后由发送任务送入 ASR，接收循环不等待 SDK 调用
+        self.audio_input = AudioInputBatcher(
+            self.asr_service.send_audio,
+            self.scope,
+            frame_bytes_for(settings.ASR_BATCH_MS, settings.ASR_SAMPLE_RATE),
+            settings.ASR_BATCH_MS
+        )
         
         self.is_active = True
-        self._recognized_text = ""
         self._interview_started = False
+        self._pending_evaluation: Optional[asyncio.Task] = None  # 后台进行中的延迟评估
+        
+        # 插话打断状态
+        self._active_streams: List[Tuple[threading.Event, AsyncBridgeQueue]] = []  # 本轮进行中的 LLM 输出
+        self._generating = False      # 是否正在生成本轮回复
+        self._interrupted = False     # 本轮回复是否已被打断
+        self._playback_until = 0.0    # 估算的客户端播放结束时间（monotonic）
+        self._turn_started_at: Optional[float] = None  # 本轮开始处理的时间，收到首个音频后清空
+        self._turn_chunks = 0         # 本轮送入 TTS 的文本块数
+        
+        # 应答垫音状态
+        self._audio_end_at: Optional[float] = None  # 本轮语音输入结束的时间，收到回复首个音频后清空
+        self._filler_bytes = 0        # 已送入音频队列、尚未发出的应答音频字节数
+        self._filler_heard = False    # 本轮是否已发出应答音频
+        self._turn_filler = ""        # 本轮播放的应答语，处理回答时并入面试官发言
         
     async def initialize(self) -> bool:
         """初始化所有服务"""
         try:
-            loop = asyncio.get_event_loop()
-            
             # 并行初始化 ASR 和 TTS
-            asr_future = loop.run_in_executor(executor, self.asr_service.create_session)
-            tts_future = loop.run_in_executor(executor, self.tts_service.create_session)
+            asr_future = self.scope.run_in_executor(self.asr_service.create_session)
+            tts_future = self.scope.run_in_executor(self.tts_service.create_session)
             
             asr_success, tts_success = await asyncio.gather(asr_future, tts_future)
             
@@ -207,55 +152,191 @@ class InterviewSession:
         """发送音频数据到客户端"""
         try:
             if self.is_active:
-                audio_b64 = base64.b64encode(audio_data).decode('ascii')
-                await self.websocket.send_json({
-                    "type": "audio.delta",
-                    "data": audio_b64
-                })
+                await self.audio_channel.send(audio_data)
+                is_filler = self._filler_bytes > 0
+                if is_filler:
+                    self._filler_bytes = max(0, self._filler_bytes - len(audio_data))
+                self._record_perceived_latency(is_filler)
+                if self._turn_started_at is not None and not is_filler:
+                    # 本轮首个音频：记录首音延迟
+                    first_audio_ms = (time.perf_counter() - self._turn_started_at) * 1000
+                    self._turn_started_at = None
+                    metrics.observe("turn.first_audio_ms", first_audio_ms)
+                    logger.info(f"Session {self.session_id}: First audio after {first_audio_ms:.0f} ms")
+                # 16bit 单声道 PCM，按时长累加估算播放结束时间
+                now = time.monotonic()
+                self._playback_until = max(self._playback_until, now) + len(audio_data) / (settings.TTS_SAMPLE_RATE * 2)
         except Exception as e:
             logger.error(f"Session {self.session_id}: Failed to send audio - {e}")
             
+    def _record_perceived_latency(self, is_filler: bool):
+        """
+        记录候选人说完到听到声音的耗时
+        
+        - turn.perceived_latency_ms.with_filler：播放了应答的轮次，到应答首个音频
+        - turn.perceived_latency_ms.without_filler：未播放应答的轮次，到回复首个音频
+        - turn.response_latency_ms：所有轮次到回复首个音频（即没有应答时的等待）
+        """
+        if self._audio_end_at is None:
+            return
+        elapsed_ms = (time.perf_counter() - self._audio_end_at) * 1000
+        if is_filler:
+            if not self._filler_heard:
+                self._filler_heard = True
+                metrics.observe("turn.perceived_latency_ms.with_filler", elapsed_ms)
+            return
+        metrics.observe("turn.response_latency_ms", elapsed_ms)
+        if not self._filler_heard:
+            metrics.observe("turn.perceived_latency_ms.without_filler", elapsed_ms)
+        self._audio_end_at = None
+        
     async def process_event_queue(self):
         """处理事件队列（ASR/TTS 事件）"""
         while self.is_active:
             try:
-                try:
-                    event = self.event_queue.get_nowait()
-                    
-                    if event['type'] == 'transcription.final':
-                        self._recognized_text = event.get('text', '')
-                        
-                    await self.send_message(event)
-                    
-                except queue.Empty:
-                    pass
+                event = await self.event_queue.get()
+                
+                if event['type'] == 'speech.started' and settings.BARGE_IN_ENABLED and self._is_responding():
+                    await self._interrupt_response()
                     
-                await asyncio.sleep(0.005)
+                await self.send_message(event)
                 
             except Exception as e:
                 logger.error(f"Session {self.session_id}: Event queue error - {e}")
                 await asyncio.sleep(0.1)
                 
+    def _is_responding(self) -> bool:
+        """是否仍在生成、合成或播放回复"""
+        return (
+            self._generating
+            or not self.audio_queue.empty()
+            or self._playback_until > time.monotonic()
+            or (self.tts_service.callback is not None and not self.tts_service.callback.idle)
+        )
+        
+    def _register_stream(self, output_queue: AsyncBridgeQueue) -> threading.Event:
+        """登记本轮的一路 LLM 输出，返回其取消信号，插话时统一取消"""
+        cancel_event = self.scope.new_token()
+        self._active_streams.append((cancel_event, output_queue))
+        return cancel_event
+        
+    async def _interrupt_response(self):
+        """
+        候选人插话：停止 LLM 生成与 TTS 合成，丢弃缓冲的音频，通知客户端停止播放
+        """
+        self._interrupted = True
+        streams, self._active_streams = self._active_streams, []
+        for cancel_event, output_queue in streams:
+            cancel_event.set()
+            output_queue.put_nowait({'type': 'cancelled'})
+            
+        # 先让回调开始丢弃旧音频，再清空已投递到队列的部分
+        await self.scope.run_in_executor(self.tts_service.cancel)
+        dropped = self.audio_queue.clear()
+        self._playback_until = 0.0
+        self._turn_started_at = None
+        await self.audio_channel.next_stream(discard=True)
+        self._audio_end_at = None
+        self._filler_bytes = 0
+        # 被打断的应答语不再并入面试官发言
+        self._turn_filler = ""
+        self.interview_service.state.pending_filler = ""
+        
+        metrics.incr("bargein.count")
+        metrics.incr("bargein.dropped_audio_bytes", dropped)
+        logger.info(f"Session {self.session_id}: Response interrupted by candidate, dropped {dropped} bytes of audio")
+        await self.send_message({"type": "response.interrupted"})
+        
+    async def disconnect_slow_client(self):
+        """
+        客户端长时间收不动：停止本轮回复、丢弃积压，主动断开连接（1013，客户端可稍后重连）
+        """
+        logger.warning(
+            f"Session {self.session_id}: Client stalled for {settings.SLOW_CLIENT_TIMEOUT:.0f}s, disconnecting "
+            f"({self.backpressure.stats()})"
+        )
+        self.is_active = False
+        self._interrupted = True
+        streams, self._active_streams = self._active_streams, []
+        for cancel_event, output_queue in streams:
+            cancel_event.set()
+            output_queue.put_nowait({'type': 'cancelled'})
+        await self.scope.run_in_executor(self.tts_service.cancel)
+        self.audio_queue.clear()
+        self.event_queue.clear()
+        try:
+            await self.websocket.close(code=1013)
+        except Exception as e:
+            logger.debug(f"Session {self.session_id}: Close after stall failed - {e}")
+            
     async def process_audio_queue(self):
-        """处理音频队列，实时发送音频到客户端"""
+        """
+        处理音频缓冲区，实时发送音频到客户端
+        
+        按 AUDIO_FRAME_MS 的整数倍从环形缓冲区取出连续切片发送；不足 AUDIO_FRAME_MS 的尾部在
+        音频暂停一个 AUDIO_FRAME_MS 后发出，客户端已无音频可播时立即发出，不增加首音延迟
+        """
+        ring = self.audio_queue
         while self.is_active:
             try:
-                try:
-                    audio_data = self.audio_queue.get_nowait()
-                    await self.send_audio(audio_data)
-                except queue.Empty:
-                    pass
-                    
-                await asyncio.sleep(0.005)
+                align = 2
+                if self._frame_quantum and self._playback_until > time.monotonic():
+                    align = self._frame_quantum
+                if ring.readable < align:
+                    if not await ring.wait_readable(align, self._audio_flush_timeout()):
+                        await self._flush_audio()
+                    continue
+                await self._send_ring_frame(align)
                 
             except Exception as e:
                 logger.error(f"Session {self.session_id}: Audio queue error - {e}")
                 await asyncio.sleep(0.1)
                 
-    async def handle_audio_input(self, audio_data: bytes):
-        """处理音频输入"""
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(executor, self.asr_service.send_audio, audio_data)
+    def _audio_flush_timeout(self) -> Optional[float]:
+        """有未发出的尾部时等待新音频的超时（秒），没有时返回 None"""
+        if not self.audio_queue.empty():
+            return settings.AUDIO_FRAME_MS / 1000
+        if self.audio_channel.pending:
+            # Opus 编码器里还有不足一帧的尾部
+            return settings.OPUS_FLUSH_MS / 1000
+        return None
+        
+    async def _flush_audio(self):
+        """音频暂停：发出缓冲区与编码器中的尾部"""
+        if not self.audio_queue.empty():
+            await self._send_ring_frame(2)
+        await self.audio_channel.flush()
+        
+    async def _send_ring_frame(self, align: int):
+        """
+        从环形缓冲区取一帧发送，发送完成后再释放
+        
+        启用 AUDIO_PACING_ENABLED 时按实时节奏发送：客户端缓冲超过 AUDIO_PACING_LEAD_MS 就等待，
+        等待期间被打断的帧直接丢弃
+        """
+        ring = self.audio_queue
+        generation = ring.generation
+        frame = ring.peek(self._max_frame_bytes, align)
+        if frame is None:
+            return
+        if settings.AUDIO_PACING_ENABLED:
+            delay = self._playback_until - settings.AUDIO_PACING_LEAD_MS / 1000 - time.monotonic()
+            if delay > 0:
+                metrics.observe("audio_out.pacing_wait_ms", delay * 1000)
+                await asyncio.sleep(delay)
+        if generation != ring.generation:
+            metrics.incr("audio_out.stale_frames")
+            return
+        metrics.incr("audio_out.frames")
+        if self._frame_quantum and len(frame) % self._frame_quantum:
+            metrics.incr("audio_out.partial_frames")
+        await self.send_audio(frame)
+        if generation == ring.generation:
+            ring.consume(len(frame))
+            
+    def handle_audio_input(self, audio_data: bytes):
+        """处理音频输入（写入攒批缓冲区，由发送任务送入 ASR）"""
+        self.audio_input.feed(audio_data)
         
     async def start_interview(self, topic: str, job_position: str = "", resume_summary: str = ""):
         """开始面试"""
@@ -290,16 +371,9 @@ class InterviewSession:
                 "text": opening_question
             })
             
-            # TTS 合成开场问题
-            loop = asyncio.get_event_loop()
-            clean_text = clean_text_for_tts(opening_question)
-            if clean_text.strip():
-                await loop.run_in_executor(
-                    executor,
-                    self.tts_service.synthesize_text_nowait,
-                    clean_text
-                )
-                
+            # TTS 合成开场问题（开场问题只取决于主题，优先使用缓存）
+            await self._speak_cached(opening_question)
+            
             logger.info(f"Session {self.session_id}: Interview started - {topic}")
             
         except Exception as e:
@@ -321,48 +395,54 @@ class InterviewSession:
                 })
                 return
                 
-            await self.send_message({"type": "response.started"})
-            
-            loop = asyncio.get_event_loop()
+            # 上一轮的延迟评估先完成，保证评分按轮次更新
+            await self._wait_pending_evaluation()
             
-            # 清空队列
-            while not self.llm_queue.empty():
-                try:
-                    self.llm_queue.get_nowait()
-                except queue.Empty:
-                    break
-            
-            # 处理候选人回答并获取决策
-            action, evaluation = self.interview_service.process_candidate_response(text)
+            self._active_streams = []
+            self._interrupted = False
+            self._generating = True
+            self._turn_started_at = time.perf_counter()
+            self._turn_chunks = 0
+            await self.audio_channel.next_stream()
+            await self.send_message({"type": "response.started"})
             
-            # 发送评估信息
-            if evaluation:
+            # 已播放的应答语并入本轮面试官发言，字幕与对话历史保持一致
+            filler, self._turn_filler = self._turn_filler, ""
+            self.interview_service.state.pending_filler = filler
+            if filler:
                 await self.send_message({
-                    "type": "evaluation.update",
-                    "score": evaluation.current_score,
-                    "assessment": evaluation.assessment,
-                    "followup_count": self.interview_service.state.followup_count,
-                    "max_followup": settings.MAX_FOLLOWUP_QUESTIONS
+                    "type": "response.delta",
+                    "text": filler
                 })
+                
+            # 清空队列
+            self.llm_queue.clear()
             
-            if action == "followup":
-                # 继续追问
-                await self._generate_and_speak_response(
-                    self.interview_service.generate_followup_stream
-                )
-            elif action == "pass":
-                # 面试通过
-                await self._generate_and_speak_conclusion("PASS", evaluation.assessment if evaluation else "")
-            elif action == "fail":
-                # 面试不通过
-                await self._generate_and_speak_conclusion("FAIL", evaluation.assessment if evaluation else "")
-            else:
-                await self.send_message({
-                    "type": "error",
-                    "source": "interview",
-                    "message": "面试状态异常"
-                })
+            mode = self._turn_mode()
+            if mode == "combined":
+                # 单次请求完成评估与回复
+                await self._process_combined(text)
+                return
+                
+            if mode == "deferred":
+                # 未达到最少追问次数，决策必然是继续追问，评估移到后台
+                await self._process_deferred(text)
+                return
+                
+            if mode == "speculative":
+                # 本轮之后仍可能继续追问，评估与追问并行生成
+                await self._process_speculative(text)
+                return
                 
+            # 处理候选人回答并获取决策（评估在线程池中执行，不阻塞事件循环）
+            action, evaluation = await self.interview_service.process_candidate_response_async(
+                text,
+                executor=self.evaluation_executor,
+                timeout=settings.EVALUATION_TIMEOUT
+            )
+            
+            await self._dispatch_action(action, evaluation)
+            
         except Exception as e:
             logger.error(f"Session {self.session_id}: Error processing response - {e}")
             await self.send_message({
@@ -370,195 +450,501 @@ class InterviewSession:
                 "source": "processing",
                 "message": str(e)
             })
+        finally:
+            self._generating = False
+            self._record_turn_chunks()
+            self._active_streams = []
             
-    async def _generate_and_speak_response(self, generator_func):
-        """生成并朗读回复"""
-        loop = asyncio.get_event_loop()
+    def _turn_mode(self) -> str:
+        """本轮回答的处理方式：combined | deferred | speculative | sequential"""
+        state = self.interview_service.state
+        if settings.COMBINED_EVALUATION:
+            return "combined"
+        if settings.DEFER_EARLY_EVALUATION and state.followup_count + 1 < settings.MIN_FOLLOWUP_QUESTIONS:
+            return "deferred"
+        if settings.SPECULATIVE_FOLLOWUP and state.followup_count + 1 < settings.MAX_FOLLOWUP_QUESTIONS:
+            return "speculative"
+        return "sequential"
         
-        # 在线程池中启动 LLM 生成
-        llm_future = loop.run_in_executor(
-            executor,
-            generator_func,
-            self.llm_queue
+    def _expected_wait_ms(self) -> float:
+        """预计候选人说完后、回复开始生成前需要等待评估的时长"""
+        mode = self._turn_mode()
+        if mode == "deferred":
+            # 评估在后台进行，追问立即开始生成
+            return 0.0
+        if mode == "combined":
+            return decision_latency.value
+        return evaluation_latency.value
+        
+    async def _process_combined(self, text: str):
+        """
+        合并模式：一次 LLM 请求同时给出决策与话术
+        
+        决策字段一解析出来就确认下一步动作，模型决策与规则一致时直接播放后续话术；
+        规则修正了决策（如未达到最少追问次数）或无法解析时退回到分开请求
+        """
+        if not self.interview_service.record_candidate_response(text):
+            await self._dispatch_action("error", None)
+            return
+            
+        turn_start = time.perf_counter()
+        
+        combined_queue = AsyncBridgeQueue("combined")
+        cancel_event = self._register_stream(combined_queue)
+        llm_future = self.scope.run_in_executor(
+            functools.partial(
+                self.interview_service.generate_combined_stream,
+                combined_queue,
+                cancel_event=cancel_event
+            )
+        )
+        
+        # 等待决策字段
+        decision = None
+        while decision is None:
+            item = await combined_queue.get()
+            if item['type'] == 'decision':
+                decision = item
+            elif item['type'] in ('done', 'error', 'cancelled'):
+                break
+                
+        if self._interrupted:
+            return
+            
+        if decision is None:
+            # 未能解析出决策，退回到评估 + 追问两次请求
+            logger.warning(f"Session {self.session_id}: Combined output has no decision, fallback")
+            metrics.incr("combined.fallbacks")
+            action, evaluation = await self._evaluate_and_decide()
+            await self._dispatch_action(action, evaluation)
+            return
+            
+        decision_ms = (time.perf_counter() - turn_start) * 1000
+        metrics.observe("combined.decision_ms", decision_ms)
+        decision_latency.update(decision_ms)
+        evaluation = EvaluationResult(
+            action=InterviewAction(decision['action']),
+            current_score=decision['current_score'],
+            assessment=""
+        )
+        action = self.interview_service.decide_next_action(evaluation)
+        
+        expected_action = {
+            "followup": InterviewAction.CONTINUE,
+            "pass": InterviewAction.PASS,
+            "fail": InterviewAction.FAIL
+        }.get(action)
+        if expected_action != evaluation.action:
+            # 决策被规则修正，模型的话术不适用
+            metrics.incr("combined.overridden")
+            if action == "followup":
+                cancel_event.set()
+            else:
+                # 结束面试需要评估说明，它在话术之后输出：话术不播放，等输出结束取 assessment
+                stats = await llm_future
+                if self._interrupted:
+                    return
+                evaluation.assessment = await self._combined_assessment(stats)
+                self.interview_service.state.final_assessment = evaluation.assessment
+            await self._dispatch_action(action, evaluation)
+            return
+            
+        full_response = await self._speak_llm_output(combined_queue)
+        stats = await llm_future
+        
+        if action != "followup":
+            evaluation.assessment = await self._combined_assessment(stats)
+            self.interview_service.state.final_assessment = evaluation.assessment
+        else:
+            evaluation.assessment = str(stats.fields.get("assessment", ""))
+        if not stats.error:
+            self.interview_service.append_assistant_message(full_response)
+            
+        await self._send_evaluation(evaluation)
+        await self.send_message({
+            "type": "response.done",
+            "text": full_response
+        })
+        if action != "followup":
+            await self._send_interview_finished()
+            
+        logger.info(
+            f"Session {self.session_id}: Combined turn - action={action}, "
+            f"input={stats.input_tokens}, output={stats.output_tokens} tokens"
+        )
+        
+    async def _combined_assessment(self, stats) -> str:
+        """合并输出中的评估说明；输出被截断或缺少该字段时退回到单独评估（只取评估说明）"""
+        assessment = str(stats.fields.get("assessment", "")).strip()
+        if assessment:
+            return assessment
+        metrics.incr("combined.assessment_fallbacks")
+        evaluation = await self.interview_service.evaluate_response_async(
+            executor=self.evaluation_executor,
+            timeout=settings.EVALUATION_TIMEOUT
+        )
+        return evaluation.assessment
+        
+    async def _evaluate_and_decide(self):
+        """评估已记录的回答并给出决策"""
+        evaluation = await self.interview_service.evaluate_response_async(
+            executor=self.evaluation_executor,
+            timeout=settings.EVALUATION_TIMEOUT
+        )
+        return self.interview_service.decide_next_action(evaluation), evaluation
+        
+    async def _process_deferred(self, text: str):
+        """
+        延迟评估：先开始生成追问，评分在后台计算，完成后推送 evaluation.update
+        """
+        if not self.interview_service.record_candidate_response(text):
+            await self._dispatch_action("error", None)
+            return
+            
+        # 追问生成结束时会写入对话历史，评估使用当前快照
+        state = self.interview_service.state
+        self._pending_evaluation = self.scope.spawn(
+            self._run_deferred_evaluation(list(state.conversation_history), state.followup_count)
         )
         
-        # 流水线处理
-        buffer = ""
+        await self._generate_and_speak_response(
+            self.interview_service.generate_followup_stream
+        )
+        
+    async def _run_deferred_evaluation(self, history: list, followup_count: int):
+        """后台评估并推送评分"""
+        try:
+            evaluation = await self.interview_service.evaluate_response_async(
+                executor=self.evaluation_executor,
+                timeout=settings.EVALUATION_TIMEOUT,
+                history=history,
+                followup_count=followup_count
+            )
+            self.interview_service.record_evaluation(evaluation, followup_count)
+            await self._send_evaluation(evaluation, followup_count)
+        except Exception as e:
+            logger.error(f"Session {self.session_id}: Deferred evaluation error - {e}")
+            
+    async def _wait_pending_evaluation(self):
+        """等待后台的延迟评估完成"""
+        task, self._pending_evaluation = self._pending_evaluation, None
+        if task is not None and not task.cancelled():
+            await task
+            
+    async def _process_speculative(self, text: str):
+        """
+        推测式处理：评估与追问同时发起
+        
+        追问文本先缓存在独立队列中，评估结果为继续追问时直接播放缓存的追问，
+        否则丢弃追问、改为生成结束语
+        """
+        if not self.interview_service.record_candidate_response(text):
+            await self._dispatch_action("error", None)
+            return
+            
+        turn_start = time.perf_counter()
+        
+        speculative_queue = AsyncBridgeQueue("speculative")
+        cancel_event = self._register_stream(speculative_queue)
+        followup_future = self.scope.run_in_executor(
+            functools.partial(
+                self.interview_service.generate_followup_stream,
+                speculative_queue,
+                cancel_event=cancel_event,
+                record_history=False
+            )
+        )
+        
+        action, evaluation = await self._evaluate_and_decide()
+        eval_ms = (time.perf_counter() - turn_start) * 1000
+        
+        await self._send_evaluation(evaluation)
+        
+        if action == "followup":
+            # 采用预生成的追问
+            full_response = await self._speak_llm_output(speculative_queue)
+            stats = await followup_future
+            if not stats.error:
+                self.interview_service.append_assistant_message(stats.content)
+                
+            await self.send_message({
+                "type": "response.done",
+                "text": full_response
+            })
+            
+            # 串行时首字需等待 评估 + 追问首字，并行后只需两者中较长的一个
+            saved_ms = min(eval_ms, stats.first_token_ms or 0.0)
+            metrics.incr("speculative.kept")
+            metrics.observe("speculative.saved_ms", saved_ms)
+            logger.info(
+                f"Session {self.session_id}: Speculative followup kept - "
+                f"eval={eval_ms:.0f}ms, first_token={stats.first_token_ms or 0:.0f}ms, saved={saved_ms:.0f}ms"
+            )
+        else:
+            # 丢弃预生成的追问，后台统计浪费的 token
+            cancel_event.set()
+            followup_future.add_done_callback(self._record_wasted_speculation)
+            metrics.incr("speculative.discarded")
+            await self._dispatch_action(action, evaluation, evaluation_sent=True)
+            
+    def _record_wasted_speculation(self, future: asyncio.Future):
+        """记录被丢弃的预生成追问所消耗的 token"""
+        if future.cancelled() or future.exception():
+            return
+        stats = future.result()
+        metrics.incr("speculative.wasted_input_tokens", stats.input_tokens)
+        metrics.incr("speculative.wasted_output_tokens", stats.output_tokens)
+        logger.info(
+            f"Session {self.session_id}: Speculative followup discarded - "
+            f"wasted input={stats.input_tokens}, output={stats.output_tokens} tokens"
+        )
+        
+    async def _send_evaluation(self, evaluation, followup_count: Optional[int] = None):
+        """发送评估信息"""
+        if evaluation:
+            if followup_count is None:
+                followup_count = self.interview_service.state.followup_count
+            await self.send_message({
+                "type": "evaluation.update",
+                "score": evaluation.current_score,
+                "assessment": evaluation.assessment,
+                "followup_count": followup_count,
+                "max_followup": settings.MAX_FOLLOWUP_QUESTIONS
+            })
+            
+    async def _dispatch_action(self, action: str, evaluation, evaluation_sent: bool = False):
+        """根据决策继续追问或结束面试"""
+        if not evaluation_sent:
+            await self._send_evaluation(evaluation)
+            
+        if action == "followup":
+            # 继续追问
+            await self._generate_and_speak_response(
+                self.interview_service.generate_followup_stream
+            )
+        elif action == "pass":
+            # 面试通过
+            await self._generate_and_speak_conclusion("PASS", evaluation.assessment if evaluation else "")
+        elif action == "fail":
+            # 面试不通过
+            await self._generate_and_speak_conclusion("FAIL", evaluation.assessment if evaluation else "")
+        else:
+            await self.send_message({
+                "type": "error",
+                "source": "interview",
+                "message": "面试状态异常"
+            })
+            
+    def _record_turn_chunks(self):
+        """记录本轮送入 TTS 的文本块数"""
+        if self._turn_chunks:
+            metrics.observe("turn.tts_chunks", self._turn_chunks, buckets=TURN_CHUNK_BUCKETS)
+            logger.info(f"Session {self.session_id}: Turn sent {self._turn_chunks} chunks to TTS")
+            
+    def _new_segmenter(self) -> SentenceSegmenter:
+        """按配置创建分句器"""
+        return SentenceSegmenter(
+            delimiters=settings.TTS_SENTENCE_DELIMITERS,
+            clause_delimiters=settings.TTS_CLAUSE_DELIMITERS,
+            min_clause_chars=settings.TTS_CLAUSE_MIN_CHARS,
+            max_latency_ms=settings.TTS_MAX_LATENCY_MS,
+            first_chunk_chars=settings.TTS_FIRST_CHUNK_CHARS,
+            first_chunk_ms=settings.TTS_FIRST_CHUNK_MS,
+            chunk_growth=settings.TTS_CHUNK_GROWTH,
+            max_chunk_chars=settings.TTS_MAX_CHUNK_CHARS
+        )
+        
+    async def _speak_sentence(self, sentence: str):
+        """清理文本后送入 TTS"""
+        if not sentence.strip() or self._interrupted:
+            return
+        clean_sentence = clean_text_for_tts(sentence)
+        if clean_sentence.strip():
+            await self.backpressure.wait_for_room()
+            if self._interrupted:
+                return
+            self._turn_chunks += 1
+            await self.scope.run_in_executor(
+                self.tts_service.synthesize_text_nowait,
+                clean_sentence
+            )
+            
+    def _enqueue_pcm(self, pcm: bytes):
+        """把现成的 PCM 写入音频缓冲区，放不下的部分随发送进度陆续写入，插话时整体丢弃"""
+        ring = self.audio_queue
+        written = ring.put_some(pcm)
+        if written < len(pcm):
+            self.scope.spawn(ring.write_all(memoryview(pcm)[written:], ring.generation))
+            
+    async def _speak_cached(self, text: str):
+        """朗读固定话术：命中音频缓存时直接下发 PCM，未命中时合成并在完成后写入缓存"""
+        clean_text = clean_text_for_tts(text)
+        if not clean_text.strip():
+            return
+            
+        on_audio = None
+        if settings.AUDIO_CACHE_ENABLED:
+            key = audio_cache.key_for(clean_text)
+            pcm = await self.scope.run_in_executor(audio_cache.get, key)
+            if pcm is not None:
+                self._enqueue_pcm(pcm)
+                return
+            on_audio = functools.partial(audio_cache.put, key)
+            
+        await self.backpressure.wait_for_room()
+        await self.scope.run_in_executor(
+            self.tts_service.synthesize_text_nowait,
+            clean_text,
+            on_audio
+        )
+        
+    async def _speak_fragment(self, text: str):
+        """server_commit 模式：清理后的片段直接追加，由服务端分段合成"""
+        if self._interrupted:
+            return
+        fragment = clean_fragment_for_tts(text)
+        if fragment:
+            await self.backpressure.wait_for_room()
+            if self._interrupted:
+                return
+            self._turn_chunks += 1
+            await self.scope.run_in_executor(
+                self.tts_service.append_text_nowait,
+                fragment
+            )
+            
+    async def _speak_text(self, text: str, segmenter: SentenceSegmenter):
+        """按 TTS 模式送出已清理 Markdown 的文本：server_commit 直接追加，commit 分句提交"""
+        if self.tts_service.server_commit:
+            await self._speak_fragment(text)
+            return
+        for sentence in segmenter.feed(text):
+            await self._speak_sentence(sentence)
+            
+    async def _finish_speaking(self, segmenter: SentenceSegmenter, cleaner: StreamingMarkdownCleaner):
+        """送出剩余文本；server_commit 模式提交缓冲区，让服务端合成最后一段"""
+        await self._speak_text(cleaner.flush(), segmenter)
+        if self.tts_service.server_commit:
+            if not self._interrupted:
+                await self.scope.run_in_executor(self.tts_service.commit_pending)
+        else:
+            await self._speak_sentence(segmenter.flush())
+        if cleaner.dropped:
+            metrics.incr("tts.markup_chars_dropped", cleaner.dropped)
+            
+    async def _speak_llm_output(self, llm_queue: AsyncBridgeQueue) -> str:
+        """
+        流水线处理 LLM 输出：转发文本片段，分句送入 TTS
+        
+        Returns:
+            完整回复文本
+        """
+        segmenter = self._new_segmenter()
+        cleaner = StreamingMarkdownCleaner()
+        self.tts_service.begin_reply()
         full_response = []
-        sentence_delimiters = ["。", "！", "？", "；", ".", "!", "?", ";", "\n"]
         llm_done = False
         
         while not llm_done:
             try:
-                try:
-                    item = self.llm_queue.get_nowait()
-                    
-                    if item['type'] == 'text':
-                        content = item['content']
-                        full_response.append(content)
-                        buffer += content
+                timeout = segmenter.time_until_flush()
+                if timeout is None:
+                    item = await llm_queue.get()
+                else:
+                    try:
+                        item = await asyncio.wait_for(llm_queue.get(), timeout)
+                    except asyncio.TimeoutError:
+                        # 迟迟没有句末标点，先把已累计的文本送入 TTS
+                        for sentence in segmenter.poll():
+                            await self._speak_sentence(sentence)
+                        continue
                         
-                        await self.send_message({
-                            "type": "response.delta",
-                            "text": content
-                        })
-                        
-                    elif item['type'] == 'done':
-                        llm_done = True
-                        
-                    elif item['type'] == 'error':
-                        await self.send_message({
-                            "type": "error",
-                            "source": "llm",
-                            "message": item['content']
-                        })
-                        llm_done = True
-                        
-                except queue.Empty:
-                    await asyncio.sleep(0.01)
-                    continue
-                
-                # 分句发送给 TTS
-                while True:
-                    earliest_pos = -1
-                    for delimiter in sentence_delimiters:
-                        pos = buffer.find(delimiter)
-                        if pos != -1 and (earliest_pos == -1 or pos < earliest_pos):
-                            earliest_pos = pos
-                            
-                    if earliest_pos == -1:
-                        break
-                        
-                    sentence = buffer[:earliest_pos + 1]
-                    buffer = buffer[earliest_pos + 1:]
+                speak_text = ""
+                if item['type'] == 'text':
+                    content = item['content']
+                    full_response.append(content)
+                    # 先去掉 Markdown 结构再分句，跨句的代码块、粗体、括号也能处理
+                    speak_text = cleaner.feed(content)
                     
-                    if sentence.strip():
-                        clean_sentence = clean_text_for_tts(sentence)
-                        if clean_sentence.strip():
-                            await loop.run_in_executor(
-                                executor,
-                                self.tts_service.synthesize_text_nowait,
-                                clean_sentence
-                            )
-                        
+                    await self.send_message({
+                        "type": "response.delta",
+                        "text": content
+                    })
+                    
+                elif item['type'] == 'done':
+                    llm_done = True
+                    
+                elif item['type'] == 'cancelled':
+                    # 候选人插话，剩余文本不再合成
+                    break
+                    
+                elif item['type'] == 'error':
+                    await self.send_message({
+                        "type": "error",
+                        "source": "llm",
+                        "message": item['content']
+                    })
+                    llm_done = True
+                    
+                # 分句（server_commit 模式下直接）发送给 TTS
+                await self._speak_text(speak_text, segmenter)
+                
             except Exception as e:
                 logger.error(f"Pipeline error: {e}")
                 break
                 
         # 处理剩余文本
-        if buffer.strip():
-            clean_buffer = clean_text_for_tts(buffer)
-            if clean_buffer.strip():
-                await loop.run_in_executor(
-                    executor,
-                    self.tts_service.synthesize_text_nowait,
-                    clean_buffer
-                )
-            
+        await self._finish_speaking(segmenter, cleaner)
+        
+        return "".join(full_response)
+        
+    async def _generate_and_speak_response(self, generator_func):
+        """生成并朗读回复"""
+        
+        # 在线程池中启动 LLM 生成
+        cancel_event = self._register_stream(self.llm_queue)
+        llm_future = self.scope.run_in_executor(
+            functools.partial(generator_func, self.llm_queue, cancel_event=cancel_event)
+        )
+        
+        full_response = await self._speak_llm_output(self.llm_queue)
+        
         await llm_future
         
         await self.send_message({
             "type": "response.done",
-            "text": "".join(full_response)
+            "text": full_response
         })
         
     async def _generate_and_speak_conclusion(self, action: str, assessment: str):
         """生成并朗读结束语"""
-        loop = asyncio.get_event_loop()
         
         # 在线程池中启动结束语生成
-        llm_future = loop.run_in_executor(
-            executor,
-            self.interview_service.generate_conclusion_stream,
-            action,
-            assessment,
-            self.llm_queue
+        cancel_event = self._register_stream(self.llm_queue)
+        llm_future = self.scope.run_in_executor(
+            functools.partial(
+                self.interview_service.generate_conclusion_stream,
+                action,
+                assessment,
+                self.llm_queue,
+                cancel_event=cancel_event
+            )
         )
         
-        # 流水线处理
-        buffer = ""
-        full_response = []
-        sentence_delimiters = ["。", "！", "？", "；", ".", "!", "?", ";", "\n"]
-        llm_done = False
+        full_response = await self._speak_llm_output(self.llm_queue)
         
-        while not llm_done:
-            try:
-                try:
-                    item = self.llm_queue.get_nowait()
-                    
-                    if item['type'] == 'text':
-                        content = item['content']
-                        full_response.append(content)
-                        buffer += content
-                        
-                        await self.send_message({
-                            "type": "response.delta",
-                            "text": content
-                        })
-                        
-                    elif item['type'] == 'done':
-                        llm_done = True
-                        
-                    elif item['type'] == 'error':
-                        await self.send_message({
-                            "type": "error",
-                            "source": "llm",
-                            "message": item['content']
-                        })
-                        llm_done = True
-                        
-                except queue.Empty:
-                    await asyncio.sleep(0.01)
-                    continue
-                
-                # 分句发送给 TTS
-                while True:
-                    earliest_pos = -1
-                    for delimiter in sentence_delimiters:
-                        pos = buffer.find(delimiter)
-                        if pos != -1 and (earliest_pos == -1 or pos < earliest_pos):
-                            earliest_pos = pos
-                            
-                    if earliest_pos == -1:
-                        break
-                        
-                    sentence = buffer[:earliest_pos + 1]
-                    buffer = buffer[earliest_pos + 1:]
-                    
-                    if sentence.strip():
-                        clean_sentence = clean_text_for_tts(sentence)
-                        if clean_sentence.strip():
-                            await loop.run_in_executor(
-                                executor,
-                                self.tts_service.synthesize_text_nowait,
-                                clean_sentence
-                            )
-                        
-            except Exception as e:
-                logger.error(f"Pipeline error: {e}")
-                break
-                
-        # 处理剩余文本
-        if buffer.strip():
-            clean_buffer = clean_text_for_tts(buffer)
-            if clean_buffer.strip():
-                await loop.run_in_executor(
-                    executor,
-                    self.tts_service.synthesize_text_nowait,
-                    clean_buffer
-                )
-            
         await llm_future
         
-        # 获取面试结果
-        result = self.interview_service.get_interview_result()
-        
         await self.send_message({
             "type": "response.done",
-            "text": "".join(full_response)
+            "text": full_response
         })
         
-        # 发送面试结束消息
+        await self._send_interview_finished()
+        
+    async def _send_interview_finished(self):
+        """发送面试结束消息"""
+        result = self.interview_service.get_interview_result()
         await self.send_message({
             "type": "interview.finished",
             "result": result["result"],
@@ -567,30 +953,68 @@ class InterviewSession:
             "followup_count": result["followup_count"]
         })
         
+    def _play_filler(self):
+        """预计评估较慢时，候选人一说完就播放一句应答，填补等待评估的静默"""
+        self._turn_filler = ""
+        self._filler_heard = False
+        if not settings.FILLER_ENABLED or not filler_library.ready:
+            return
+        state = self.interview_service.state
+        if not self._interview_started or state.is_finished or self._is_responding():
+            return
+            
+        expected_ms = self._expected_wait_ms()
+        if expected_ms < settings.FILLER_THRESHOLD_MS:
+            metrics.incr("filler.skipped")
+            return
+            
+        clip = filler_library.next_clip()
+        if clip is None:
+            return
+        text, pcm = clip
+        self._turn_filler = text
+        self._filler_bytes = len(pcm)
+        self._enqueue_pcm(pcm)
+        metrics.incr("filler.played")
+        logger.info(f"Session {self.session_id}: Filler played, expected wait {expected_ms:.0f} ms")
+        
+    async def reset_interview(self):
+        """重置面试：取消后台评估，清空面试进度"""
+        if self._pending_evaluation is not None:
+            self._pending_evaluation.cancel()
+            self._pending_evaluation = None
+        self.interview_service.reset()
+        self._interview_started = False
+        await self.send_message({"type": "interview.reset"})
+        
     async def end_asr_and_process(self):
-        """结束 ASR 会话并处理识别结果"""
-        loop = asyncio.get_event_loop()
+        """结束本轮语音输入并处理识别结果（ASR 连接保持，供下一轮继续使用）"""
         
-        await loop.run_in_executor(executor, self.asr_service.end_session)
-        await asyncio.sleep(0.5)
+        self._audio_end_at = time.perf_counter()
         
-        recognized_text = self._recognized_text
-        self._recognized_text = ""
+        # 已收到的音频全部送入 ASR 后再结束本轮
+        await self.audio_input.drain()
+        await self.scope.run_in_executor(self.asr_service.end_turn)
+        recognized_text = await self.asr_service.wait_for_turn_transcript(settings.ASR_FINAL_TIMEOUT)
         
         if recognized_text:
+            # 识别结果到达后再播放应答：等待识别期间迟到的 speech.started 属于候选人本轮发言，
+            # 此时若已在播放应答会被当作插话
+            self._play_filler()
             await self.process_candidate_response(recognized_text)
-            
-        # 如果面试未结束，重新初始化 ASR
-        if not self.interview_service.state.is_finished:
-            await loop.run_in_executor(executor, self.asr_service.create_session)
+        else:
+            # 没有识别出内容，不统计本轮延迟
+            self._audio_end_at = None
             
     def cleanup(self):
-        """清理资源"""
+        """清理资源（阻塞调用，由 session_reaper 在线程池中执行）"""
         self.is_active = False
         try:
-            self.asr_service.close()
-            self.tts_service.finish()
-            self.tts_service.close()
+            # 连接归还连接池，仍在识别或合成的连接直接关闭
+            self.asr_service.release()
+            self.tts_service.release()
+            logger.info(f"Session {self.session_id}: {self.audio_channel.report()}")
+            logger.info(f"Session {self.session_id}: {self.backpressure.report()}")
             logger.info(f"Session {self.session_id}: Cleaned up")
         except Exception as e:
             logger.error(f"Session {self.session_id}: Cleanup error - {e}")
@@ -601,6 +1025,20 @@ active_sessions: Dict[str, InterviewSession] = {}
 session_counter = 0
 
 
+async def maintain_connection_pools():
+    """后台维护连接池：淘汰过期连接，补足预建立的空闲连接"""
+    loop = asyncio.get_event_loop()
+    while True:
+        try:
+            await asyncio.gather(
+                loop.run_in_executor(executor, asr_pool.maintain),
+                loop.run_in_executor(executor, tts_pool.maintain)
+            )
+        except Exception as e:
+            logger.error(f"Connection pool maintenance error - {e}")
+        await asyncio.sleep(settings.POOL_MAINTENANCE_INTERVAL)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
@@ -609,10 +1047,23 @@ async def lifespan(app: FastAPI):
     logger.info(f"LLM Model: {settings.LLM_MODEL}")
     logger.info(f"TTS Model: {settings.TTS_MODEL}")
     logger.info(f"Interview Config: min={settings.MIN_FOLLOWUP_QUESTIONS}, max={settings.MAX_FOLLOWUP_QUESTIONS}, pass_threshold={settings.PASS_SCORE_THRESHOLD}")
+    maintenance_task = asyncio.create_task(maintain_connection_pools())
+    reaper_task = session_reaper.start()
+    if settings.FILLER_ENABLED:
+        # 后台合成应答语音，不阻塞服务启动；合成完成前不播放应答
+        loop = asyncio.get_event_loop()
+        loop.run_in_executor(executor, filler_library.warm, settings.FILLER_WARMUP_TIMEOUT)
     yield
-    for session in active_sessions.values():
-        session.cleanup()
+    maintenance_task.cancel()
+    for session_id, session in active_sessions.items():
+        session_reaper.submit(session_id, session.cleanup)
+    await session_reaper.drain(settings.SESSION_TEARDOWN_TIMEOUT)
+    reaper_task.cancel()
+    session_reaper.close()
+    asr_pool.close_all()
+    tts_pool.close_all()
     executor.shutdown(wait=False)
+    evaluation_executor.shutdown(wait=False)
     logger.info("AI Interview API shutdown complete")
 
 
@@ -639,7 +1090,18 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "active_sessions": len(active_sessions)}
+    return {"status": "healthy", "active_sessions": len(active_sessions), "pending_teardowns": session_reaper.pending}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
+
+
+@app.get("/sessions")
+async def get_sessions():
+    """各会话的缓冲区积压与峰值"""
+    return {session_id: session.backpressure.stats() for session_id, session in active_sessions.items()}
 
 
 @app.websocket("/ws/interview")
@@ -647,12 +1109,15 @@ async def interview_websocket(websocket: WebSocket):
     """面试 WebSocket 接口"""
     global session_counter
     
-    await websocket.accept()
+    # 客户端请求了 opus.v1 / pcm.v1 子协议时音频走二进制帧
+    subprotocol = select_subprotocol(websocket.scope.get("subprotocols", []))
+    await websocket.accept(subprotocol=subprotocol)
+    accepted_at = time.perf_counter()
     
     session_counter += 1
     session_id = f"interview_{session_counter}"
     
-    session = InterviewSession(websocket, session_id)
+    session = InterviewSession(websocket, session_id, audio_protocol=subprotocol)
     active_sessions[session_id] = session
     
     try:
@@ -668,14 +1133,32 @@ async def interview_websocket(websocket: WebSocket):
             "type": "session.created",
             "session_id": session_id
         })
+        metrics.observe("session.init_ms", (time.perf_counter() - accepted_at) * 1000)
         
         # 启动队列处理任务
-        event_task = asyncio.create_task(session.process_event_queue())
-        audio_task = asyncio.create_task(session.process_audio_queue())
+        session.scope.spawn(session.process_event_queue())
+        session.scope.spawn(session.process_audio_queue())
+        session.scope.spawn(session.audio_input.run())
+        session.scope.spawn(session.backpressure.watch(session.disconnect_slow_client))
+        session.scope.spawn(session.turns.run())
         
         while True:
             try:
-                data = await websocket.receive_json()
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                    
+                frame = message.get("bytes")
+                if frame is not None:
+                    # 二进制音频帧
+                    audio_data = await session.audio_channel.decode_frame(frame)
+                    if audio_data:
+                        session.handle_audio_input(audio_data)
+                    continue
+                    
+                text = message.get("text") or ""
+                received_at = time.perf_counter()
+                data = json.loads(text)
                 msg_type = data.get("type", "")
                 
                 if msg_type == "interview.start":
@@ -683,30 +1166,28 @@ async def interview_websocket(websocket: WebSocket):
                     topic = data.get("topic", "技术能力")
                     job_position = data.get("position", "")
                     resume_summary = data.get("resume", "")
-                    await session.start_interview(topic, job_position, resume_summary)
+                    session.turns.submit(msg_type, session.start_interview, topic, job_position, resume_summary)
                     
                 elif msg_type == "audio.input":
-                    # 接收音频数据
+                    # 接收音频数据（未协商二进制子协议的客户端）
                     audio_b64 = data.get("data", "")
                     if audio_b64:
-                        audio_data = base64.b64decode(audio_b64)
-                        await session.handle_audio_input(audio_data)
+                        audio_data = session.audio_channel.decode_message(audio_b64, len(text), received_at)
+                        session.handle_audio_input(audio_data)
                         
                 elif msg_type == "audio.end":
                     # 音频输入结束
-                    await session.end_asr_and_process()
-                        
+                    session.turns.submit(msg_type, session.end_asr_and_process)
+                    
                 elif msg_type == "text.input":
                     # 文本输入（调试用）
                     text = data.get("text", "")
                     if text:
-                        await session.process_candidate_response(text)
+                        session.turns.submit(msg_type, session.process_candidate_response, text)
                         
                 elif msg_type == "interview.reset":
-                    # 重置面试
-                    session.interview_service.reset()
-                    session._interview_started = False
-                    await websocket.send_json({"type": "interview.reset"})
+                    # 重置面试（排在进行中的轮次之后）
+                    session.turns.submit(msg_type, session.reset_interview)
                     
             except WebSocketDisconnect:
                 logger.info(f"Session {session_id}: Client disconnected")
@@ -721,11 +1202,12 @@ async def interview_websocket(websocket: WebSocket):
     except Exception as e:
         logger.error(f"Session {session_id}: WebSocket error - {e}")
     finally:
-        if 'event_task' in locals():
-            event_task.cancel()
-        if 'audio_task' in locals():
-            audio_task.cancel()
-        session.cleanup()
+        # 取消本会话的全部任务，进行中的 LLM 生成与 TTS 发送随取消信号停止
+        leaked = await session.scope.close()
+        if leaked:
+            logger.info(f"Session {session_id}: {leaked} executor jobs still running after disconnect")
+        # 关闭连接交给后台回收任务，不在事件循环中等待
+        session_reaper.submit(session_id, session.cleanup)
         if session_id in active_sessions:
             del active_sessions[session_id]
         logger.info(f"Session {session_id}: Closed")
@@ -3,28 +3,63 @@ ASR 语音识别服务
 基于 DashScope qwen3-asr-flash-realtime 模型实现实时语音识别
 """
 
+import asyncio
 import base64
 import logging
-import queue
-from typing import Optional
+import threading
+import time
+from typing import List, Optional, Tuple
 import dashscope
 from dashscope.audio.qwen_omni import OmniRealtimeCallback, OmniRealtimeConversation, MultiModality
 from dashscope.audio.qwen_omni.omni_realtime import TranscriptionParams
 
 from config import settings
+from .async_queue import AsyncBridgeQueue
+from .connection_pool import ConnectionPool, PooledConnection
+from .metrics import metrics
 
 logger = logging.getLogger(__name__)
 
 
+def _resolve(future: asyncio.Future):
+    """在事件循环线程内完成 Future"""
+    if not future.done():
+        future.set_result(None)
+
+
 class ASRCallback(OmniRealtimeCallback):
     """ASR 回调处理类"""
     
-    def __init__(self, event_queue: queue.Queue):
+    def __init__(self, event_queue: Optional[AsyncBridgeQueue] = None):
         self.event_queue = event_queue
         self.session_id: Optional[str] = None
         self._is_connected = False
         self._final_transcript = ""
         
+        # 当前轮次状态（回调线程写入，会话线程读取）
+        self._lock = threading.Lock()
+        self._turn_segments: List[str] = []  # 本轮已完成识别的语音片段
+        self._speech_active = False          # 服务端 VAD 是否判定正在说话
+        self._speech_seen = False            # 本轮是否收到过 speech_started
+        self._awaiting_speech = False        # 结束输入时已发送音频但 VAD 尚未开始，等待迟到的 speech_started
+        self._pending_items = 0              # 已判停、等待识别结果的语音片段数
+        self._turn_waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+        
+    def bind(self, event_queue: Optional[AsyncBridgeQueue]):
+        """绑定到会话的事件队列（连接池租出/归还时调用），同时清空轮次状态"""
+        with self._lock:
+            self.event_queue = event_queue
+            self._turn_segments = []
+            self._turn_waiters = []
+            self._speech_seen = False
+            self._awaiting_speech = False
+            
+    def _emit(self, event: dict):
+        """投递事件，未绑定会话（在连接池中空闲）时丢弃"""
+        event_queue = self.event_queue
+        if event_queue is not None:
+            event_queue.put(event)
+            
     def on_open(self):
         """连接打开时的回调"""
         self._is_connected = True
@@ -33,6 +68,12 @@ class ASRCallback(OmniRealtimeCallback):
     def on_close(self, code, msg):
         """连接关闭时的回调"""
         self._is_connected = False
+        with self._lock:
+            # 连接已断开，不会再有识别结果，唤醒所有等待者
+            self._speech_active = False
+            self._pending_items = 0
+            self._awaiting_speech = False
+            self._notify_turn_settled()
         logger.info(f"ASR WebSocket connection closed, code: {code}, msg: {msg}")
         
     def on_event(self, response):
@@ -48,7 +89,7 @@ class ASRCallback(OmniRealtimeCallback):
                 # 实时识别的中间结果
                 stash_text = response.get('stash', '')
                 if stash_text:
-                    self.event_queue.put({
+                    self._emit({
                         'type': 'transcription.partial',
                         'text': stash_text
                     })
@@ -57,24 +98,43 @@ class ASRCallback(OmniRealtimeCallback):
                 # 最终识别结果
                 final_text = response.get('transcript', '')
                 self._final_transcript = final_text
+                with self._lock:
+                    if final_text:
+                        self._turn_segments.append(final_text)
+                    self._pending_items = max(0, self._pending_items - 1)
+                    self._notify_turn_settled()
                 logger.info(f"ASR transcription completed: {final_text}")
-                self.event_queue.put({
+                self._emit({
                     'type': 'transcription.final',
                     'text': final_text
                 })
                     
             elif event_type == 'input_audio_buffer.speech_started':
                 logger.debug("Speech started detected")
-                self.event_queue.put({'type': 'speech.started'})
+                with self._lock:
+                    self._speech_active = True
+                    self._speech_seen = True
+                    self._awaiting_speech = False
+                self._emit({'type': 'speech.started'})
                     
             elif event_type == 'input_audio_buffer.speech_stopped':
                 logger.debug("Speech stopped detected")
-                self.event_queue.put({'type': 'speech.stopped'})
+                with self._lock:
+                    self._speech_active = False
+                    self._pending_items += 1
+                self._emit({'type': 'speech.stopped'})
+                    
+            elif event_type == 'conversation.item.input_audio_transcription.failed':
+                # 识别失败，该片段不会再有结果
+                logger.warning(f"ASR transcription failed: {response.get('error', {})}")
+                with self._lock:
+                    self._pending_items = max(0, self._pending_items - 1)
+                    self._notify_turn_settled()
                     
             elif event_type == 'error':
                 error_msg = response.get('error', {}).get('message', 'Unknown error')
                 logger.error(f"ASR error: {error_msg}")
-                self.event_queue.put({
+                self._emit({
                     'type': 'error',
                     'source': 'asr',
                     'message': error_msg
@@ -82,6 +142,70 @@ class ASRCallback(OmniRealtimeCallback):
                     
         except Exception as e:
             logger.error(f"Error handling ASR event: {e}")
+            
+    def _turn_settled(self) -> bool:
+        """本轮是否已全部识别完成（调用方需持有锁）"""
+        return not self._speech_active and self._pending_items == 0 and not self._awaiting_speech
+        
+    def _notify_turn_settled(self):
+        """本轮识别完成时唤醒等待者（调用方需持有锁）"""
+        if not self._turn_waiters or not self._turn_settled():
+            return
+        waiters, self._turn_waiters = self._turn_waiters, []
+        for loop, future in waiters:
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                # 事件循环已关闭
+                pass
+                
+    def wait_turn_settled(self, loop: asyncio.AbstractEventLoop) -> asyncio.Future:
+        """返回一个 Future，本轮说话结束且识别结果全部返回时完成"""
+        future = loop.create_future()
+        with self._lock:
+            if self._turn_settled():
+                future.set_result(None)
+            else:
+                self._turn_waiters.append((loop, future))
+        return future
+        
+    def await_late_speech(self) -> bool:
+        """
+        结束输入时本轮已发送音频，但还没有收到 speech_started（最后一批音频刚送出，VAD 事件尚未返回）：
+        在收到 speech_started 或调用 stop_awaiting_speech 之前不视为本轮结束
+        
+        Returns:
+            是否进入等待
+        """
+        with self._lock:
+            if self._speech_seen or self._speech_active or self._pending_items:
+                return False
+            self._awaiting_speech = True
+            return True
+            
+    def stop_awaiting_speech(self):
+        """宽限期已过仍未收到 speech_started，按本轮没有语音处理"""
+        with self._lock:
+            self._awaiting_speech = False
+            self._notify_turn_settled()
+            
+    def take_turn_transcript(self) -> str:
+        """取出本轮识别文本并清空，供下一轮继续累积"""
+        with self._lock:
+            text = "".join(self._turn_segments)
+            self._turn_segments = []
+            self._speech_seen = self._speech_active
+        return text
+
+    @property
+    def speech_active(self) -> bool:
+        return self._speech_active
+        
+    @property
+    def idle(self) -> bool:
+        """没有进行中的语音与待返回的识别结果，可以安全地交给下一个会话"""
+        with self._lock:
+            return self._turn_settled()
 
     @property
     def is_connected(self) -> bool:
@@ -92,13 +216,63 @@ class ASRCallback(OmniRealtimeCallback):
         return self._final_transcript
 
 
+def open_asr_connection(callback: ASRCallback) -> OmniRealtimeConversation:
+    """建立 ASR 连接并完成会话配置（阻塞）"""
+    conversation = OmniRealtimeConversation(
+        model=settings.ASR_MODEL,
+        url=settings.WS_BASE_URL,
+        callback=callback
+    )
+    
+    # 连接到服务
+    conversation.connect()
+    
+    # 配置转录参数
+    transcription_params = TranscriptionParams(
+        language=settings.ASR_LANGUAGE,
+        sample_rate=settings.ASR_SAMPLE_RATE,
+        input_audio_format="pcm"
+    )
+    
+    # 更新会话配置
+    conversation.update_session(
+        output_modalities=[MultiModality.TEXT],
+        enable_input_audio_transcription=True,
+        enable_turn_detection=True,
+        turn_detection_silence_duration_ms=settings.ASR_VAD_SILENCE_MS,
+        transcription_params=transcription_params
+    )
+    return conversation
+
+
+def _open_pooled_asr_connection() -> PooledConnection:
+    callback = ASRCallback()
+    return PooledConnection(client=open_asr_connection(callback), callback=callback)
+
+
+# 进程级 ASR 连接池
+asr_pool = ConnectionPool(
+    "asr",
+    factory=_open_pooled_asr_connection,
+    min_idle=settings.POOL_MIN_IDLE,
+    max_idle=settings.POOL_MAX_IDLE,
+    idle_timeout=settings.POOL_IDLE_TIMEOUT,
+    max_age=settings.POOL_MAX_AGE
+)
+
+
 class ASRService:
     """ASR 语音识别服务"""
     
-    def __init__(self, event_queue: queue.Queue):
+    def __init__(self, event_queue: AsyncBridgeQueue):
         self.event_queue = event_queue
         self.conversation: Optional[OmniRealtimeConversation] = None
         self.callback: Optional[ASRCallback] = None
+        self._connect_lock = threading.Lock()
+        self._last_connect_attempt = 0.0
+        self._connected_at = 0.0
+        self._turn_audio_bytes = 0        # 本轮已送入 ASR 的音频字节数（发送线程写入）
+        self._turn_had_audio = False      # 刚结束的一轮是否发送过音频
         self._setup_dashscope()
         
     def _setup_dashscope(self):
@@ -106,32 +280,27 @@ class ASRService:
         dashscope.api_key = settings.DASHSCOPE_API_KEY
         
     def create_session(self) -> bool:
-        """创建 ASR 会话"""
+        """
+        创建 ASR 会话
+        
+        整场对话只建立一次连接，轮次由服务端 VAD 事件划分；
+        首次创建优先从连接池租用，重连时沿用原回调，未取走的识别结果不会丢失
+        """
         try:
-            self.callback = ASRCallback(self.event_queue)
-            
-            self.conversation = OmniRealtimeConversation(
-                model=settings.ASR_MODEL,
-                url=settings.WS_BASE_URL,
-                callback=self.callback
-            )
-            
-            # 连接到服务
-            self.conversation.connect()
-            
-            # 配置转录参数
-            transcription_params = TranscriptionParams(
-                language=settings.ASR_LANGUAGE,
-                sample_rate=settings.ASR_SAMPLE_RATE,
-                input_audio_format="pcm"
-            )
-            
-            # 更新会话配置
-            self.conversation.update_session(
-                output_modalities=[MultiModality.TEXT],
-                enable_input_audio_transcription=True,
-                transcription_params=transcription_params
-            )
+            if self.callback is None:
+                lease = asr_pool.acquire()
+                if lease is not None:
+                    lease.callback.bind(self.event_queue)
+                    self.conversation = lease.client
+                    self.callback = lease.callback
+                    self._connected_at = lease.created_at
+                    logger.info("ASR session leased from pool")
+                    return True
+                self.callback = ASRCallback(self.event_queue)
+                
+            self._last_connect_attempt = time.monotonic()
+            self.conversation = open_asr_connection(self.callback)
+            self._connected_at = time.monotonic()
             
             logger.info("ASR session created successfully")
             return True
@@ -140,21 +309,103 @@ class ASRService:
             logger.error(f"Failed to create ASR session: {e}")
             return False
             
+    def _ensure_connected(self) -> bool:
+        """连接断开时重连（限制重连频率），连接正常时直接返回"""
+        if self.conversation and self.is_connected:
+            return True
+            
+        with self._connect_lock:
+            if self.conversation and self.is_connected:
+                return True
+            if time.monotonic() - self._last_connect_attempt < settings.ASR_RECONNECT_INTERVAL:
+                return False
+                
+            logger.warning("ASR connection lost, reconnecting")
+            self.close()
+            return self.create_session()
+            
     def send_audio(self, audio_data: bytes) -> bool:
         """发送音频数据进行识别"""
         try:
-            if not self.conversation or not self.callback or not self.callback.is_connected:
+            if not self._ensure_connected():
                 logger.error("ASR session not connected")
                 return False
                 
             audio_b64 = base64.b64encode(audio_data).decode('ascii')
             self.conversation.append_audio(audio_b64)
+            self._turn_audio_bytes += len(audio_data)
             return True
             
         except Exception as e:
             logger.error(f"Failed to send audio data: {e}")
             return False
             
+    def end_turn(self):
+        """
+        结束当前轮次的音频输入
+        
+        不断开连接。本轮发送过音频或服务端仍判定在说话时补发一段静音，
+        让 VAD 立即判定语音结束并提交本轮识别；VAD 事件晚于结束输入到达（尚未收到 speech_started）时同样需要补静音，
+        否则短回答的最后一段语音要等下一轮的音频才会被判停
+        """
+        self._turn_had_audio = self._turn_audio_bytes > 0
+        self._turn_audio_bytes = 0
+        try:
+            if not self.callback or not (self._turn_had_audio or self.callback.speech_active):
+                return
+            if not self.conversation or not self.is_connected:
+                return
+                
+            # 静音时长略大于 VAD 判停阈值，16bit 单声道每毫秒 2 * 采样率 / 1000 字节
+            silence_ms = settings.ASR_VAD_SILENCE_MS + 200
+            silence = bytes(silence_ms * settings.ASR_SAMPLE_RATE // 1000 * 2)
+            self.conversation.append_audio(base64.b64encode(silence).decode('ascii'))
+            logger.debug(f"ASR turn ended, padded {silence_ms}ms silence")
+            
+        except Exception as e:
+            logger.error(f"Error ending ASR turn: {e}")
+            
+    def take_turn_transcript(self) -> str:
+        """取出本轮识别文本"""
+        return self.callback.take_turn_transcript() if self.callback else ""
+        
+    async def wait_for_turn_transcript(self, timeout: float) -> str:
+        """
+        等待本轮最终识别结果并取出
+        
+        识别完成事件一到立即返回；超过 timeout 秒仍未完成时，
+        返回已经拿到的片段，避免整轮回答被丢弃。
+        本轮发送过音频但还没有收到 speech_started 时，先等待 ASR_SPEECH_START_GRACE_MS，
+        期间 VAD 开始则继续等识别结果，否则按没有语音处理
+        """
+        if not self.callback:
+            return ""
+            
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        grace = None
+        if self._turn_had_audio and self.callback.await_late_speech():
+            metrics.incr("asr.late_speech_waits")
+            grace = loop.call_later(settings.ASR_SPEECH_START_GRACE_MS / 1000, self.callback.stop_awaiting_speech)
+        future = self.callback.wait_turn_settled(loop)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"ASR final transcript not ready after {timeout}s, using partial result")
+            metrics.incr("asr.final_wait_timeouts")
+        finally:
+            if grace is not None:
+                grace.cancel()
+                self.callback.stop_awaiting_speech()
+                
+        text = self.take_turn_transcript()
+        if text:
+            metrics.observe("asr.final_wait_ms", (time.perf_counter() - start) * 1000)
+        else:
+            # 空轮次单独计数，不计入等待耗时：识别被丢弃时等待时间接近 0，混入直方图会掩盖问题
+            metrics.incr("asr.empty_turns")
+        return text
+        
     def end_session(self):
         """结束当前会话"""
         try:
@@ -164,6 +415,27 @@ class ASRService:
         except Exception as e:
             logger.error(f"Error ending ASR session: {e}")
             
+    def release(self):
+        """会话结束时归还连接，仍有未完成的识别时直接关闭"""
+        conversation, callback = self.conversation, self.callback
+        self.conversation = None
+        self.callback = None
+        if conversation is None or callback is None:
+            return
+            
+        try:
+            if callback.is_connected and callback.idle:
+                conversation.clear_appended_audio()
+                callback.bind(None)
+                if asr_pool.release(PooledConnection(conversation, callback, created_at=self._connected_at)):
+                    logger.info("ASR connection returned to pool")
+                    return
+            else:
+                conversation.close()
+            logger.info("ASR connection closed")
+        except Exception as e:
+            logger.error(f"Error releasing ASR connection: {e}")
+            
     def close(self):
         """关闭连接"""
         try:
@@ -0,0 +1,163 @@
+"""
+TTS 音频缓存
+固定话术（开场问题等）的 PCM 按 (音色, 模型, 采样率, 规范化文本) 做内容寻址缓存，
+内存 LRU 一级、磁盘二级（mmap 读取），命中时直接把 PCM 送入音频队列，不再占用 TTS 连接
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from config import settings
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_cache_text(text: str) -> str:
+    """规范化文本：合并空白，保证同一句话的不同写法命中同一条缓存"""
+    return " ".join(text.split())
+
+
+class AudioCache:
+    """
+    两级 PCM 缓存（线程安全）
+    
+    - 内存层：按字节数限制的 LRU
+    - 磁盘层：每条缓存一个 <key>.pcm 文件，原子写入；读取时 mmap 后拷入内存层，
+      总大小超过上限时按修改时间淘汰最旧的文件
+    """
+    
+    def __init__(self, directory: str, memory_limit: int, disk_limit: int):
+        self.directory = directory
+        self.memory_limit = memory_limit
+        self.disk_limit = disk_limit
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        
+    @staticmethod
+    def make_key(text: str, voice: str, model: str, sample_rate: int) -> str:
+        """缓存键：音色、模型、采样率与规范化文本的摘要"""
+        raw = f"{voice}\n{model}\n{sample_rate}\n{normalize_cache_text(text)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+        
+    def key_for(self, text: str) -> str:
+        """按当前 TTS 配置生成缓存键"""
+        return self.make_key(text, settings.TTS_VOICE, settings.TTS_MODEL, settings.TTS_SAMPLE_RATE)
+        
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.pcm")
+        
+    def get(self, key: str) -> Optional[bytes]:
+        """查询缓存，依次查内存层与磁盘层（磁盘读取会阻塞，需在线程池中执行）"""
+        with self._lock:
+            pcm = self._memory.get(key)
+            if pcm is not None:
+                self._memory.move_to_end(key)
+                
+        if pcm is not None:
+            metrics.incr("audio_cache.memory_hits")
+            metrics.incr("audio_cache.bytes_served", len(pcm))
+            return pcm
+            
+        pcm = self._read_disk(key)
+        if pcm is None:
+            metrics.incr("audio_cache.misses")
+            return None
+            
+        metrics.incr("audio_cache.disk_hits")
+        metrics.incr("audio_cache.bytes_served", len(pcm))
+        self._remember(key, pcm)
+        return pcm
+        
+    def put(self, key: str, pcm: bytes):
+        """写入缓存（内存层与磁盘层）"""
+        if not pcm:
+            return
+        self._remember(key, pcm)
+        metrics.incr("audio_cache.bytes_stored", len(pcm))
+        if self.disk_limit > 0:
+            self._write_disk(key, pcm)
+            
+    def _remember(self, key: str, pcm: bytes):
+        """放入内存层，超出字节上限时淘汰最久未用的条目"""
+        if len(pcm) > self.memory_limit:
+            return
+        with self._lock:
+            old = self._memory.pop(key, None)
+            if old is not None:
+                self._memory_bytes -= len(old)
+            self._memory[key] = pcm
+            self._memory_bytes += len(pcm)
+            while self._memory_bytes > self.memory_limit:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+                metrics.incr("audio_cache.memory_evicted")
+            metrics.set_gauge("audio_cache.memory_bytes", self._memory_bytes)
+            
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        try:
+            with open(self._path(key), "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                if size == 0:
+                    return None
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    return mapped[:]
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.error(f"Audio cache read failed: {e}")
+            return None
+            
+    def _write_disk(self, key: str, pcm: bytes):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(pcm)
+            # 先写临时文件再替换，读取方不会看到写了一半的文件
+            os.replace(tmp_path, path)
+            self._prune_disk()
+        except OSError as e:
+            logger.error(f"Audio cache write failed: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+                
+    def _prune_disk(self):
+        """磁盘层超过上限时删除最旧的文件"""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".pcm"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+                    total += stat.st_size
+                    
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.disk_limit:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                metrics.incr("audio_cache.disk_evicted")
+            except OSError:
+                pass
+        metrics.set_gauge("audio_cache.disk_bytes", total)
+
+
+# 进程级音频缓存
+audio_cache = AudioCache(
+    settings.AUDIO_CACHE_DIR,
+    memory_limit=int(settings.AUDIO_CACHE_MEMORY_MB * 1024 * 1024),
+    disk_limit=int(settings.AUDIO_CACHE_DISK_MB * 1024 * 1024)
+)
@@ -0,0 +1,116 @@
+"""
+Opus 音频编解码
+客户端握手时请求 opus.v1 子协议、且安装了 opuslib（依赖系统 libopus）时，上下行音频改为 Opus 包传输：
+上行包先解码为 PCM 再送入 ASR，下行 TTS PCM 按固定帧长编码后再发送。
+编解码在独立的线程池中执行，不阻塞事件循环，也不占用 ASR/TTS 调用所用的线程池
+"""
+
+import concurrent.futures
+import logging
+import time
+from typing import List, Tuple
+
+from config import settings
+
+try:
+    import opuslib
+except Exception:  # 未安装 opuslib 或找不到 libopus 时 opuslib 抛出的是普通 Exception
+    opuslib = None
+
+logger = logging.getLogger(__name__)
+
+OPUS_SUBPROTOCOL = "opus.v1"
+
+# Opus 允许的帧长（以 2.5ms 为单位），补齐尾部时从大到小选用
+_FRAME_UNITS = (24, 16, 8, 4, 2, 1)
+
+# 单个 Opus 包最多 120ms
+_MAX_PACKET_MS = 120
+
+# 编解码线程池
+codec_executor = concurrent.futures.ThreadPoolExecutor(
+    max_workers=settings.AUDIO_CODEC_WORKERS,
+    thread_name_prefix="audio-codec"
+)
+
+
+def opus_available() -> bool:
+    """是否可以协商 Opus 传输"""
+    return settings.OPUS_ENABLED and opuslib is not None
+
+
+class OpusEncoderStream:
+    """
+    下行编码：把任意长度的 16bit 单声道 PCM 切成固定帧长编码
+    
+    不足一帧的部分留到下一段，flush 时补静音到 2.5ms 的整数倍，再用尽量大的合法帧长编完。
+    编码器有状态，同一路音频必须按顺序调用
+    """
+    
+    def __init__(self, sample_rate: int, frame_ms: int, bitrate: int):
+        self.sample_rate = sample_rate
+        self._unit_bytes = sample_rate * 2 // 400  # 2.5ms
+        self._frame_bytes = self._unit_bytes * frame_ms * 2 // 5
+        self._encoder = opuslib.Encoder(sample_rate, 1, opuslib.APPLICATION_VOIP)
+        self._encoder.bitrate = bitrate
+        self._pending = bytearray()
+        
+    @property
+    def pending(self) -> bool:
+        """是否有尚未编码的尾部"""
+        return bool(self._pending)
+        
+    def encode(self, pcm: bytes) -> Tuple[List[bytes], float]:
+        """
+        编码完整的帧
+        
+        Returns:
+            (Opus 包列表, 本次编码消耗的 CPU 时间（秒）)
+        """
+        start = time.thread_time()
+        self._pending.extend(pcm)
+        packets = []
+        frame_bytes = self._frame_bytes
+        whole = len(self._pending) - len(self._pending) % frame_bytes
+        view = memoryview(self._pending)
+        for offset in range(0, whole, frame_bytes):
+            packets.append(self._encoder.encode(bytes(view[offset:offset + frame_bytes]), frame_bytes // 2))
+        view.release()
+        del self._pending[:whole]
+        return packets, time.thread_time() - start
+        
+    def flush(self) -> Tuple[List[bytes], float]:
+        """编码剩余的尾部（补静音到 2.5ms 的整数倍）"""
+        start = time.thread_time()
+        if self._pending:
+            remainder = len(self._pending) % self._unit_bytes
+            if remainder:
+                self._pending.extend(bytes(self._unit_bytes - remainder))
+        packets = []
+        units = len(self._pending) // self._unit_bytes
+        offset = 0
+        for size in _FRAME_UNITS:
+            while units >= size:
+                frame_bytes = size * self._unit_bytes
+                packets.append(self._encoder.encode(bytes(self._pending[offset:offset + frame_bytes]), frame_bytes // 2))
+                offset += frame_bytes
+                units -= size
+        self._pending.clear()
+        return packets, time.thread_time() - start
+
+
+class OpusDecoderStream:
+    """上行解码：Opus 包还原为 16bit 单声道 PCM（解码器有状态，需按顺序调用）"""
+    
+    def __init__(self, sample_rate: int):
+        self._decoder = opuslib.Decoder(sample_rate, 1)
+        self._max_samples = sample_rate * _MAX_PACKET_MS // 1000
+        
+    def decode(self, packet: bytes) -> Tuple[bytes, float]:
+        """
+        Returns:
+            (PCM, 本次解码消耗的 CPU 时间（秒）)
+        """
+        start = time.thread_time()
+        pcm = self._decoder.decode(bytes(packet), self._max_samples)
+        return pcm, time.thread_time() - start
@@ -0,0 +1,205 @@
+"""
+下行音频缓冲与分帧
+每个会话一块预分配的环形缓冲区：TTS 回调线程把解码后的 PCM 直接写入，音频发送任务按固定时长
+（AUDIO_FRAME_MS）的整数倍从中取出连续切片发送，不再为每个 audio.delta 单独保存 bytes、
+也不再为分帧重新拼接。缓冲区大小固定（AUDIO_RING_MS），写满时多出的音频丢弃并计数
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import List, Optional
+
+from config import settings
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def frame_bytes_for(frame_ms: float, sample_rate: int = settings.TTS_SAMPLE_RATE) -> int:
+    """指定时长的 16bit 单声道 PCM 字节数（按采样对齐）"""
+    return int(sample_rate * frame_ms / 1000) * 2
+
+
+class PcmRingBuffer:
+    """
+    PCM 环形缓冲区（写入可在任意线程，读取只在事件循环线程）
+    
+    读取分两步：peek 返回可读区域开头的一段切片（跨越缓冲区末尾时拼到预分配的暂存区），
+    发送完成后再 consume 释放，期间写入方只会写空闲区域。clear 丢弃全部内容并使 generation 加一，
+    持有旧切片的一方据此判断切片已失效，不再 consume
+    """
+    
+    def __init__(self, name: str, capacity: int, max_frame_bytes: int,
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.name = name
+        self.capacity = capacity
+        self.generation = 0
+        self.high_water = 0         # 会话期间缓冲的最大字节数
+        self.overflow_bytes = 0     # 因缓冲区已满丢弃的字节数
+        self.consumed_bytes = 0     # 累计已发送释放的字节数（判断发送是否停滞）
+        self._loop = loop or asyncio.get_running_loop()
+        self._buffer = bytearray(capacity)
+        self._view = memoryview(self._buffer)
+        self._scratch = memoryview(bytearray(max_frame_bytes))
+        self._read = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self._reader: Optional[asyncio.Future] = None   # 等待数据的读取方
+        self._reader_need = 0
+        self._drain_waiters: List[asyncio.Future] = []  # 等待缓冲区腾出空间的一方（write_all、暂停提交 TTS 的回复）
+        
+    @property
+    def readable(self) -> int:
+        return self._size
+        
+    def empty(self) -> bool:
+        return self._size == 0
+        
+    def put(self, pcm: bytes) -> int:
+        """
+        写入 PCM（任意线程可调用），放不下的部分丢弃并计入 overflow_bytes
+        
+        Returns:
+            实际写入的字节数
+        """
+        written = self.put_some(pcm)
+        dropped = len(pcm) - written
+        if dropped:
+            self.overflow_bytes += dropped
+            metrics.incr(f"{self.name}.overflow_bytes", dropped)
+            logger.warning(f"Ring {self.name}: full ({self.capacity} bytes), dropped {dropped} bytes")
+        return written
+        
+    def put_some(self, pcm: bytes) -> int:
+        """写入放得下的部分，不计溢出，返回写入的字节数"""
+        src = memoryview(pcm)
+        with self._lock:
+            n = min(len(pcm), self.capacity - self._size)
+            if n <= 0:
+                return 0
+            start = (self._read + self._size) % self.capacity
+            first = min(n, self.capacity - start)
+            self._view[start:start + first] = src[:first]
+            if n > first:
+                self._view[:n - first] = src[first:n]
+            self._size += n
+            if self._size > self.high_water:
+                self.high_water = self._size
+            if self._reader is not None and self._size >= self._reader_need:
+                self._loop.call_soon_threadsafe(self._wake, self._reader)
+                self._reader = None
+        return n
+        
+    async def write_all(self, pcm: bytes, generation: int):
+        """逐步写入一段现成的 PCM，空间不足时等待读取方释放；期间被 clear 则放弃剩余部分"""
+        view = memoryview(pcm)
+        offset = self.put_some(view)
+        while offset < len(view) and generation == self.generation:
+            await self.wait_drained(self.capacity - 1)
+            if generation == self.generation:
+                offset += self.put_some(view[offset:])
+                
+    async def wait_drained(self, level: int, timeout: Optional[float] = None) -> bool:
+        """等待缓冲的数据降到 level 字节及以下（被 clear 时立即满足），超时返回 False"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._size > level:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return False
+            waiter = self._loop.create_future()
+            self._drain_waiters.append(waiter)
+            try:
+                await asyncio.wait_for(waiter, remaining)
+            except asyncio.TimeoutError:
+                return False
+            finally:
+                if waiter in self._drain_waiters:
+                    self._drain_waiters.remove(waiter)
+        return True
+        
+    async def wait_readable(self, min_bytes: int, timeout: Optional[float] = None) -> bool:
+        """等待可读数据达到 min_bytes，超时返回 False"""
+        with self._lock:
+            if self._size >= min_bytes:
+                return True
+            waiter = self._loop.create_future()
+            self._reader = waiter
+            self._reader_need = min_bytes
+        try:
+            await asyncio.wait_for(waiter, timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            with self._lock:
+                if self._reader is waiter:
+                    self._reader = None
+                    
+    def peek(self, max_bytes: int, align: int = 1) -> Optional[memoryview]:
+        """
+        取可读区域开头的一段（不释放），长度为 align 的整数倍且不超过 max_bytes
+        
+        Returns:
+            PCM 切片，可读数据不足 align 时返回 None
+        """
+        with self._lock:
+            n = min(self._size, max_bytes, len(self._scratch))
+            n -= n % align
+            if n <= 0:
+                return None
+            first = min(n, self.capacity - self._read)
+            if first == n:
+                return self._view[self._read:self._read + n]
+            # 跨越缓冲区末尾：拼到暂存区
+            self._scratch[:first] = self._view[self._read:self.capacity]
+            self._scratch[first:n] = self._view[:n - first]
+            return self._scratch[:n]
+            
+    def consume(self, n: int):
+        """释放 peek 取出并已发送的 n 字节"""
+        with self._lock:
+            n = min(n, self._size)
+            self._read = (self._read + n) % self.capacity
+            self._size -= n
+            self.consumed_bytes += n
+        self._wake_drain_waiters()
+        
+    def clear(self) -> int:
+        """
+        丢弃全部内容（插话打断）
+        
+        Returns:
+            丢弃的字节数
+        """
+        with self._lock:
+            dropped = self._size
+            self._read = 0
+            self._size = 0
+            self.generation += 1
+        self._wake_drain_waiters()
+        return dropped
+        
+    def report(self) -> str:
+        """
+        会话结束时记录缓冲区峰值占用
+        
+        Returns:
+            用于日志的摘要
+        """
+        bytes_per_ms = settings.TTS_SAMPLE_RATE * 2 / 1000
+        high_water_ms = self.high_water / bytes_per_ms
+        metrics.observe(f"{self.name}.high_water_ms", high_water_ms)
+        return (f"{self.name}: high water {high_water_ms:.0f} ms of {self.capacity / bytes_per_ms:.0f} ms, "
+                f"overflow {self.overflow_bytes} bytes")
+                
+    def _wake_drain_waiters(self):
+        waiters, self._drain_waiters = self._drain_waiters, []
+        for waiter in waiters:
+            self._wake(waiter)
+            
+    @staticmethod
+    def _wake(waiter: Optional[asyncio.Future]):
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
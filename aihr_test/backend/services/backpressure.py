@@ -0,0 +1,110 @@
+"""
+慢客户端背压
+客户端网络卡住时 WebSocket 发送会阻塞，下行音频与事件在服务端堆积。每个会话的策略：
+- 下行音频积压超过 BACKPRESSURE_PAUSE_MS 时暂停向 TTS 提交文本，积压降到 BACKPRESSURE_RESUME_MS 后继续
+- 事件队列中尚未发出的识别中间结果被更新的中间结果取代（见 AsyncBridgeQueue 的 coalesce）
+- 音频发送停滞或事件队列达到 EVENT_QUEUE_MAX，持续 SLOW_CLIENT_TIMEOUT 秒后断开连接
+会话结束时记录缓冲区峰值，运行中可以通过 /sessions 接口查看各会话的当前积压与峰值
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from config import settings
+from .async_queue import AsyncBridgeQueue
+from .audio_output import PcmRingBuffer, frame_bytes_for
+from .metrics import metrics
+
+# 慢客户端检测间隔（秒）
+CHECK_INTERVAL = 1.0
+
+# 事件队列深度直方图分桶
+QUEUE_DEPTH_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000)
+
+
+def partial_transcript_key(event: Any) -> Optional[str]:
+    """事件队列的合并键：只合并识别中间结果，其余事件按顺序全部送达"""
+    if isinstance(event, dict) and event.get("type") == "transcription.partial":
+        return "transcription.partial"
+    return None
+
+
+class SessionBackpressure:
+    """每会话一个：暂停 TTS 提交、检测慢客户端、统计缓冲区峰值"""
+    
+    def __init__(self, audio_queue: PcmRingBuffer, event_queue: AsyncBridgeQueue):
+        self.audio_queue = audio_queue
+        self.event_queue = event_queue
+        self._pause_bytes = frame_bytes_for(settings.BACKPRESSURE_PAUSE_MS)
+        self._resume_bytes = min(frame_bytes_for(settings.BACKPRESSURE_RESUME_MS), self._pause_bytes)
+        self.paused = False
+        
+    async def wait_for_room(self):
+        """提交 TTS 文本前调用：音频积压过多时等待客户端收走（打断清空缓冲区时立即返回）"""
+        ring = self.audio_queue
+        if not self._pause_bytes or ring.readable <= self._pause_bytes:
+            return
+        started = time.perf_counter()
+        self.paused = True
+        metrics.incr("backpressure.tts_pauses")
+        try:
+            await ring.wait_drained(self._resume_bytes)
+        finally:
+            self.paused = False
+            metrics.observe("backpressure.tts_pause_ms", (time.perf_counter() - started) * 1000)
+            
+    def _stalled(self, consumed_before: int) -> bool:
+        """上个检测周期内音频有积压却没有发出任何数据，或事件队列达到上限"""
+        ring = self.audio_queue
+        if not ring.empty() and ring.consumed_bytes == consumed_before:
+            return True
+        return bool(settings.EVENT_QUEUE_MAX) and self.event_queue.qsize() >= settings.EVENT_QUEUE_MAX
+        
+    async def watch(self, on_slow_client: Callable[[], Awaitable[None]]):
+        """
+        慢客户端检测（会话期间常驻，会话结束时取消）
+        
+        停滞持续 SLOW_CLIENT_TIMEOUT 秒后调用一次 on_slow_client 并退出
+        """
+        if settings.SLOW_CLIENT_TIMEOUT <= 0:
+            return
+        consumed = self.audio_queue.consumed_bytes
+        stalled_since: Optional[float] = None
+        while True:
+            await asyncio.sleep(CHECK_INTERVAL)
+            stalled = self._stalled(consumed)
+            consumed = self.audio_queue.consumed_bytes
+            if not stalled:
+                stalled_since = None
+                continue
+            now = time.monotonic()
+            if stalled_since is None:
+                stalled_since = now
+                metrics.incr("backpressure.stalls")
+            elif now - stalled_since >= settings.SLOW_CLIENT_TIMEOUT:
+                metrics.incr("backpressure.disconnects")
+                await on_slow_client()
+                return
+                
+    def stats(self) -> Dict:
+        """当前积压与峰值（/sessions 接口）"""
+        bytes_per_ms = settings.TTS_SAMPLE_RATE * 2 / 1000
+        return {
+            "audio_buffer_ms": round(self.audio_queue.readable / bytes_per_ms),
+            "audio_buffer_high_water_ms": round(self.audio_queue.high_water / bytes_per_ms),
+            "audio_overflow_bytes": self.audio_queue.overflow_bytes,
+            "event_queue": self.event_queue.qsize(),
+            "event_queue_high_water": self.event_queue.high_water,
+            "tts_paused": self.paused
+        }
+        
+    def report(self) -> str:
+        """
+        会话结束时记录缓冲区峰值
+        
+        Returns:
+            用于日志的摘要
+        """
+        metrics.observe("session.event_queue_high_water", self.event_queue.high_water, buckets=QUEUE_DEPTH_BUCKETS)
+        return f"{self.audio_queue.report()}, event queue high water {self.event_queue.high_water}"
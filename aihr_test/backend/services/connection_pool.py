@@ -0,0 +1,145 @@
+"""
+实时连接池
+预先建立好的 DashScope 实时连接（ASR / TTS），新会话直接租用，
+会话结束后归还，省去每个会话建连与 update_session 的握手耗时
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PooledConnection:
+    """池中的一条连接"""
+    client: Any                 # OmniRealtimeConversation / QwenTtsRealtime
+    callback: Any               # 对应的回调对象，租用时重新绑定到会话队列
+    created_at: float = field(default_factory=time.monotonic)
+    idle_since: float = field(default_factory=time.monotonic)
+    
+    def close(self):
+        try:
+            self.client.close()
+        except Exception as e:
+            logger.debug(f"Error closing pooled connection: {e}")
+
+
+class ConnectionPool:
+    """
+    空闲连接池（线程安全）
+    
+    acquire() 只返回健康的空闲连接，池为空时返回 None，由调用方现建；
+    maintain() 定期淘汰过期连接并补足最少空闲数，由后台任务调用
+    """
+    
+    def __init__(self, name: str, factory: Callable[[], PooledConnection],
+                 min_idle: int, max_idle: int, idle_timeout: float, max_age: float):
+        self.name = name
+        self._factory = factory
+        self.min_idle = min_idle
+        self.max_idle = max(max_idle, min_idle)
+        self.idle_timeout = idle_timeout
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._idle: List[PooledConnection] = []
+        self._filling = False
+        
+    def _usable(self, conn: PooledConnection, now: float) -> bool:
+        """健康检查：连接仍在线、空闲时间与存活时间都未超限"""
+        return (
+            conn.callback.is_connected
+            and now - conn.idle_since < self.idle_timeout
+            and now - conn.created_at < self.max_age
+        )
+        
+    def acquire(self) -> Optional[PooledConnection]:
+        """租用一条空闲连接，没有可用连接时返回 None"""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    metrics.incr(f"pool.{self.name}.misses")
+                    self._update_gauge()
+                    return None
+                # 后进先出，优先使用最近归还的连接
+                conn = self._idle.pop()
+                
+            if self._usable(conn, time.monotonic()):
+                metrics.incr(f"pool.{self.name}.hits")
+                with self._lock:
+                    self._update_gauge()
+                return conn
+                
+            metrics.incr(f"pool.{self.name}.evicted")
+            conn.close()
+            
+    def release(self, conn: PooledConnection) -> bool:
+        """归还连接，连接不可用或池已满时直接关闭，返回是否放回池中"""
+        now = time.monotonic()
+        conn.idle_since = now
+        
+        if self._usable(conn, now):
+            with self._lock:
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(conn)
+                    self._update_gauge()
+                    return True
+                    
+        conn.close()
+        return False
+        
+    def maintain(self):
+        """淘汰过期连接，并补足最少空闲连接数（阻塞，需在线程池中执行）"""
+        now = time.monotonic()
+        with self._lock:
+            expired = []
+            alive = []
+            for conn in self._idle:
+                (alive if self._usable(conn, now) else expired).append(conn)
+            self._idle = alive
+            # 同一时间只有一个维护任务在补充连接
+            missing = 0 if self._filling else self.min_idle - len(self._idle)
+            filling = missing > 0
+            if filling:
+                self._filling = True
+                
+        for conn in expired:
+            metrics.incr(f"pool.{self.name}.evicted")
+            conn.close()
+            
+        try:
+            for _ in range(max(missing, 0)):
+                try:
+                    conn = self._factory()
+                except Exception as e:
+                    # 建连失败时本轮不再重试，等下一次维护
+                    logger.error(f"Pool {self.name}: failed to open connection - {e}")
+                    break
+                metrics.incr(f"pool.{self.name}.opened")
+                if not self.release(conn):
+                    break
+        finally:
+            with self._lock:
+                if filling:
+                    self._filling = False
+                self._update_gauge()
+                
+    def close_all(self):
+        """关闭全部空闲连接"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+            self._update_gauge()
+        for conn in idle:
+            conn.close()
+            
+    def _update_gauge(self):
+        metrics.set_gauge(f"pool.{self.name}.idle", len(self._idle))
+        
+    @property
+    def idle_count(self) -> int:
+        return len(self._idle)
@@ -0,0 +1,150 @@
+"""
+流式决策输出解析
+增量解析 LLM 流式返回的 JSON 对象，字段一结束就给出结果，
+指定的文本字段边接收边输出，便于尽早送入 TTS
+"""
+
+import json
+from typing import Any, Dict, List, Optional, Tuple
+
+# 解析状态
+_SEEK_KEY = 0       # 等待字段名
+_KEY = 1            # 读取字段名
+_SEEK_COLON = 2     # 等待冒号
+_SEEK_VALUE = 3     # 等待字段值
+_STRING = 4         # 读取字符串值
+_SCALAR = 5         # 读取数字/布尔等标量值
+
+_ESCAPES = {
+    '"': '"',
+    '\\': '\\',
+    '/': '/',
+    'b': '\b',
+    'f': '\f',
+    'n': '\n',
+    'r': '\r',
+    't': '\t',
+}
+
+
+class DecisionStreamParser:
+    """
+    平铺 JSON 对象的增量解析器
+    
+    只支持一层对象，字段值为字符串或标量。每个字符只处理一次；
+    feed() 返回本次新产生的事件：
+        ("field", key, value)  字段解析完成
+        ("delta", key, text)   流式字段新增的文本
+    """
+    
+    def __init__(self, streaming_field: str = "speech"):
+        self.streaming_field = streaming_field
+        self.fields: Dict[str, Any] = {}
+        self._state = _SEEK_KEY
+        self._key: List[str] = []
+        self._value: List[str] = []
+        self._streaming = False                 # 当前字段是否为流式字段
+        self._escape: Optional[str] = None      # 未完成的转义序列
+        self._high_surrogate: Optional[int] = None
+        
+    def feed(self, chunk: str) -> List[Tuple[str, str, Any]]:
+        """输入一段文本，返回新产生的事件"""
+        events: List[Tuple[str, str, Any]] = []
+        delta: List[str] = []
+        
+        for ch in chunk:
+            state = self._state
+            
+            if state == _STRING or state == _KEY:
+                target = self._key if state == _KEY else self._value
+                if self._escape is not None:
+                    decoded = self._read_escape(ch)
+                    if decoded:
+                        target.append(decoded)
+                        if state == _STRING and self._streaming:
+                            delta.append(decoded)
+                elif ch == '\\':
+                    self._escape = ""
+                elif ch == '"':
+                    if state == _KEY:
+                        self._streaming = self._current_key() == self.streaming_field
+                        self._state = _SEEK_COLON
+                    else:
+                        if delta:
+                            events.append(("delta", self._current_key(), "".join(delta)))
+                            delta = []
+                        self._finish_value("".join(self._value), events)
+                else:
+                    target.append(ch)
+                    if state == _STRING and self._streaming:
+                        delta.append(ch)
+                        
+            elif state == _SEEK_KEY:
+                if ch == '"':
+                    self._key = []
+                    self._state = _KEY
+                    
+            elif state == _SEEK_COLON:
+                if ch == ':':
+                    self._state = _SEEK_VALUE
+                    
+            elif state == _SEEK_VALUE:
+                if ch == '"':
+                    self._value = []
+                    self._state = _STRING
+                elif not ch.isspace():
+                    self._value = [ch]
+                    self._state = _SCALAR
+                    
+            elif state == _SCALAR:
+                if ch == ',' or ch == '}' or ch.isspace():
+                    self._finish_value(self._parse_scalar("".join(self._value)), events)
+                else:
+                    self._value.append(ch)
+                    
+        if delta:
+            events.append(("delta", self._current_key(), "".join(delta)))
+        return events
+        
+    def _current_key(self) -> str:
+        return "".join(self._key)
+        
+    def _finish_value(self, value: Any, events: List[Tuple[str, str, Any]]):
+        key = self._current_key()
+        self.fields[key] = value
+        events.append(("field", key, value))
+        self._state = _SEEK_KEY
+        
+    def _read_escape(self, ch: str) -> str:
+        """处理转义序列的一个字符，序列完整时返回解码后的文本"""
+        self._escape += ch
+        escape = self._escape
+        
+        if escape[0] != 'u':
+            self._escape = None
+            return _ESCAPES.get(escape, escape)
+            
+        if len(escape) < 5:
+            return ""
+            
+        self._escape = None
+        try:
+            code = int(escape[1:], 16)
+        except ValueError:
+            return ""
+            
+        # 代理对需要拼接两个 \uXXXX
+        if 0xD800 <= code <= 0xDBFF:
+            self._high_surrogate = code
+            return ""
+        if 0xDC00 <= code <= 0xDFFF and self._high_surrogate is not None:
+            code = 0x10000 + ((self._high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+        self._high_surrogate = None
+        return chr(code)
+        
+    @staticmethod
+    def _parse_scalar(text: str) -> Any:
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text
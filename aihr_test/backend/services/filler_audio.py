@@ -0,0 +1,115 @@
+"""
+应答垫音
+候选人说完后评估往往需要一两秒，期间没有任何声音。启动时把几句简短应答（"嗯，好的。"等）
+按当前音色合成一次并常驻内存，预计等待较长时先播放一句，填补评估期间的静默
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from .audio_cache import audio_cache
+from .metrics import metrics
+from .tts_service import TTSCallback, open_tts_connection
+from .tts_text import clean_text_for_tts
+
+logger = logging.getLogger(__name__)
+
+
+class FillerLibrary:
+    """
+    应答语音库
+    
+    每句应答只合成一次：先查音频缓存（重启后直接从磁盘读取），未命中时用一条
+    commit 模式的独立连接批量合成并写入缓存。片段按 TTS_VOICE 合成，更换音色后缓存键随之变化
+    """
+    
+    def __init__(self, texts: List[str]):
+        self.texts = [text.strip() for text in texts if text.strip()]
+        self.voice = settings.TTS_VOICE
+        self._clips: Dict[str, bytes] = {}
+        self._next = 0
+        self._lock = threading.Lock()
+        
+    @property
+    def ready(self) -> bool:
+        return bool(self._clips)
+        
+    def warm(self, timeout: float) -> int:
+        """
+        加载全部应答语音（阻塞，需在线程池中执行）
+        
+        Returns:
+            可用的应答条数
+        """
+        missing: List[Tuple[str, str]] = []
+        for text in self.texts:
+            clean_text = clean_text_for_tts(text)
+            pcm = None
+            if settings.AUDIO_CACHE_ENABLED:
+                pcm = audio_cache.get(audio_cache.key_for(clean_text))
+            if pcm:
+                self._store(text, pcm)
+            else:
+                missing.append((text, clean_text))
+                
+        if missing:
+            try:
+                self._synthesize(missing, timeout)
+            except Exception as e:
+                logger.error(f"Failed to synthesize filler audio: {e}")
+                
+        metrics.set_gauge("filler.clips", len(self._clips))
+        metrics.set_gauge("filler.bytes", sum(len(pcm) for pcm in self._clips.values()))
+        logger.info(f"Filler audio ready: {len(self._clips)}/{len(self.texts)} clips, voice={self.voice}")
+        return len(self._clips)
+        
+    def _synthesize(self, items: List[Tuple[str, str]], timeout: float):
+        """一次性提交全部文本，按提交顺序收集每段的完整 PCM"""
+        # 收集音频依赖按提交顺序创建响应，固定使用 commit 模式
+        callback = TTSCallback(mode="commit")
+        client = open_tts_connection(callback)
+        try:
+            waits = []
+            for text, clean_text in items:
+                done = threading.Event()
+                result: Dict[str, bytes] = {}
+                
+                def on_audio(pcm: bytes, result=result, done=done):
+                    result["pcm"] = pcm
+                    done.set()
+                    
+                client.append_text(clean_text)
+                callback.mark_committed(on_audio)
+                client.commit()
+                waits.append((text, clean_text, done, result))
+                
+            for text, clean_text, done, result in waits:
+                if not done.wait(timeout) or not result.get("pcm"):
+                    logger.warning(f"Filler audio not synthesized in time: {text}")
+                    continue
+                pcm = result["pcm"]
+                self._store(text, pcm)
+                if settings.AUDIO_CACHE_ENABLED:
+                    audio_cache.put(audio_cache.key_for(clean_text), pcm)
+        finally:
+            client.close()
+            
+    def _store(self, text: str, pcm: bytes):
+        with self._lock:
+            self._clips[text] = pcm
+            
+    def next_clip(self) -> Optional[Tuple[str, bytes]]:
+        """按顺序轮流取下一句应答，避免连续重复同一句"""
+        with self._lock:
+            available = [text for text in self.texts if text in self._clips]
+            if not available:
+                return None
+            text = available[self._next % len(available)]
+            self._next += 1
+            return text, self._clips[text]
+
+
+# 进程级应答语音库
+filler_library = FillerLibrary(settings.FILLER_TEXTS)
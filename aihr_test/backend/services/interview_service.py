@@ -3,12 +3,15 @@
 处理面试追问、评估、结束等核心逻辑
 """
 
+import asyncio
+import concurrent.futures
 import json
 import logging
 import re
+import threading
 import time
 from http import HTTPStatus
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
@@ -16,6 +19,9 @@ from dashscope import Generation
 import dashscope
 
 from config import settings
+from .decision_stream import DecisionStreamParser
+from .latency import evaluation_latency
+from .metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +46,7 @@ class InterviewState:
     is_finished: bool = False                # 是否已结束
     final_result: str = ""                   # 最终结果（PASS/FAIL）
     final_assessment: str = ""               # 最终评估说明
+    pending_filler: str = ""                 # 已播放、尚未写入对话历史的应答语
 
 
 @dataclass
@@ -50,6 +57,18 @@ class EvaluationResult:
     assessment: str
 
 
+@dataclass
+class StreamStats:
+    """流式生成统计"""
+    content: str = ""                        # 完整文本
+    input_tokens: int = 0                    # 输入 token 数
+    output_tokens: int = 0                   # 输出 token 数
+    first_token_ms: Optional[float] = None   # 首字延迟（毫秒）
+    cancelled: bool = False                  # 是否被取消
+    error: bool = False                      # 是否出错
+    fields: Dict[str, Any] = field(default_factory=dict)  # 结构化输出解析出的字段
+
+
 class InterviewService:
     """面试逻辑服务"""
     
@@ -102,6 +121,15 @@ class InterviewService:
 - 直接输出你要说的话，像正常聊天一样
 - 简洁有力，不要啰嗦
 - 可以简短肯定对方的回答，但不要过度夸奖
+{self._filler_hint()}"""
+
+    def _filler_hint(self) -> str:
+        """本轮已播放应答语时，提示模型不要重复确认"""
+        if not self.state.pending_filler:
+            return ""
+        return f"""
+【衔接】
+你已经先说了"{self.state.pending_filler}"，请直接接着说，不要再重复类似的确认语
 """
 
     def _get_conclusion_prompt(self) -> str:
@@ -129,7 +157,7 @@ class InterviewService:
 【重要提示】
 - 直接输出结束语，不要输出 JSON 或标记
 - 不要透露具体分数
-"""
+{self._filler_hint()}"""
 
     def _get_evaluator_prompt(self) -> str:
         """获取评估候选人的 System Prompt"""
@@ -174,6 +202,42 @@ class InterviewService:
 }}
 """
 
+    def _get_combined_prompt(self) -> str:
+        """获取评估与回复合并输出的 System Prompt"""
+        return f"""你是一个经验丰富的技术面试官，正在进行一场真实的面试对话。每轮你需要先评估候选人，再直接说出你的下一句话。
+当前考察主题：{self.state.topic}
+应聘岗位：{self.state.job_position}
+
+【评估标准】
+- 优秀(90-100)：回答全面、有深度，有真实经验，能应对深入追问
+- 良好(70-89)：基本概念清晰，有一定经验，但某些细节不够深入
+- 及格(60-69)：了解基础知识，但缺乏深度和实践经验
+- 不及格(0-59)：概念模糊、逻辑混乱、或明显在编造
+
+【决策规则】
+- 追问次数未达到 {settings.MIN_FOLLOWUP_QUESTIONS} 次时，必须选择 CONTINUE
+- 追问次数 >= {settings.MIN_FOLLOWUP_QUESTIONS} 且能力评分 >= {settings.PASS_SCORE_THRESHOLD}、展示出扎实的知识和经验时，选择 PASS
+- 追问次数 >= {settings.MIN_FOLLOWUP_QUESTIONS} 且明确表示不了解、连续回答空洞、逻辑矛盾或能力评分 < 60 时，选择 FAIL
+- 已达到最大追问次数 {settings.MAX_FOLLOWUP_QUESTIONS} 时，必须给出 PASS 或 FAIL
+- 其余情况选择 CONTINUE
+
+【speech 要求】
+- CONTINUE：像真人面试官一样自然地继续提问，回答笼统就追问细节，有漏洞就直接指出，回答很好就往深处问
+- PASS：简单肯定表现，告知本轮面试通过
+- FAIL：委婉指出不足，告知本轮未通过
+- 内容会通过语音合成播放：口语化，适当用逗号断句，不要表情符号、特殊符号和 Markdown
+- 不要使用"我来追问一个关键点"之类生硬的过渡语，不要透露分数
+
+【输出格式】
+你必须严格按照以下字段顺序输出 JSON，不要输出任何其他内容：
+{{
+    "action": "CONTINUE 或 PASS 或 FAIL",
+    "current_score": 0-100的能力评分,
+    "speech": "你接下来要对候选人说的话",
+    "assessment": "简短的评估说明（为什么做出这个决策）"
+}}
+{self._filler_hint()}"""
+
     def _format_conversation(self, messages: List[Dict]) -> str:
         """格式化对话历史，用于评估"""
         result = []
@@ -209,39 +273,67 @@ class InterviewService:
         opening_question = f"你好，我们今天主要聊一下{topic}这块。请先简单介绍一下你对{topic}的理解和实际使用经验吧。"
         
         # 添加到对话历史
-        self.state.conversation_history.append({
-            "role": "assistant",
-            "content": opening_question
-        })
+        self.append_assistant_message(opening_question)
         
         logger.info(f"Interview started: topic={topic}, position={job_position}")
         return opening_question
         
-    def evaluate_response(self, max_retries: int = 3) -> EvaluationResult:
-        """
-        评估候选人的回答
+    def _default_evaluation(self, assessment: str = "评估失败，默认继续") -> EvaluationResult:
+        """评估失败时的默认结果"""
+        return EvaluationResult(
+            action=InterviewAction.CONTINUE,
+            current_score=50,
+            assessment=assessment
+        )
         
-        Returns:
-            评估结果
-        """
-        eval_messages = [
+    def _build_eval_messages(self, history: List[Dict], followup_count: int) -> List[Dict]:
+        """构建评估请求的消息列表"""
+        return [
             {"role": "system", "content": self._get_evaluator_prompt()},
             {
                 "role": "user", 
                 "content": f"""请根据以下面试对话，评估候选人的能力水平。
 
 【对话记录】
-{self._format_conversation(self.state.conversation_history)}
+{self._format_conversation(history)}
 
 【当前状态】
-- 这是第 {self.state.followup_count}/{settings.MAX_FOLLOWUP_QUESTIONS} 次追问
-- {"已达到最大追问次数，请给出最终判定 PASS 或 FAIL" if self.state.followup_count >= settings.MAX_FOLLOWUP_QUESTIONS else "请判断是继续追问还是给出最终判定"}
+- 这是第 {followup_count}/{settings.MAX_FOLLOWUP_QUESTIONS} 次追问
+- {"已达到最大追问次数，请给出最终判定 PASS 或 FAIL" if followup_count >= settings.MAX_FOLLOWUP_QUESTIONS else "请判断是继续追问还是给出最终判定"}
 
 请给出你的评估结果（JSON格式）："""
             }
         ]
         
+    def evaluate_response(
+        self,
+        max_retries: int = 3,
+        history: Optional[List[Dict]] = None,
+        followup_count: Optional[int] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> EvaluationResult:
+        """
+        评估候选人的回答（同步方法，会阻塞调用线程）
+        
+        Args:
+            max_retries: 最大重试次数
+            history: 对话历史快照，默认使用当前状态
+            followup_count: 追问次数快照，默认使用当前状态
+            cancel_event: 取消信号，置位后不再重试
+            
+        Returns:
+            评估结果
+        """
+        if history is None:
+            history = self.state.conversation_history
+        if followup_count is None:
+            followup_count = self.state.followup_count
+        eval_messages = self._build_eval_messages(history, followup_count)
+        
         for attempt in range(max_retries):
+            if cancel_event is not None and cancel_event.is_set():
+                return self._default_evaluation("评估已取消，默认继续")
+                
             try:
                 response = Generation.call(
                     model=settings.LLM_MODEL,
@@ -275,79 +367,216 @@ class InterviewService:
                     
             except json.JSONDecodeError:
                 if attempt < max_retries - 1:
-                    time.sleep(1)
+                    self._backoff(1, cancel_event)
                 else:
-                    return EvaluationResult(
-                        action=InterviewAction.CONTINUE,
-                        current_score=50,
-                        assessment="评估失败，默认继续"
-                    )
+                    return self._default_evaluation()
             except Exception as e:
                 if attempt < max_retries - 1:
-                    time.sleep(2 ** attempt)
+                    self._backoff(2 ** attempt, cancel_event)
                 else:
                     logger.error(f"Evaluation failed: {e}")
-                    return EvaluationResult(
-                        action=InterviewAction.CONTINUE,
-                        current_score=50,
-                        assessment="评估失败，默认继续"
-                    )
+                    return self._default_evaluation()
         
-        return EvaluationResult(
-            action=InterviewAction.CONTINUE,
-            current_score=50,
-            assessment="评估失败，默认继续"
-        )
+        return self._default_evaluation()
         
-    def generate_followup_stream(self, output_queue):
+    @staticmethod
+    def _backoff(seconds: float, cancel_event: Optional[threading.Event]):
+        """重试退避，收到取消信号时立即返回"""
+        if cancel_event is not None:
+            cancel_event.wait(seconds)
+        else:
+            time.sleep(seconds)
+            
+    async def evaluate_response_async(
+        self,
+        executor: Optional[concurrent.futures.Executor] = None,
+        timeout: Optional[float] = None,
+        history: Optional[List[Dict]] = None,
+        followup_count: Optional[int] = None
+    ) -> EvaluationResult:
         """
-        流式生成追问（同步方法，用于在线程池中执行）
+        异步评估候选人的回答
+        
+        在线程池中执行阻塞的评估请求，事件循环不会被阻塞；
+        超时后返回默认结果，后台线程收到取消信号后不再重试
         
         Args:
-            output_queue: 输出队列，用于传递生成的文本片段
+            executor: 执行评估的线程池（应与音频、TTS 使用的线程池分开），默认使用事件循环的默认线程池
+            timeout: 超时时间（秒），默认使用 settings.EVALUATION_TIMEOUT；排队等待的时间也计入
+            history: 对话历史快照，默认取当前状态
+            followup_count: 追问次数快照，默认取当前状态
+            
+        Returns:
+            评估结果
         """
-        messages = [
-            {"role": "system", "content": self._get_followup_prompt()},
-        ] + self.state.conversation_history
+        if timeout is None:
+            timeout = settings.EVALUATION_TIMEOUT
+            
+        loop = asyncio.get_running_loop()
+        cancel_event = threading.Event()
+        # 在事件循环线程中取快照，避免后台线程读到后续修改
+        if history is None:
+            history = list(self.state.conversation_history)
+        if followup_count is None:
+            followup_count = self.state.followup_count
         
-        try:
-            responses = Generation.call(
-                model=settings.LLM_MODEL,
-                messages=messages,
-                result_format="message",
-                temperature=0.3,
-                stream=True,
-                incremental_output=True,
+        start_time = time.perf_counter()
+        
+        def run() -> EvaluationResult:
+            # 评估线程池有上限，并发评估较多时需要排队
+            metrics.observe("evaluation.queue_ms", (time.perf_counter() - start_time) * 1000)
+            return self.evaluate_response(
+                history=history,
+                followup_count=followup_count,
+                cancel_event=cancel_event
             )
             
-            content_parts = []
+        future = loop.run_in_executor(executor, run)
+        
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Evaluation timed out after {timeout}s, continue by default")
+            metrics.incr("evaluation.timeouts")
+            return self._default_evaluation("评估超时，默认继续")
+        finally:
+            cancel_event.set()
+            duration_ms = (time.perf_counter() - start_time) * 1000
+            metrics.observe("evaluation.duration_ms", duration_ms)
+            evaluation_latency.update(duration_ms)
+        
+    def _stream_completion(
+        self,
+        messages: List[Dict],
+        output_queue,
+        cancel_event: Optional[threading.Event] = None,
+        on_text: Optional[Callable[[str], None]] = None,
+        **call_kwargs
+    ) -> StreamStats:
+        """
+        发起流式请求，将文本片段写入输出队列
+        
+        出错时向队列写入 error；收到取消信号时停止读取剩余输出
+        
+        Args:
+            messages: 消息列表
+            output_queue: 输出队列
+            cancel_event: 取消信号
+            on_text: 自定义文本片段处理，不指定时直接写入输出队列
+            call_kwargs: 额外的请求参数
+            
+        Returns:
+            生成统计（完整文本、token 用量、首字延迟）
+        """
+        stats = StreamStats()
+        start_time = time.perf_counter()
+        
+        responses = Generation.call(
+            model=settings.LLM_MODEL,
+            messages=messages,
+            result_format="message",
+            temperature=0.3,
+            stream=True,
+            incremental_output=True,
+            **call_kwargs
+        )
+        
+        content_parts = []
+        try:
             for resp in responses:
+                if cancel_event is not None and cancel_event.is_set():
+                    stats.cancelled = True
+                    break
+                    
                 if resp.status_code == HTTPStatus.OK:
                     content = resp.output.choices[0].message.content
+                    if stats.first_token_ms is None:
+                        stats.first_token_ms = (time.perf_counter() - start_time) * 1000
                     content_parts.append(content)
-                    output_queue.put({'type': 'text', 'content': content})
+                    if on_text is not None:
+                        on_text(content)
+                    else:
+                        output_queue.put({'type': 'text', 'content': content})
+                    
+                    usage = getattr(resp, 'usage', None)
+                    if usage:
+                        stats.input_tokens = getattr(usage, 'input_tokens', 0) or 0
+                        stats.output_tokens = getattr(usage, 'output_tokens', 0) or 0
                     
                     if resp.output.choices[0].finish_reason == "stop":
                         break
                 else:
+                    stats.error = True
                     output_queue.put({
                         'type': 'error',
                         'content': f"请求失败: code={resp.code}, message={resp.message}"
                     })
-                    return
+                    break
+        finally:
+            # 提前退出时关闭流，不再接收剩余输出
+            close = getattr(responses, 'close', None)
+            if close:
+                close()
+                
+        stats.content = "".join(content_parts)
+        return stats
+        
+    def append_assistant_message(self, content: str):
+        """添加面试官发言到对话历史，本轮已播放的应答语并入同一条发言"""
+        filler, self.state.pending_filler = self.state.pending_filler, ""
+        self.state.conversation_history.append({
+            "role": "assistant",
+            "content": filler + content
+        })
+        
+    def generate_followup_stream(
+        self,
+        output_queue,
+        cancel_event: Optional[threading.Event] = None,
+        record_history: bool = True
+    ) -> StreamStats:
+        """
+        流式生成追问（同步方法，用于在线程池中执行）
+        
+        Args:
+            output_queue: 输出队列，用于传递生成的文本片段
+            cancel_event: 取消信号，置位后停止生成
+            record_history: 是否将追问写入对话历史；预生成的追问由调用方决定是否采用
             
-            full_content = "".join(content_parts)
-            self.state.conversation_history.append({
-                "role": "assistant",
-                "content": full_content
-            })
-            output_queue.put({'type': 'done'})
+        Returns:
+            生成统计
+        """
+        messages = [
+            {"role": "system", "content": self._get_followup_prompt()},
+        ] + self.state.conversation_history
+        
+        try:
+            stats = self._stream_completion(messages, output_queue, cancel_event)
+            if stats.cancelled:
+                # 被打断时保留已说出的部分，下一轮模型知道追问到了哪里
+                if record_history and stats.content:
+                    self.append_assistant_message(stats.content)
+                return stats
+            if stats.error:
+                return stats
+                
+            if record_history:
+                self.append_assistant_message(stats.content)
+            output_queue.put({'type': 'done', 'content': stats.content})
+            return stats
             
         except Exception as e:
             logger.error(f"Failed to generate followup: {e}")
             output_queue.put({'type': 'error', 'content': str(e)})
+            return StreamStats(error=True)
             
-    def generate_conclusion_stream(self, action: str, assessment: str, output_queue):
+    def generate_conclusion_stream(
+        self,
+        action: str,
+        assessment: str,
+        output_queue,
+        cancel_event: Optional[threading.Event] = None
+    ) -> StreamStats:
         """
         流式生成结束语（同步方法，用于在线程池中执行）
         
@@ -355,6 +584,10 @@ class InterviewService:
             action: PASS 或 FAIL
             assessment: 评估说明
             output_queue: 输出队列
+            cancel_event: 取消信号，置位后停止生成
+            
+        Returns:
+            生成统计
         """
         messages = [
             {"role": "system", "content": self._get_conclusion_prompt()},
@@ -373,41 +606,108 @@ class InterviewService:
         ]
         
         try:
-            responses = Generation.call(
-                model=settings.LLM_MODEL,
-                messages=messages,
-                result_format="message",
-                temperature=0.3,
-                stream=True,
-                incremental_output=True,
-            )
+            stats = self._stream_completion(messages, output_queue, cancel_event)
+            if stats.error or stats.cancelled:
+                return stats
+                
+            self.append_assistant_message(stats.content)
+            output_queue.put({'type': 'done', 'content': stats.content})
+            return stats
             
-            content_parts = []
-            for resp in responses:
-                if resp.status_code == HTTPStatus.OK:
-                    content = resp.output.choices[0].message.content
-                    content_parts.append(content)
-                    output_queue.put({'type': 'text', 'content': content})
-                    
-                    if resp.output.choices[0].finish_reason == "stop":
-                        break
-                else:
-                    output_queue.put({
-                        'type': 'error',
-                        'content': f"请求失败: code={resp.code}, message={resp.message}"
-                    })
-                    return
+        except Exception as e:
+            logger.error(f"Failed to generate conclusion: {e}")
+            output_queue.put({'type': 'error', 'content': str(e)})
+            return StreamStats(error=True)
             
-            full_content = "".join(content_parts)
-            self.state.conversation_history.append({
-                "role": "assistant",
-                "content": full_content
+    def generate_combined_stream(
+        self,
+        output_queue,
+        cancel_event: Optional[threading.Event] = None
+    ) -> StreamStats:
+        """
+        单次请求完成评估与回复（同步方法，用于在线程池中执行）
+        
+        流式输出的 JSON 先给出 action、current_score，随后是要说的话：
+        决策字段解析完成后立即写入 {'type': 'decision'}，之后的话术以 text 片段写入，
+        调用方可以在话术开始前确认决策、立刻开始语音合成。对话历史由调用方写入
+        
+        Args:
+            output_queue: 输出队列
+            cancel_event: 取消信号，置位后停止生成
+            
+        Returns:
+            生成统计，content 为话术文本，fields 为解析出的全部字段
+        """
+        messages = [
+            {"role": "system", "content": self._get_combined_prompt()},
+            {
+                "role": "user",
+                "content": f"""【对话记录】
+{self._format_conversation(self.state.conversation_history)}
+
+【当前状态】
+- 这是第 {self.state.followup_count}/{settings.MAX_FOLLOWUP_QUESTIONS} 次追问
+
+请输出 JSON："""
+            }
+        ]
+        
+        parser = DecisionStreamParser(streaming_field="speech")
+        speech_parts = []
+        decision_sent = False
+        
+        def send_decision():
+            nonlocal decision_sent
+            decision_sent = True
+            action_str = str(parser.fields.get("action", "")).upper()
+            try:
+                score = int(parser.fields.get("current_score", 50))
+            except (TypeError, ValueError):
+                score = 50
+            output_queue.put({
+                'type': 'decision',
+                'action': action_str if action_str in InterviewAction.__members__ else InterviewAction.CONTINUE.value,
+                'current_score': score
             })
-            output_queue.put({'type': 'done'})
+            
+        def on_text(content: str):
+            for kind, key, value in parser.feed(content):
+                if kind == "field" and not decision_sent and \
+                   "action" in parser.fields and "current_score" in parser.fields:
+                    send_decision()
+                    # 字段顺序不符时先缓存的话术
+                    for text in speech_parts:
+                        output_queue.put({'type': 'text', 'content': text})
+                elif kind == "delta":
+                    speech_parts.append(value)
+                    if not decision_sent and "action" in parser.fields:
+                        # 没有给出评分，话术开始时即确认决策
+                        send_decision()
+                        for text in speech_parts[:-1]:
+                            output_queue.put({'type': 'text', 'content': text})
+                    if decision_sent:
+                        output_queue.put({'type': 'text', 'content': value})
+                    
+        try:
+            stats = self._stream_completion(
+                messages,
+                output_queue,
+                cancel_event,
+                on_text=on_text,
+                response_format={"type": "json_object"}
+            )
+            stats.content = "".join(speech_parts)
+            stats.fields = dict(parser.fields)
+            if stats.error or stats.cancelled:
+                return stats
+                
+            output_queue.put({'type': 'done', 'content': stats.content})
+            return stats
             
         except Exception as e:
-            logger.error(f"Failed to generate conclusion: {e}")
+            logger.error(f"Failed to generate combined response: {e}")
             output_queue.put({'type': 'error', 'content': str(e)})
+            return StreamStats(error=True)
             
     def process_candidate_response(self, response: str) -> Tuple[str, Optional[EvaluationResult]]:
         """
@@ -421,21 +721,68 @@ class InterviewService:
             action: "followup" | "pass" | "fail"
             evaluation_result: 评估结果（仅当面试结束时返回）
         """
-        if not self.state.is_started or self.state.is_finished:
+        if not self.record_candidate_response(response):
             return "error", None
             
+        # 评估
+        evaluation = self.evaluate_response()
+        return self.decide_next_action(evaluation), evaluation
+        
+    async def process_candidate_response_async(
+        self,
+        response: str,
+        executor: Optional[concurrent.futures.Executor] = None,
+        timeout: Optional[float] = None
+    ) -> Tuple[str, Optional[EvaluationResult]]:
+        """
+        处理候选人的回答（异步版本，评估在线程池中执行）
+        
+        Args:
+            response: 候选人的回答
+            executor: 执行评估的线程池
+            timeout: 评估超时时间（秒）
+            
+        Returns:
+            (action, evaluation_result)，含义同 process_candidate_response
+        """
+        if not self.record_candidate_response(response):
+            return "error", None
+            
+        evaluation = await self.evaluate_response_async(executor=executor, timeout=timeout)
+        return self.decide_next_action(evaluation), evaluation
+        
+    def record_candidate_response(self, response: str) -> bool:
+        """
+        记录候选人的回答
+        
+        Returns:
+            面试未开始或已结束时返回 False
+        """
+        if not self.state.is_started or self.state.is_finished:
+            return False
+            
         # 添加候选人回答到对话历史
         self.state.conversation_history.append({
             "role": "user",
             "content": response
         })
         self.state.followup_count += 1
+        return True
         
-        # 评估
-        evaluation = self.evaluate_response()
+    def record_evaluation(self, evaluation: EvaluationResult, followup_count: Optional[int] = None):
+        """记录评估得分（不改变决策）"""
         self.state.current_score = evaluation.current_score
+        count = self.state.followup_count if followup_count is None else followup_count
+        logger.info(f"Evaluation: score={evaluation.current_score}, action={evaluation.action.value}, count={count}")
+        
+    def decide_next_action(self, evaluation: EvaluationResult) -> str:
+        """
+        根据评估结果决定下一步动作
         
-        logger.info(f"Evaluation: score={evaluation.current_score}, action={evaluation.action.value}, count={self.state.followup_count}")
+        Returns:
+            "followup" | "pass" | "fail"
+        """
+        self.record_evaluation(evaluation)
         
         # 决策逻辑
         reached_min = self.state.followup_count >= settings.MIN_FOLLOWUP_QUESTIONS
@@ -445,7 +792,7 @@ class InterviewService:
         if not reached_min:
             # 未达到最少追问次数，无论表现如何都继续追问
             logger.info(f"Continue interview: not reached min questions ({self.state.followup_count}/{settings.MIN_FOLLOWUP_QUESTIONS})")
-            return "followup", evaluation
+            return "followup"
         
         # 达到最少追问次数后，根据评估结果决定
         if evaluation.action == InterviewAction.PASS or \
@@ -454,7 +801,7 @@ class InterviewService:
             self.state.is_finished = True
             self.state.final_result = "PASS"
             self.state.final_assessment = evaluation.assessment
-            return "pass", evaluation
+            return "pass"
             
         elif evaluation.action == InterviewAction.FAIL or \
              (reached_max and evaluation.current_score < settings.PASS_SCORE_THRESHOLD):
@@ -462,11 +809,11 @@ class InterviewService:
             self.state.is_finished = True
             self.state.final_result = "FAIL"
             self.state.final_assessment = evaluation.assessment
-            return "fail", evaluation
+            return "fail"
             
         else:
             # 继续追问
-            return "followup", evaluation
+            return "followup"
             
     def get_interview_result(self) -> Dict:
         """获取面试结果"""
@@ -0,0 +1,33 @@
+"""
+等待时长估计
+按实际耗时持续更新的估计值，评估服务负责记录，应答垫音等按估计值决定是否需要填补等待
+"""
+
+import threading
+
+from config import settings
+
+
+class LatencyEstimator:
+    """耗时估计：指数加权移动平均（线程安全）"""
+    
+    def __init__(self, alpha: float, initial_ms: float):
+        self.alpha = alpha
+        self._value = initial_ms
+        self._lock = threading.Lock()
+        
+    def update(self, duration_ms: float):
+        """记录一次实际耗时"""
+        with self._lock:
+            self._value += self.alpha * (duration_ms - self._value)
+            
+    @property
+    def value(self) -> float:
+        """当前估计值（毫秒）"""
+        return self._value
+
+
+# 候选人说完到能开始回复之间需要等待的耗时估计：
+# 分开评估时等待评估完成，合并模式等待决策字段解析出来
+evaluation_latency = LatencyEstimator(settings.FILLER_EWMA_ALPHA, settings.FILLER_INITIAL_ESTIMATE_MS)
+decision_latency = LatencyEstimator(settings.FILLER_EWMA_ALPHA, settings.FILLER_INITIAL_ESTIMATE_MS)
@@ -5,7 +5,6 @@ LLM 服务
 """
 
 import logging
-import queue
 from http import HTTPStatus
 from typing import List, Dict, Optional
 
@@ -13,6 +12,7 @@ from dashscope import Generation
 import dashscope
 
 from config import settings
+from .async_queue import AsyncBridgeQueue
 
 logger = logging.getLogger(__name__)
 
@@ -50,7 +50,7 @@ class LLMService:
         self.conversation_history = []
         logger.info("Conversation history cleared")
         
-    def generate_stream_sync(self, user_input: str, output_queue: queue.Queue):
+    def generate_stream_sync(self, user_input: str, output_queue: AsyncBridgeQueue):
         """
         流式生成回复（同步方法，用于在线程池中执行）
         
@@ -0,0 +1,116 @@
+"""
+会话清理
+会话结束时需要归还或关闭 ASR/TTS 连接，关闭连接是阻塞的网络调用，在事件循环中执行会让同一进程的其他会话一起卡住。
+WebSocket 处理函数结束时只把清理函数交给回收器，由后台回收任务在专用线程池中执行：
+同时进行的清理不超过 SESSION_TEARDOWN_CONCURRENCY 个，集中断开时不占用 LLM/ASR/TTS 共用的线程池。
+线程中的清理无法中止，超过 SESSION_TEARDOWN_TIMEOUT 秒只记为超时，名额保留到清理结束，占用的线程数始终不超过上限
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import time
+from typing import Callable, Optional, Set
+
+from config import settings
+from .async_queue import AsyncBridgeQueue
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class SessionReaper:
+    """进程内一个：排队执行会话清理，并发数受限"""
+    
+    def __init__(self, concurrency: Optional[int] = None, timeout: Optional[float] = None):
+        self._concurrency = max(1, concurrency or settings.SESSION_TEARDOWN_CONCURRENCY)
+        self._timeout = timeout or settings.SESSION_TEARDOWN_TIMEOUT
+        # 线程数与名额数相同：取得名额的清理立即执行，不会在线程池中排队
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self._concurrency, thread_name_prefix="teardown"
+        )
+        self._queue: Optional[AsyncBridgeQueue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._running: Set[asyncio.Task] = set()
+        self._idle: Optional[asyncio.Event] = None
+        self.pending = 0                # 排队与进行中的清理数
+        self.overdue = 0                # 已超时但仍在执行的清理数
+        
+    def start(self) -> asyncio.Task:
+        """创建回收任务（服务启动时在事件循环中调用）"""
+        self._queue = AsyncBridgeQueue("teardown")
+        self._slots = asyncio.Semaphore(self._concurrency)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        return asyncio.create_task(self.run())
+        
+    def submit(self, session_id: str, teardown: Callable[[], None]):
+        """
+        排队一个会话的清理，立即返回
+        
+        Args:
+            session_id: 会话 ID，用于日志
+            teardown: 同步清理函数，在线程池中执行
+        """
+        self.pending += 1
+        self._idle.clear()
+        metrics.set_gauge("session.teardown_pending", self.pending)
+        self._queue.put_nowait((session_id, teardown, time.perf_counter()))
+        
+    async def run(self):
+        """回收任务（服务运行期间常驻）：取得名额后执行下一个清理"""
+        while True:
+            session_id, teardown, queued_at = await self._queue.get()
+            await self._slots.acquire()
+            task = asyncio.create_task(self._teardown(session_id, teardown, queued_at))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            
+    async def _teardown(self, session_id: str, teardown: Callable[[], None], queued_at: float):
+        started = time.perf_counter()
+        metrics.observe("session.teardown_wait_ms", (started - queued_at) * 1000)
+        future = asyncio.get_running_loop().run_in_executor(self._executor, teardown)
+        try:
+            try:
+                await asyncio.wait_for(asyncio.shield(future), self._timeout)
+            except asyncio.TimeoutError:
+                # 线程无法中止：记为超时，名额保留到清理结束
+                metrics.incr("session.teardown_timeouts")
+                logger.warning(f"Session {session_id}: Teardown still running after {self._timeout}s")
+                self.overdue += 1
+                metrics.set_gauge("session.teardown_overdue", self.overdue)
+                try:
+                    await future
+                finally:
+                    self.overdue -= 1
+                    metrics.set_gauge("session.teardown_overdue", self.overdue)
+        except Exception as e:
+            metrics.incr("session.teardown_errors")
+            logger.error(f"Session {session_id}: Teardown error - {e}")
+        finally:
+            self._slots.release()
+            self.pending -= 1
+            metrics.set_gauge("session.teardown_pending", self.pending)
+            metrics.observe("session.teardown_ms", (time.perf_counter() - started) * 1000)
+            if self.pending == 0:
+                self._idle.set()
+                
+    async def drain(self, timeout: float) -> bool:
+        """
+        等待排队与进行中的清理完成（服务关闭时调用）
+        
+        Returns:
+            是否在超时前全部完成
+        """
+        if self._idle is None:
+            return True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            logger.warning(f"{self.pending} session teardowns still pending at shutdown")
+            return False
+            
+    def close(self):
+        """关闭专用线程池（服务关闭时调用，不等待仍在执行的清理）"""
+        self._executor.shutdown(wait=False)
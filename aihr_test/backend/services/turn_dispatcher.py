@@ -0,0 +1,65 @@
+"""
+会话轮次调度
+接收循环只负责读取客户端消息：上行音频直接送入攒批器，需要较长时间的处理（结束输入后的识别与回复、
+文本输入等）交给调度器排队。调度器按提交顺序逐个执行，同一会话同一时间只处理一个轮次，
+处理期间接收循环照常读取音频与控制消息，插话打断与上行音频都不再被整轮回复阻塞
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from .async_queue import AsyncBridgeQueue
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class TurnDispatcher:
+    """
+    每会话一个的轮次调度器
+    
+    submit 在接收循环中调用，只入队、不等待；run 所在的任务依次取出，每项作为独立任务运行并等待其完成，
+    current 为正在执行的任务。run 被取消（会话结束）时正在执行的任务一并取消
+    """
+    
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.current: Optional[asyncio.Task] = None
+        self._queue = AsyncBridgeQueue("dispatch")
+        
+    @property
+    def busy(self) -> bool:
+        """是否有正在执行或排队的轮次"""
+        return self.current is not None or not self._queue.empty()
+        
+    def submit(self, label: str, func: Callable[..., Awaitable[Any]], *args):
+        """
+        排队一项处理
+        
+        Args:
+            label: 消息类型，用于日志与指标
+            func: 协程函数，按提交顺序以 func(*args) 执行
+        """
+        if self.busy:
+            metrics.incr("dispatch.queued_behind")
+        self._queue.put_nowait((label, func, args))
+        
+    async def run(self):
+        """调度任务（会话期间常驻，会话结束时取消）"""
+        while True:
+            label, func, args = await self._queue.get()
+            started = time.perf_counter()
+            self.current = asyncio.create_task(func(*args), name=f"{self.session_id}:{label}")
+            try:
+                await self.current
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                metrics.incr(f"dispatch.errors.{label}")
+                logger.error(f"Session {self.session_id}: Error processing {label} - {e}")
+            finally:
+                self.current = None
+                metrics.incr(f"dispatch.jobs.{label}")
+                metrics.observe(f"dispatch.job_ms.{label}", (time.perf_counter() - started) * 1000)
@@ -0,0 +1,233 @@
+"""
+WebSocket 音频帧协议
+客户端握手时请求子协议 pcm.v1 后，音频改用二进制帧收发：
+8 字节小端头（流 ID uint16、保留 uint16、序号 uint32）后接原始 16bit PCM，控制消息仍为 JSON 文本帧。
+请求 opus.v1 且服务端可用 Opus 时，帧头不变，帧体换成一个 Opus 包（见 audio_codec.py）。
+未协商子协议的客户端继续使用 base64 JSON（audio.input / audio.delta）
+"""
+
+import asyncio
+import base64
+import json
+import logging
+import struct
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from fastapi import WebSocket
+
+from config import settings
+from .audio_codec import OPUS_SUBPROTOCOL, OpusDecoderStream, OpusEncoderStream, codec_executor, opus_available
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+BINARY_SUBPROTOCOL = "pcm.v1"
+
+# 流 ID、保留字段、序号
+FRAME_HEADER = struct.Struct("<HHI")
+
+# 每会话码率直方图分桶（kbps）
+KBPS_BUCKETS = (16, 32, 64, 128, 256, 384, 512, 768)
+
+
+def select_subprotocol(requested: Iterable[str]) -> Optional[str]:
+    """从客户端请求的子协议中选出支持的一个（Opus 优先），没有则返回 None（使用 JSON 音频）"""
+    requested = list(requested)
+    if OPUS_SUBPROTOCOL in requested and opus_available():
+        return OPUS_SUBPROTOCOL
+    return BINARY_SUBPROTOCOL if BINARY_SUBPROTOCOL in requested else None
+
+
+def pack_audio_frame(stream_id: int, sequence: int, pcm: bytes) -> bytes:
+    """打包一个二进制音频帧"""
+    return FRAME_HEADER.pack(stream_id & 0xFFFF, 0, sequence & 0xFFFFFFFF) + pcm
+
+
+def unpack_audio_frame(frame: bytes) -> Tuple[int, int, memoryview]:
+    """
+    解析二进制音频帧
+    
+    Returns:
+        (流 ID, 序号, PCM)
+        
+    Raises:
+        ValueError: 帧长度不足一个帧头
+    """
+    if len(frame) < FRAME_HEADER.size:
+        raise ValueError(f"audio frame too short: {len(frame)} bytes")
+    stream_id, _, sequence = FRAME_HEADER.unpack_from(frame)
+    return stream_id, sequence, memoryview(frame)[FRAME_HEADER.size:]
+
+
+class AudioChannel:
+    """
+    一条连接上的音频收发
+    
+    按握手结果选择 Opus、二进制帧或 base64 JSON，统计各编码的帧数、PCM 字节数、
+    实际传输字节数与编解码耗时，便于直接对比；二进制上行帧按序号检查丢帧与乱序。
+    Opus 编解码器有状态，所有编码操作在同一把锁内按顺序提交到编解码线程池
+    """
+    
+    def __init__(self, websocket: WebSocket, subprotocol: Optional[str] = None):
+        self.websocket = websocket
+        self.opus = subprotocol == OPUS_SUBPROTOCOL
+        self.binary = subprotocol is not None
+        self.encoding = "opus" if self.opus else "binary" if self.binary else "json"
+        self._out_stream = 0
+        self._out_sequence = 0
+        self._in_stream: Optional[int] = None
+        self._in_sequence = 0
+        self._encoder: Optional[OpusEncoderStream] = None
+        self._decoder: Optional[OpusDecoderStream] = None
+        self._encode_lock = asyncio.Lock()
+        if self.opus:
+            self._encoder = OpusEncoderStream(settings.TTS_SAMPLE_RATE, settings.OPUS_FRAME_MS, settings.OPUS_BITRATE)
+            self._decoder = OpusDecoderStream(settings.ASR_SAMPLE_RATE)
+        # 本会话累计：PCM 字节、传输字节、编解码 CPU 时间（秒）
+        self._payload_bytes = {"in": 0, "out": 0}
+        self._wire_bytes = {"in": 0, "out": 0}
+        self._codec_cpu = 0.0
+        
+    @property
+    def pending(self) -> bool:
+        """是否有不足一帧、尚未发出的下行音频（仅 Opus）"""
+        return self._encoder is not None and self._encoder.pending
+        
+    async def next_stream(self, discard: bool = False):
+        """
+        开始新的下行音频流（新一轮回复或插话打断后），序号从 0 重新计数
+        
+        Args:
+            discard: 丢弃尚未编码的尾部（插话打断时旧音频不再播放）
+        """
+        async with self._encode_lock:
+            if discard and self._encoder is not None:
+                self._encoder.flush()
+            self._out_stream = (self._out_stream + 1) & 0xFFFF
+            self._out_sequence = 0
+            
+    async def send(self, pcm: bytes):
+        """下发一段 TTS 音频"""
+        if self.opus:
+            # 环形缓冲区的切片发送完成后会被覆盖，交给编码线程前先复制
+            await self._send_opus(self._encoder.encode, bytes(pcm))
+            return
+            
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        if self.binary:
+            frame = pack_audio_frame(self._out_stream, self._out_sequence, pcm)
+            self._out_sequence += 1
+            self._record("out", self.encoding, len(pcm), len(frame), start, time.thread_time() - cpu_start)
+            await self.websocket.send_bytes(frame)
+        else:
+            # 与 send_json 相同的序列化方式，单独计时
+            text = json.dumps(
+                {"type": "audio.delta", "data": base64.b64encode(pcm).decode("ascii")},
+                separators=(",", ":")
+            )
+            self._record("out", self.encoding, len(pcm), len(text), start, time.thread_time() - cpu_start)
+            await self.websocket.send_text(text)
+            
+    async def flush(self):
+        """发出不足一帧的尾部（Opus 下行音频暂停时调用）"""
+        if self.pending:
+            await self._send_opus(self._encoder.flush)
+            
+    async def _send_opus(self, encode, *args):
+        """在编解码线程池中编码，每个 Opus 包一帧发出"""
+        loop = asyncio.get_event_loop()
+        start = time.perf_counter()
+        async with self._encode_lock:
+            payload_bytes = len(args[0]) if args else 0
+            packets, cpu = await loop.run_in_executor(codec_executor, encode, *args)
+            frames: List[bytes] = []
+            for packet in packets:
+                frames.append(pack_audio_frame(self._out_stream, self._out_sequence, packet))
+                self._out_sequence += 1
+        self._record("out", "opus", payload_bytes, sum(len(frame) for frame in frames), start, cpu, len(frames))
+        for frame in frames:
+            await self.websocket.send_bytes(frame)
+            
+    async def decode_frame(self, frame: bytes) -> Optional[bytes]:
+        """解析客户端上行的二进制音频帧（Opus 包在编解码线程池中解码），帧无效时返回 None"""
+        start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            stream_id, sequence, payload = unpack_audio_frame(frame)
+        except ValueError as e:
+            logger.warning(f"Dropped malformed audio frame: {e}")
+            metrics.incr("ws.audio_in.malformed_frames")
+            return None
+            
+        if stream_id != self._in_stream:
+            self._in_stream = stream_id
+        elif sequence != self._in_sequence:
+            metrics.incr("ws.audio_in.sequence_gaps")
+        self._in_sequence = (sequence + 1) & 0xFFFFFFFF
+        
+        if not self.opus:
+            self._record("in", "binary", len(payload), len(frame), start, time.thread_time() - cpu_start)
+            return payload
+            
+        loop = asyncio.get_event_loop()
+        try:
+            pcm, cpu = await loop.run_in_executor(codec_executor, self._decoder.decode, payload)
+        except Exception as e:
+            logger.warning(f"Dropped undecodable opus packet: {e}")
+            metrics.incr("ws.audio_in.malformed_frames")
+            return None
+        self._record("in", "opus", len(pcm), len(frame), start, cpu)
+        return pcm
+        
+    def decode_message(self, audio_b64: str, text_size: int, start: float) -> bytes:
+        """
+        解析 JSON 上行的 audio.input
+        
+        Args:
+            audio_b64: data 字段
+            text_size: 整条文本消息的长度
+            start: 开始解析 JSON 的时间，编解码耗时包含 JSON 解析
+        """
+        cpu_start = time.thread_time()
+        pcm = base64.b64decode(audio_b64)
+        self._record("in", "json", len(pcm), text_size, start, time.thread_time() - cpu_start)
+        return pcm
+        
+    def _record(self, direction: str, encoding: str, payload_bytes: int, wire_bytes: int,
+                start: float, cpu: float, frames: int = 1):
+        self._payload_bytes[direction] += payload_bytes
+        self._wire_bytes[direction] += wire_bytes
+        self._codec_cpu += cpu
+        prefix = f"ws.audio_{direction}"
+        metrics.incr(f"{prefix}.frames.{encoding}", frames)
+        metrics.incr(f"{prefix}.payload_bytes.{encoding}", payload_bytes)
+        metrics.incr(f"{prefix}.wire_bytes.{encoding}", wire_bytes)
+        metrics.incr(f"{prefix}.codec_us.{encoding}", int((time.perf_counter() - start) * 1e6))
+        
+    def report(self) -> str:
+        """
+        会话结束时记录本会话的音频码率与编解码 CPU
+        
+        码率按音频时长计算（传输比特数 / 音频秒数），反映说话期间实际占用的带宽
+        
+        Returns:
+            用于日志的摘要
+        """
+        rates = {"in": settings.ASR_SAMPLE_RATE * 2, "out": settings.TTS_SAMPLE_RATE * 2}
+        parts = []
+        audio_seconds = 0.0
+        for direction, bytes_per_second in rates.items():
+            seconds = self._payload_bytes[direction] / bytes_per_second
+            audio_seconds += seconds
+            if seconds <= 0:
+                continue
+            kbps = self._wire_bytes[direction] * 8 / seconds / 1000
+            metrics.observe(f"session.audio_{direction}_kbps.{self.encoding}", kbps, buckets=KBPS_BUCKETS)
+            parts.append(f"{direction} {kbps:.0f} kbps / {seconds:.1f}s")
+        if audio_seconds > 0:
+            cpu_per_second = self._codec_cpu * 1000 / audio_seconds
+            metrics.observe(f"session.codec_cpu_ms_per_s.{self.encoding}", cpu_per_second)
+            parts.append(f"codec {self._codec_cpu * 1000:.1f} ms CPU ({cpu_per_second:.2f} ms per audio second)")
+        return f"audio {self.encoding}: " + (", ".join(parts) if parts else "no audio")
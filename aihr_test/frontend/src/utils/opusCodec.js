@@ -0,0 +1,146 @@
+/**
+ * Opus 编解码（WebCodecs）
+ * 浏览器支持 AudioEncoder / AudioDecoder 时，握手优先请求 opus.v1 子协议：
+ * 上行录音 PCM 编码为 Opus 包，下行 Opus 包解码回 16bit PCM，交给播放器的数据格式不变
+ */
+
+export const OPUS_SUBPROTOCOL = 'opus.v1'
+
+const OPUS_BITRATE = 24000
+const OPUS_FRAME_US = 20000
+
+/**
+ * 当前浏览器是否可以使用 Opus 传输
+ */
+export function opusSupported() {
+  return typeof AudioEncoder !== 'undefined' && typeof AudioDecoder !== 'undefined'
+}
+
+export class OpusCodec {
+  /**
+   * @param {Object} options
+   * @param {number} options.inputSampleRate - 上行录音采样率
+   * @param {number} options.outputSampleRate - 下行播放采样率
+   * @param {Function} options.onPacket - 编码出一个 Opus 包时回调 (Uint8Array)
+   * @param {Function} options.onPcm - 解码出一段 PCM 时回调 (ArrayBuffer, meta)，meta 为 decode 时传入的附加信息
+   */
+  constructor({ inputSampleRate = 16000, outputSampleRate = 24000, onPacket, onPcm }) {
+    this.inputSampleRate = inputSampleRate
+    this.outputSampleRate = outputSampleRate
+    this.onPacket = onPacket
+    this.onPcm = onPcm
+    this.inputTimestamp = 0
+    this.outputTimestamp = 0
+    this.pendingMeta = []
+
+    this.encoder = new AudioEncoder({
+      output: (chunk) => {
+        const packet = new Uint8Array(chunk.byteLength)
+        chunk.copyTo(packet)
+        this.onPacket(packet)
+      },
+      error: (error) => console.error('Opus encoder error:', error)
+    })
+    this.encoder.configure({
+      codec: 'opus',
+      sampleRate: inputSampleRate,
+      numberOfChannels: 1,
+      bitrate: OPUS_BITRATE,
+      opus: { frameDuration: OPUS_FRAME_US }
+    })
+
+    this.decoder = new AudioDecoder({
+      output: (audioData) => this._handleDecoded(audioData),
+      error: (error) => console.error('Opus decoder error:', error)
+    })
+    this.decoder.configure({
+      codec: 'opus',
+      sampleRate: outputSampleRate,
+      numberOfChannels: 1
+    })
+  }
+
+  /**
+   * 编码一段 16bit PCM（ArrayBuffer 或 Uint8Array）
+   */
+  encode(pcmData) {
+    const bytes = pcmData instanceof ArrayBuffer ? new Uint8Array(pcmData) : pcmData
+    const samples = new Int16Array(bytes.buffer.slice(bytes.byteOffset, bytes.byteOffset + bytes.byteLength))
+    const audioData = new AudioData({
+      format: 's16',
+      sampleRate: this.inputSampleRate,
+      numberOfFrames: samples.length,
+      numberOfChannels: 1,
+      timestamp: this.inputTimestamp,
+      data: samples
+    })
+    this.inputTimestamp += Math.round(samples.length * 1e6 / this.inputSampleRate)
+    this.encoder.encode(audioData)
+    audioData.close()
+  }
+
+  /**
+   * 编码器中不足一帧的尾部补齐发出（一段录音结束时调用）
+   */
+  async flushEncoder() {
+    await this.encoder.flush()
+  }
+
+  /**
+   * 解码一个 Opus 包，结果按提交顺序通过 onPcm 回调
+   */
+  decode(packet, meta = {}) {
+    this.pendingMeta.push(meta)
+    const chunk = new EncodedAudioChunk({
+      type: 'key',
+      timestamp: this.outputTimestamp,
+      data: packet
+    })
+    this.outputTimestamp += OPUS_FRAME_US
+    this.decoder.decode(chunk)
+  }
+
+  /**
+   * 解码输出转换为播放器使用的 16bit PCM，采样率不一致时线性重采样
+   */
+  _handleDecoded(audioData) {
+    const meta = this.pendingMeta.shift() || {}
+    const float32 = new Float32Array(audioData.numberOfFrames)
+    audioData.copyTo(float32, { planeIndex: 0, format: 'f32-planar' })
+    const samples = this._resample(float32, audioData.sampleRate, this.outputSampleRate)
+    audioData.close()
+
+    const pcm = new Int16Array(samples.length)
+    for (let i = 0; i < samples.length; i++) {
+      const s = Math.max(-1, Math.min(1, samples[i]))
+      pcm[i] = s < 0 ? s * 0x8000 : s * 0x7fff
+    }
+    this.onPcm(pcm.buffer, meta)
+  }
+
+  _resample(samples, fromRate, toRate) {
+    if (fromRate === toRate) {
+      return samples
+    }
+    const ratio = fromRate / toRate
+    const length = Math.floor(samples.length / ratio)
+    const result = new Float32Array(length)
+    for (let i = 0; i < length; i++) {
+      const position = i * ratio
+      const index = Math.floor(position)
+      const next = Math.min(index + 1, samples.length - 1)
+      const fraction = position - index
+      result[i] = samples[index] + (samples[next] - samples[index]) * fraction
+    }
+    return result
+  }
+
+  close() {
+    if (this.encoder.state !== 'closed') {
+      this.encoder.close()
+    }
+    if (this.decoder.state !== 'closed') {
+      this.decoder.close()
+    }
+  }
+}
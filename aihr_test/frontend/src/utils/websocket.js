@@ -1,12 +1,25 @@
 /**
  * WebSocket 管理器
  * 用于与后端建立实时通信
+ *
+ * 握手时请求 pcm.v1 子协议，协商成功后音频以二进制帧收发：
+ * 8 字节小端头（流 ID uint16、保留 uint16、序号 uint32）+ 16bit PCM，控制消息仍为 JSON。
+ * 浏览器支持 WebCodecs 时优先请求 opus.v1，帧头不变，帧体为一个 Opus 包（见 opusCodec.js）
  */
 
+import { OPUS_SUBPROTOCOL, OpusCodec, opusSupported } from './opusCodec'
+
+export const BINARY_SUBPROTOCOL = 'pcm.v1'
+const AUDIO_FRAME_HEADER_BYTES = 8
+
 export class WebSocketManager {
   constructor(url) {
     this.url = url
     this.ws = null
+    this.binaryAudio = false
+    this.opus = null
+    this.inputStreamId = 0
+    this.inputSequence = 0
     this.handlers = new Map()
     this.reconnectAttempts = 0
     this.maxReconnectAttempts = 5
@@ -32,10 +45,14 @@ export class WebSocketManager {
       this.isConnecting = true
 
       try {
-        this.ws = new WebSocket(this.url)
+        const protocols = opusSupported() ? [OPUS_SUBPROTOCOL, BINARY_SUBPROTOCOL] : [BINARY_SUBPROTOCOL]
+        this.ws = new WebSocket(this.url, protocols)
+        this.ws.binaryType = 'arraybuffer'
 
         this.ws.onopen = () => {
-          console.log('WebSocket connected')
+          this.binaryAudio = this.ws.protocol === BINARY_SUBPROTOCOL || this.ws.protocol === OPUS_SUBPROTOCOL
+          this._setupOpus(this.ws.protocol === OPUS_SUBPROTOCOL)
+          console.log('WebSocket connected', this.binaryAudio ? `(${this.ws.protocol})` : '')
           this.isConnecting = false
           this.reconnectAttempts = 0
           resolve()
@@ -71,6 +88,28 @@ export class WebSocketManager {
       this.ws.close()
       this.ws = null
     }
+    this._setupOpus(false)
+  }
+
+  /**
+   * 按握手结果创建或释放 Opus 编解码器
+   */
+  _setupOpus(enabled) {
+    if (this.opus) {
+      this.opus.close()
+      this.opus = null
+    }
+    if (!enabled) return
+    this.opus = new OpusCodec({
+      inputSampleRate: 16000,
+      outputSampleRate: 24000,
+      onPacket: (packet) => {
+        if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+          this.ws.send(this._packAudioFrame(packet))
+        }
+      },
+      onPcm: (pcm, meta) => this._dispatchAudio({ type: 'audio.delta', ...meta, audio: pcm })
+    })
   }
 
   /**
@@ -112,6 +151,14 @@ export class WebSocketManager {
    */
   sendAudio(audioData) {
     if (this.ws && this.ws.readyState === WebSocket.OPEN) {
+      if (this.opus) {
+        this.opus.encode(audioData)
+        return
+      }
+      if (this.binaryAudio) {
+        this.ws.send(this._packAudioFrame(audioData))
+        return
+      }
       const base64 = this._arrayBufferToBase64(audioData)
       this.send({
         type: 'audio.input',
@@ -121,10 +168,16 @@ export class WebSocketManager {
   }
 
   /**
-   * 结束音频输入
+   * 结束音频输入，下一段录音使用新的流 ID
    */
-  endAudio() {
+  async endAudio() {
+    if (this.opus) {
+      // 编码器中剩余的尾部先发出，再通知结束
+      await this.opus.flushEncoder()
+    }
     this.send({ type: 'audio.end' })
+    this.inputStreamId = (this.inputStreamId + 1) & 0xffff
+    this.inputSequence = 0
   }
 
   /**
@@ -160,10 +213,19 @@ export class WebSocketManager {
    * 处理接收到的消息
    */
   _handleMessage(event) {
+    if (event.data instanceof ArrayBuffer) {
+      this._handleAudioFrame(event.data)
+      return
+    }
     try {
       const data = JSON.parse(event.data)
       const type = data.type
 
+      if (type === 'audio.delta' && data.data) {
+        // JSON 音频统一转换为 ArrayBuffer，与二进制帧的处理方式一致
+        data.audio = WebSocketManager.base64ToArrayBuffer(data.data)
+      }
+
       if (this.handlers.has(type)) {
         this.handlers.get(type).forEach(handler => handler(data))
       }
@@ -177,6 +239,47 @@ export class WebSocketManager {
     }
   }
 
+  /**
+   * 处理二进制音频帧，以 audio.delta 消息分发
+   */
+  _handleAudioFrame(buffer) {
+    if (buffer.byteLength < AUDIO_FRAME_HEADER_BYTES) {
+      console.warn('Dropped malformed audio frame')
+      return
+    }
+    const header = new DataView(buffer, 0, AUDIO_FRAME_HEADER_BYTES)
+    const meta = {
+      streamId: header.getUint16(0, true),
+      sequence: header.getUint32(4, true)
+    }
+    if (this.opus) {
+      // 解码完成后再分发
+      this.opus.decode(new Uint8Array(buffer, AUDIO_FRAME_HEADER_BYTES), meta)
+      return
+    }
+    this._dispatchAudio({ type: 'audio.delta', ...meta, audio: buffer.slice(AUDIO_FRAME_HEADER_BYTES) })
+  }
+
+  _dispatchAudio(data) {
+    if (this.handlers.has('audio.delta')) {
+      this.handlers.get('audio.delta').forEach(handler => handler(data))
+    }
+  }
+
+  /**
+   * 打包上行音频帧（PCM 或 Opus 包）
+   */
+  _packAudioFrame(audioData) {
+    const payload = new Uint8Array(audioData)
+    const frame = new Uint8Array(AUDIO_FRAME_HEADER_BYTES + payload.byteLength)
+    const header = new DataView(frame.buffer, 0, AUDIO_FRAME_HEADER_BYTES)
+    header.setUint16(0, this.inputStreamId, true)
+    header.setUint32(4, this.inputSequence, true)
+    this.inputSequence = (this.inputSequence + 1) >>> 0
+    frame.set(payload, AUDIO_FRAME_HEADER_BYTES)
+    return frame.buffer
+  }
+
   /**
    * 处理连接关闭
    */
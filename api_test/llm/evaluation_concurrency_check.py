@@ -0,0 +1,206 @@
+"""
+异步评估检查：InterviewService.evaluate_response_async
+评估请求用模拟的 Generation.call 代替（固定耗时、不访问网络），线程池使用 main.py 中的共用线程池与评估专用线程池，
+会话按 InterviewSession 的方式接线（SessionScope 转交共用线程池，评估走 scope.bind(evaluation_executor)），检查四点：
+- 并发：CONCURRENT 个会话同时评估，按 EVALUATION_CONCURRENCY 分批执行，期间事件循环的心跳间隔不受影响
+- 上行音频：评估进行期间另一个会话持续说话，AudioInputBatcher 每批音频照常送入 ASR，批次间隔不超过 MAX_BATCH_GAP；
+  同时打印评估改回共用线程池时的批次间隔作对比（评估占满共用线程池，音频批次排在评估之后）
+- 超时：评估超过 timeout 时按默认结果继续追问（CONTINUE），不等待评估请求返回
+- 取消：超时后后台线程收到取消信号，评估失败时不再重试
+直接使用后端 main.py 与 services/ 的实现，需在后端依赖环境中运行
+"""
+
+import asyncio
+import json
+import math
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'aihr_test', 'backend'))
+
+import main  # noqa: E402
+from config import settings  # noqa: E402
+from services import interview_service  # noqa: E402
+from services.audio_input import AudioInputBatcher  # noqa: E402
+from services.audio_output import frame_bytes_for  # noqa: E402
+from services.interview_service import InterviewAction, InterviewService  # noqa: E402
+from services.session_scope import SessionScope  # noqa: E402
+
+CONCURRENT = 16             # 同时评估的会话数，多于共用线程池的线程数
+EVAL_LATENCY = 1.0          # 模拟的单次评估耗时（秒）
+HEARTBEAT_INTERVAL = 0.02   # 事件循环心跳间隔（秒）
+CHUNK_MS = 20               # 客户端上行音频块时长（毫秒）
+SEND_LATENCY = 0.002        # 模拟的 ASR send_audio 耗时（秒）
+MAX_BATCH_GAP = settings.ASR_BATCH_MS / 1000 + 0.1  # 相邻两批音频送入 ASR 的最大间隔（秒）
+
+
+class SimulatedGeneration:
+    """模拟评估请求：阻塞 latency 秒后返回评估 JSON，fail 为 True 时抛出异常（触发重试）"""
+    latency = EVAL_LATENCY
+    fail = False
+    calls = 0
+    _lock = threading.Lock()
+
+    @classmethod
+    def call(cls, **kwargs):
+        with cls._lock:
+            cls.calls += 1
+        time.sleep(cls.latency)
+        if cls.fail:
+            raise RuntimeError('simulated evaluation failure')
+        content = json.dumps({'action': 'PASS', 'current_score': 85, 'assessment': '回答完整'})
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(status_code=200, output=SimpleNamespace(choices=[SimpleNamespace(message=message)]))
+
+
+class SimulatedASR:
+    """模拟 ASRService.send_audio：记录每批音频送达的时间"""
+
+    def __init__(self):
+        self.sent_at = []
+        self.bytes = 0
+
+    def send_audio(self, pcm: bytes) -> bool:
+        time.sleep(SEND_LATENCY)
+        self.sent_at.append(time.perf_counter())
+        self.bytes += len(pcm)
+        return True
+
+
+def new_scope(session_id: str):
+    """与 InterviewSession 相同的接线：会话调用走共用线程池，评估走评估专用线程池"""
+    scope = SessionScope(session_id, main.executor)
+    return scope, scope.bind(main.evaluation_executor)
+
+
+def new_service() -> InterviewService:
+    service = InterviewService()
+    service.start_interview('Redis')
+    service.record_candidate_response('使用 RDB 和 AOF 两种持久化方式')
+    return service
+
+
+async def heartbeat(gaps: list, stop: asyncio.Event):
+    """记录事件循环心跳的最大间隔：评估阻塞事件循环时间隔会随之变长"""
+    last = time.perf_counter()
+    while not stop.is_set():
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        now = time.perf_counter()
+        gaps.append(now - last - HEARTBEAT_INTERVAL)
+        last = now
+
+
+async def speak(scope: SessionScope, asr: SimulatedASR, stop: asyncio.Event) -> int:
+    """按实时节奏上行音频，直到 stop 置位后结束输入；返回送入的字节数"""
+    batcher = AudioInputBatcher(
+        asr.send_audio,
+        scope,
+        frame_bytes_for(settings.ASR_BATCH_MS, settings.ASR_SAMPLE_RATE),
+        settings.ASR_BATCH_MS
+    )
+    sender = scope.spawn(batcher.run())
+    chunk = bytes(frame_bytes_for(CHUNK_MS, settings.ASR_SAMPLE_RATE))
+    fed = 0
+    while not stop.is_set():
+        batcher.feed(chunk)
+        fed += len(chunk)
+        await asyncio.sleep(CHUNK_MS / 1000)
+    await batcher.drain()
+    sender.cancel()
+    return fed
+
+
+async def evaluate_while_speaking(shared: bool):
+    """CONCURRENT 个会话同时评估，另一个会话在此期间说话；shared 为 True 时评估改回共用线程池"""
+    SimulatedGeneration.latency, SimulatedGeneration.fail = EVAL_LATENCY, False
+    sessions = [new_scope(f'eval-{index}') for index in range(CONCURRENT)]
+    speaker, _ = new_scope('speaker')
+    asr = SimulatedASR()
+    services = [new_service() for _ in range(CONCURRENT)]
+    timeout = EVAL_LATENCY * (math.ceil(CONCURRENT / settings.EVALUATION_CONCURRENCY) + 2)
+    gaps, stop_beat, stop_speaking = [], asyncio.Event(), asyncio.Event()
+    beat = asyncio.create_task(heartbeat(gaps, stop_beat))
+    speaking = asyncio.create_task(speak(speaker, asr, stop_speaking))
+    await asyncio.sleep(settings.ASR_BATCH_MS / 1000 * 2)
+    start = time.perf_counter()
+    results = await asyncio.gather(*[
+        service.evaluate_response_async(executor=scope if shared else evaluation_executor, timeout=timeout)
+        for service, (scope, evaluation_executor) in zip(services, sessions)
+    ])
+    elapsed = time.perf_counter() - start
+    stop_speaking.set()
+    fed = await speaking
+    stop_beat.set()
+    await beat
+    for scope, _ in sessions + [(speaker, None)]:
+        await scope.close()
+    batch_gaps = [b - a for a, b in zip(asr.sent_at, asr.sent_at[1:])]
+    return SimpleNamespace(
+        elapsed=elapsed,
+        actions={result.action.value for result in results},
+        heartbeat_ms=max(gaps) * 1000,
+        batches=len(asr.sent_at),
+        max_batch_gap=max(batch_gaps),
+        complete=asr.bytes == fed
+    )
+
+
+async def check_concurrency():
+    rounds = math.ceil(CONCURRENT / settings.EVALUATION_CONCURRENCY)
+    result = await evaluate_while_speaking(shared=False)
+    print(f'  [concurrency] {CONCURRENT} evaluations of {EVAL_LATENCY:.1f}s on {settings.EVALUATION_CONCURRENCY} '
+          f'evaluation threads took {result.elapsed:.2f}s ({rounds} rounds), actions={sorted(result.actions)}, '
+          f'max heartbeat delay {result.heartbeat_ms:.1f} ms')
+    print(f'  [audio      ] {result.batches} ASR batches sent meanwhile, max gap {result.max_batch_gap * 1000:.0f} ms '
+          f'(limit {MAX_BATCH_GAP * 1000:.0f} ms), all audio delivered: {result.complete}')
+    assert result.elapsed < EVAL_LATENCY * (rounds + 1), 'evaluations did not run concurrently'
+    assert result.heartbeat_ms < 100, 'evaluation blocked the event loop'
+    assert result.max_batch_gap < MAX_BATCH_GAP, 'ASR audio batches stalled behind evaluations'
+    assert result.complete, 'ASR audio was lost'
+
+    shared = await evaluate_while_speaking(shared=True)
+    print(f'  [shared pool] for comparison, evaluations on the shared executor: max ASR batch gap '
+          f'{shared.max_batch_gap * 1000:.0f} ms, evaluations took {shared.elapsed:.2f}s')
+
+
+async def check_timeout():
+    SimulatedGeneration.latency, SimulatedGeneration.fail = 3.0, False
+    timeout = 0.5
+    _, evaluation_executor = new_scope('timeout')
+    start = time.perf_counter()
+    result = await new_service().evaluate_response_async(executor=evaluation_executor, timeout=timeout)
+    elapsed = time.perf_counter() - start
+    print(f'  [timeout    ] evaluation of 3.0s with timeout {timeout}s returned after {elapsed:.2f}s: '
+          f'{result.action.value} ({result.assessment})')
+    assert result.action == InterviewAction.CONTINUE and elapsed < timeout + 0.2
+
+
+async def check_cancel():
+    SimulatedGeneration.latency, SimulatedGeneration.fail = 0.2, True
+    SimulatedGeneration.calls = 0
+    _, evaluation_executor = new_scope('cancel')
+    await new_service().evaluate_response_async(executor=evaluation_executor, timeout=0.5)
+    # 未取消时失败后会按 1s、2s 退避重试共 3 次
+    await asyncio.sleep(4)
+    print(f'  [cancel     ] failing evaluation timed out after 0.5s, '
+          f'{SimulatedGeneration.calls} request(s) made in the following 4s (3 without cancellation)')
+    assert SimulatedGeneration.calls == 1, 'evaluation kept retrying after timeout'
+
+
+async def run():
+    interview_service.Generation = SimulatedGeneration
+    try:
+        await check_concurrency()
+        await check_timeout()
+        await check_cancel()
+    finally:
+        main.executor.shutdown(wait=False)
+        main.evaluation_executor.shutdown(wait=False)
+    print('all checks passed')
+
+
+if __name__ == '__main__':
+    asyncio.run(run())
@@ -0,0 +1,126 @@
+"""
+commit / server_commit 模式对比
+用同一批文本模拟 LLM 流式输出（每 TOKEN_INTERVAL 秒输出 TOKEN_CHARS 个字符）：
+- commit：攒够一句后 append_text + commit
+- server_commit：每个片段直接 append_text，由服务端决定分段
+统计首音延迟（get_first_audio_delay）与总合成耗时（首段文本发出到最后一个音频包）
+"""
+
+import os
+import threading
+import time
+import dashscope
+from dashscope.audio.qwen_tts_realtime import *
+
+transcripts = [
+    '嗯，那你刚才说的分布式锁，具体是怎么实现的呢？有没有考虑过锁超时之后业务还没执行完的情况？',
+    '好的，我了解了。你在项目里提到用消息队列做削峰填谷，能具体讲讲当时的流量规模和队列选型吗？',
+    '明白了。那我们换个方向，聊聊你在团队协作方面的经历吧。',
+]
+
+MODES = ['commit', 'server_commit']
+ROUNDS = 3
+TOKEN_CHARS = 2
+TOKEN_INTERVAL = 0.04
+SENTENCE_DELIMITERS = '。！？；.!?;'
+
+
+def init_dashscope_api_key():
+    """
+        Set your DashScope API-key. More information:
+        https://github.com/aliyun/alibabacloud-bailian-speech-demo/blob/master/PREREQUISITES.md
+    """
+
+    # 新加坡和北京地域的API Key不同。获取API Key：https://help.aliyun.com/zh/model-studio/get-api-key
+    if 'DASHSCOPE_API_KEY' in os.environ:
+        dashscope.api_key = os.environ[
+            'DASHSCOPE_API_KEY']  # load API-key from environment variable DASHSCOPE_API_KEY
+    else:
+        dashscope.api_key = 'your-dashscope-api-key'  # set API-key manually
+
+
+class BenchmarkCallback(QwenTtsRealtimeCallback):
+    def __init__(self):
+        super().__init__()
+        self.complete_event = threading.Event()
+        self.last_audio_time = None
+        self.audio_bytes = 0
+
+    def on_open(self) -> None:
+        pass
+
+    def on_close(self, close_status_code, close_msg) -> None:
+        self.complete_event.set()
+
+    def on_event(self, response: dict) -> None:
+        type = response['type']
+        if 'response.audio.delta' == type:
+            self.last_audio_time = time.time()
+            self.audio_bytes += len(response['delta']) * 3 // 4
+        if 'session.finished' == type:
+            self.complete_event.set()
+
+
+def run_once(mode: str, text: str):
+    """按指定模式合成一段文本，返回 (首音延迟 ms, 总合成耗时 ms, 音频字节数)"""
+    callback = BenchmarkCallback()
+    tts = QwenTtsRealtime(
+        model='qwen3-tts-flash-realtime',
+        callback=callback,
+        # 以下为北京地域url，若使用新加坡地域的模型，需将url替换为：wss://dashscope-intl.aliyuncs.com/api-ws/v1/realtime
+        url='wss://dashscope.aliyuncs.com/api-ws/v1/realtime'
+    )
+    tts.connect()
+    tts.update_session(
+        voice='Maia',
+        response_format=AudioFormat.PCM_24000HZ_MONO_16BIT,
+        mode=mode
+    )
+
+    first_text_time = None
+    sentence = ''
+    for i in range(0, len(text), TOKEN_CHARS):
+        token = text[i:i + TOKEN_CHARS]
+        if mode == 'server_commit':
+            tts.append_text(token)
+            first_text_time = first_text_time or time.time()
+        else:
+            sentence += token
+            if any(d in token for d in SENTENCE_DELIMITERS):
+                tts.append_text(sentence)
+                tts.commit()
+                first_text_time = first_text_time or time.time()
+                sentence = ''
+        time.sleep(TOKEN_INTERVAL)
+
+    if sentence:
+        tts.append_text(sentence)
+        tts.commit()
+        first_text_time = first_text_time or time.time()
+    tts.finish()
+    callback.complete_event.wait(timeout=30)
+    tts.close()
+
+    total_ms = (callback.last_audio_time - first_text_time) * 1000 if callback.last_audio_time else float('nan')
+    return tts.get_first_audio_delay(), total_ms, callback.audio_bytes
+
+
+if __name__ == '__main__':
+    init_dashscope_api_key()
+
+    results = {mode: [] for mode in MODES}
+    for round_index in range(ROUNDS):
+        for text in transcripts:
+            # 两种模式交替执行，减少网络波动对比较的影响
+            for mode in MODES:
+                first_delay, total_ms, audio_bytes = run_once(mode, text)
+                results[mode].append((first_delay, total_ms))
+                print(f'[{mode:13s}] round {round_index} first audio delay: {first_delay:.0f} ms, '
+                      f'total: {total_ms:.0f} ms, audio: {audio_bytes} bytes, text: {text[:12]}...')
+
+    print()
+    for mode in MODES:
+        delays = [r[0] for r in results[mode] if r[0] is not None]
+        totals = [r[1] for r in results[mode]]
+        print('[Metric] {}: avg first audio delay: {:.0f} ms, avg total synthesis time: {:.0f} ms'.format(
+            mode, sum(delays) / len(delays), sum(totals) / len(totals)))
@@ -0,0 +1,98 @@
+"""
+流式分句对比：逐 token 查找全部句末标点 与 增量分句器 SentenceSegmenter
+改造前每收到一个 token 都对 9 个句末标点各调用一次 buffer.find，并用切片和 += 重建缓冲区，
+长句（或没有句末标点的输出）会被反复扫描；SentenceSegmenter 只扫描新到达的字符。
+- 一致性：随机生成 DIFF_STREAMS 条 token 流，按默认设置（不按逗号切分、不限延迟）两者切出的句子与剩余文本必须完全相同
+- 耗时：2 字符一个 token，统计每个字符的平均处理耗时（纳秒）
+SentenceSegmenter 直接使用后端 services/text_segmenter.py 的实现，需在后端依赖环境中运行
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'aihr_test', 'backend'))
+
+from services.text_segmenter import DEFAULT_SENTENCE_DELIMITERS, SentenceSegmenter  # noqa: E402
+
+DIFF_STREAMS = 3000
+DIFF_ALPHABET = '你好世界abc，、：. 。！？;\n1x'
+TOKEN_CHARS = 2
+ROUNDS = 3
+CASES = (
+    # (总字符数, 句长)
+    (2000, 30),
+    (20000, 30),
+    (20000, 2000),
+    (100000, 100000),   # 没有句末标点
+)
+
+
+def old_split(tokens):
+    """改造前的分句循环"""
+    buffer = ''
+    sentences = []
+    for token in tokens:
+        buffer += token
+        while True:
+            end = -1
+            for delimiter in DEFAULT_SENTENCE_DELIMITERS:
+                pos = buffer.find(delimiter)
+                if pos != -1 and (end == -1 or pos < end):
+                    end = pos
+            if end == -1:
+                break
+            sentences.append(buffer[:end + 1])
+            buffer = buffer[end + 1:]
+    return sentences, buffer
+
+
+def new_split(tokens):
+    segmenter = SentenceSegmenter()
+    sentences = []
+    for token in tokens:
+        sentences.extend(segmenter.feed(token))
+    return sentences, segmenter.flush()
+
+
+def random_tokens(rng):
+    text = ''.join(rng.choice(DIFF_ALPHABET) for _ in range(rng.randint(0, 80)))
+    tokens = []
+    i = 0
+    while i < len(text):
+        n = rng.randint(1, 6)
+        tokens.append(text[i:i + n])
+        i += n
+    return tokens
+
+
+def check_equivalence():
+    rng = random.Random(1)
+    for _ in range(DIFF_STREAMS):
+        tokens = random_tokens(rng)
+        expected, got = old_split(tokens), new_split(tokens)
+        assert expected == got, f'mismatch on {tokens!r}: {expected!r} != {got!r}'
+    print(f'identical output on {DIFF_STREAMS} random token streams')
+
+
+def ns_per_char(split, tokens, chars):
+    best = None
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        split(tokens)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best / chars * 1e9
+
+
+if __name__ == '__main__':
+    check_equivalence()
+    print(f'{TOKEN_CHARS}-char tokens, ns per character (best of {ROUNDS})')
+    for total, sentence_len in CASES:
+        text = ('字' * (sentence_len - 1) + '。') * (total // sentence_len)
+        tokens = [text[i:i + TOKEN_CHARS] for i in range(0, len(text), TOKEN_CHARS)]
+        old = ns_per_char(old_split, tokens, len(text))
+        new = ns_per_char(new_split, tokens, len(text))
+        print(f'  {total:6d} chars, {sentence_len:6d}-char sentences: '
+              f'delimiter scan {old:7.0f} ns/char, SentenceSegmenter {new:5.0f} ns/char')
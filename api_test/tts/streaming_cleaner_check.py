@@ -0,0 +1,172 @@
+"""
+流式 Markdown 清理对比：LLM 输出按片段经过 StreamingMarkdownCleaner、再逐句 clean_text_for_tts，
+与改造前对整段回复调用 clean_text_for_tts（tts_text_check.py 中的 re.sub 链）的结果对比。
+流式清理在收到结束标记前暂存开始标记，没有配对的标记（乘号、变量名中的下划线、未闭合的括号等）原样输出。
+- 固定用例：STREAM_CASES 中的回复按 1、2、3、7 个字符及随机长度切片送入，输出必须与改造前整段清理相同
+- 切片无关：随机回复按不同方式切片，流式输出必须与整段送入时完全相同
+- 标记配对：由配对的强调、行内代码、括号、链接、代码块、标题与列表随机拼成的回复，新旧输出必须完全相同
+- 未配对标记：回复中加入一个未配对的标记且不含同类标记时，新旧输出必须完全相同（改造前也原样保留）
+已知差异：改造前的正则会把未配对的标记与后文无关的同类标记配成一对（如 "2 * 3 *斜体*" 输出 "2 3 斜体*"），
+流式清理按就近配对处理；分隔线后紧跟代码块时，改造前先删除代码块再删除分隔线，会多删一个换行。
+两类情况都不在随机用例中生成。
+StreamingMarkdownCleaner 直接使用后端 services/tts_text.py 的实现，需在后端依赖环境中运行
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'aihr_test', 'backend'))
+
+from services.tts_text import StreamingMarkdownCleaner, clean_text_for_tts  # noqa: E402
+from tts_text_check import old_clean_text_for_tts  # noqa: E402
+
+FUZZ_CASES = 20000
+CHUNK_SIZES = (1, 2, 3, 7)
+STREAM_CASES = (
+    # 乘号、变量名、未闭合的括号与强调：改造前原样保留
+    'a*b',
+    '3*4=12，所以答案是 12。',
+    '价格(元',
+    '请说明 snake_case 和 _private 的区别',
+    '时间复杂度是 O(n',
+    '这里的 ** 没有闭合',
+    # 跨句子的粗体、括号与行内代码
+    '好的。**请先介绍一下你自己。然后说说项目经验。**谢谢！',
+    '你可以结合具体场景（比如高并发。或者大数据量）来回答。',
+    '请解释 `asyncio.gather` 和 `asyncio.wait` 的区别。',
+    '## 问题二\n1. 请描述 *Redis* 的持久化方式：\n- RDB\n- AOF\n\n> 提示: 可以对比两者的优缺点 😊',
+    '参考 [官方文档](https://docs.python.org/3/library/asyncio.html) 以及 ![图](https://x/y.png) 的说明。',
+    '示例如下：\n```python\nprint("hello")\n```\n运行后会输出 hello。',
+    '好的，我们继续。\n\n---\n\n下一个问题：你如何做__性能优化__？',
+    '未闭合的代码块：\n```python\nprint(1)',
+    '未写完的链接 [文档](https://example.com 和 [示例](https://example.com',
+)
+
+WORDS = ('你好', '请介绍一下', '项目经验', 'Redis', 'asyncio', '高并发', '的场景', 'and', 'the cache')
+PUNCT = ('。', '，', '？', '！', '. ', ', ', '? ', '：', '')
+CODE_BLOCK = '```python\nprint(1)\n```'
+# 每类标记：配对的写法、改造前单独出现时原样保留的写法
+FAMILIES = {
+    'star': (
+        (lambda r: '**' + words(r) + '**', lambda r: '*' + r.choice(WORDS) + '*'),
+        (lambda r: '3*4=12', lambda r: 'a*b', lambda r: '2 * 3', lambda r: '**' + words(r), lambda r: words(r) + '**'),
+    ),
+    'underscore': (
+        (lambda r: '__' + words(r) + '__', lambda r: '_' + r.choice(WORDS) + '_'),
+        (lambda r: 'snake_case', lambda r: '_private'),
+    ),
+    'code': (
+        (lambda r: '`' + r.choice(('dict', 'get()', 'a.b')) + '`',),
+        (lambda r: '`' + words(r),),
+    ),
+    'paren': (
+        (lambda r: '（' + words(r) + '）', lambda r: '(' + words(r) + ')'),
+        (lambda r: '价格(元', lambda r: '（注' + words(r), lambda r: words(r) + '）', lambda r: 'x)'),
+    ),
+    'link': (
+        (lambda r: '[' + r.choice(WORDS) + '](https://example.com/' + r.choice(WORDS).replace(' ', '') + ')',),
+        (lambda r: '[' + r.choice(WORDS) + '](https://example.com', lambda r: '[' + r.choice(WORDS) + ']'),
+    ),
+}
+# 未配对标记所在回复中不能出现的标记类别（含相同符号的类别）
+EXCLUDED = {
+    'star': ('star',),
+    'underscore': ('underscore',),
+    'code': ('code', 'fence'),
+    'paren': ('paren', 'code', 'link'),
+    'link': ('link', 'paren', 'code', 'fence'),
+}
+
+
+def words(rng):
+    return ''.join(rng.choice(WORDS) + rng.choice(PUNCT) for _ in range(rng.randint(1, 3))).strip()
+
+
+def line(rng, excluded):
+    prefix = rng.choice(('', '', '', '# ', '## ', '- ', '1. ', '> '))
+    names = [name for name in FAMILIES if name not in excluded]
+    items = []
+    for _ in range(rng.randint(1, 4)):
+        if rng.random() < 0.4 or not names:
+            items.append(words(rng))
+        else:
+            items.append(rng.choice(FAMILIES[rng.choice(names)][0])(rng))
+    return prefix + ' '.join(items)
+
+
+def reply(rng, stray=None):
+    """随机回复；stray 为未配对标记的类别，回复中只出现一次且不含同类标记"""
+    excluded = EXCLUDED[stray] if stray else ()
+    parts = []
+    for _ in range(rng.randint(1, 4)):
+        r = rng.random()
+        if r < 0.08 and 'fence' not in excluded and (not parts or parts[-1] != '---'):
+            parts.append(CODE_BLOCK)
+        elif r < 0.1:
+            parts.append('---')
+        else:
+            parts.append(line(rng, excluded))
+    if stray:
+        index = rng.randrange(len(parts))
+        if parts[index] in (CODE_BLOCK, '---'):
+            parts[index] = line(rng, excluded)
+        parts[index] += ' ' + rng.choice(FAMILIES[stray][1])(rng)
+    return rng.choice(('\n', '\n\n')).join(parts)
+
+
+def stream(text, sizes):
+    """按 sizes 依次切片送入流式清理（用完后整段送入），返回拼接后的输出"""
+    cleaner = StreamingMarkdownCleaner()
+    out = []
+    i = 0
+    for size in sizes:
+        if i >= len(text):
+            break
+        out.append(cleaner.feed(text[i:i + size]))
+        i += size
+    out.append(cleaner.feed(text[i:]))
+    out.append(cleaner.flush())
+    return ''.join(out)
+
+
+def random_sizes(rng, text):
+    return [rng.randint(1, 8) for _ in range(len(text))]
+
+
+def check_stream_cases():
+    rng = random.Random(1)
+    for text in STREAM_CASES:
+        expected = old_clean_text_for_tts(text)
+        for sizes in [[size] * len(text) for size in CHUNK_SIZES] + [random_sizes(rng, text)]:
+            got = clean_text_for_tts(stream(text, sizes))
+            assert got == expected, f'mismatch on {text!r} ({sizes[:3]}...): {expected!r} != {got!r}'
+    print(f'stream output matches on {len(STREAM_CASES)} cases')
+
+
+def check_chunking():
+    rng = random.Random(2)
+    for _ in range(FUZZ_CASES):
+        text = reply(rng, rng.choice([None] + list(FAMILIES)))
+        whole = stream(text, [])
+        got = stream(text, random_sizes(rng, text))
+        assert got == whole, f'chunking changes output on {text!r}: {whole!r} != {got!r}'
+    print(f'identical output for any chunking on {FUZZ_CASES} random replies')
+
+
+def check_equivalence(stray):
+    rng = random.Random(3)
+    for _ in range(FUZZ_CASES):
+        text = reply(rng, rng.choice(list(FAMILIES)) if stray else None)
+        expected = old_clean_text_for_tts(text)
+        got = clean_text_for_tts(stream(text, random_sizes(rng, text)))
+        assert got == expected, f'mismatch on {text!r}: {expected!r} != {got!r}'
+    kind = 'with one unpaired marker' if stray else 'with paired markup'
+    print(f'identical output on {FUZZ_CASES} random replies {kind}')
+
+
+if __name__ == '__main__':
+    check_stream_cases()
+    check_chunking()
+    check_equivalence(stray=False)
+    check_equivalence(stray=True)
@@ -0,0 +1,182 @@
+"""
+TTS 文本清理对比：改造前 main.py 中的 clean_text_for_tts 与 services/tts_text.py 的预编译实现
+改造前每次调用依次执行约 35 次 re.sub，并重新编译表情正则；改造后正则在加载时编译，
+表情与装饰符号用 str.translate 一次删除，相互独立的替换合并为一次扫描。
+- 固定用例：tts_text_golden.jsonl 中每行一个 {"input", "expected"}，expected 由改造前的实现生成，新旧实现都必须与之相同
+- 随机对比：由 Markdown、标点、表情、换行和空格片段随机拼接 DIFF_CASES 条文本，新旧输出必须完全相同
+- 耗时：几类典型回复逐句清理，统计每个字符的平均耗时（纳秒）
+clean_text_for_tts 直接使用后端 services/tts_text.py 的实现，需在后端依赖环境中运行
+"""
+
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'aihr_test', 'backend'))
+
+from services.tts_text import clean_text_for_tts  # noqa: E402
+
+GOLDEN_FILE = os.path.join(os.path.dirname(__file__), 'tts_text_golden.jsonl')
+DIFF_CASES = 200000
+DIFF_FRAGMENTS = list('abc 中文字 \n\n  `*_#[]()!>-+.1234:：，,。?？!！（）—-…【】★→') + [
+    '```', '**', '__', '](', '\U0001F600', '\U0001F680', '✅', '---', '...', '。。',
+    '\n# ', '\n- ', '\n1. ', '\n> ', '——',
+]
+ROUNDS = 20000
+SAMPLES = (
+    # 普通中文句子、带表情的 Markdown 列表、带链接和行内代码的英文句子
+    '好的，我们开始面试。请先简单介绍一下你自己，包括你的**工作经历**和*技术栈*。',
+    '## 问题一\n1. 请描述你在项目中遇到的最大挑战：\n- 技术难点\n- 解决方案\n\n> 提示: 可以结合具体场景（比如高并发）来回答... 😊',
+    "Great answer! Let's move on. What about `asyncio`? See [docs](http://x) —— thanks.",
+)
+
+
+def old_clean_text_for_tts(text: str) -> str:
+    """改造前 main.py 中的实现（逐步调用 re.sub，每次调用重新编译表情正则）"""
+    if not text:
+        return ""
+        
+    # ===== 第一步：移除 Markdown 语法 =====
+    
+    # 移除代码块（整块移除）
+    text = re.sub(r'```[\s\S]*?```', '', text)
+    
+    # 移除行内代码，保留内容
+    text = re.sub(r'`([^`]+)`', r'\1', text)
+    
+    # 移除标题符号，保留文字
+    text = re.sub(r'^#{1,6}\s*', '', text, flags=re.MULTILINE)
+    
+    # 移除粗体符号，保留文字
+    text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)
+    text = re.sub(r'__(.+?)__', r'\1', text)
+    
+    # 移除斜体符号，保留文字
+    text = re.sub(r'\*(.+?)\*', r'\1', text)
+    text = re.sub(r'_(.+?)_', r'\1', text)
+    
+    # 移除链接，保留文字
+    text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)
+    
+    # 移除图片
+    text = re.sub(r'!\[([^\]]*)\]\([^)]+\)', '', text)
+    
+    # 移除引用符号
+    text = re.sub(r'^>\s*', '', text, flags=re.MULTILINE)
+    
+    # 移除无序列表符号
+    text = re.sub(r'^[\*\-\+]\s+', '', text, flags=re.MULTILINE)
+    
+    # 移除有序列表符号
+    text = re.sub(r'^\d+\.\s+', '', text, flags=re.MULTILINE)
+    
+    # 移除分隔线
+    text = re.sub(r'^[-*_]{3,}\s*$', '', text, flags=re.MULTILINE)
+    
+    # ===== 第二步：移除表情和特殊符号 =====
+    
+    emoji_pattern = re.compile(
+        "["
+        "\U0001F600-\U0001F64F"
+        "\U0001F300-\U0001F5FF"
+        "\U0001F680-\U0001F6FF"
+        "\U0001F1E0-\U0001F1FF"
+        "\U0001F900-\U0001F9FF"
+        "\U0001FA00-\U0001FAFF"
+        "\U00002702-\U000027B0"
+        "\U0001F004-\U0001F0CF"
+        "]+"
+    )
+    text = emoji_pattern.sub('', text)
+    
+    # 移除特殊装饰符号
+    text = re.sub(r'[◆◇●○■□▲△▼▽★☆♠♣♥♦→←↑↓↔↕【】「」『』〖〗]', '', text)
+    
+    # ===== 第三步：韵律优化 =====
+    
+    # 将英文句号转为中文句号（更自然的停顿）
+    text = re.sub(r'\.(\s|$)', '。', text)
+    
+    # 将英文逗号转为中文逗号
+    text = re.sub(r',(\s|$)', '，', text)
+    
+    # 将英文问号转为中文问号
+    text = re.sub(r'\?(\s|$)', '？', text)
+    
+    # 将英文感叹号转为中文感叹号
+    text = re.sub(r'!(\s|$)', '！', text)
+    
+    # 将冒号后添加短暂停顿（用逗号代替）
+    text = re.sub(r'：\s*', '，', text)
+    text = re.sub(r':\s*', '，', text)
+    
+    # 括号内容转为逗号分隔（让TTS能读出来）
+    text = re.sub(r'[（(]([^）)]+)[）)]', r'，\1，', text)
+    
+    # 处理破折号，转为逗号
+    text = re.sub(r'——', '，', text)
+    text = re.sub(r'--', '，', text)
+    
+    # 处理省略号，保留但限制长度
+    text = re.sub(r'\.{3,}', '...', text)
+    text = re.sub(r'。{2,}', '。', text)
+    
+    # 连续标点简化
+    text = re.sub(r'[，,]{2,}', '，', text)
+    text = re.sub(r'[。.]{2,}', '。', text)
+    
+    # ===== 第四步：清理空白 =====
+    
+    # 换行转为逗号（让段落连贯）
+    text = re.sub(r'\n+', '，', text)
+    
+    # 清理多余空格
+    text = re.sub(r' {2,}', ' ', text)
+    text = re.sub(r'\s*([，。！？])\s*', r'\1', text)
+    
+    # 开头不要标点
+    text = re.sub(r'^[，。！？、]+', '', text)
+    
+    text = text.strip()
+    
+    return text
+
+
+def check_golden():
+    with open(GOLDEN_FILE, encoding='utf-8') as f:
+        cases = [json.loads(line) for line in f if line.strip()]
+    for case in cases:
+        text, expected = case['input'], case['expected']
+        assert old_clean_text_for_tts(text) == expected, f'golden file out of date for {text!r}'
+        got = clean_text_for_tts(text)
+        assert got == expected, f'mismatch on {text!r}: {expected!r} != {got!r}'
+    print(f'golden output matches on {len(cases)} cases')
+
+
+def check_equivalence():
+    rng = random.Random(1)
+    for _ in range(DIFF_CASES):
+        text = ''.join(rng.choice(DIFF_FRAGMENTS) for _ in range(rng.randint(0, 60)))
+        expected, got = old_clean_text_for_tts(text), clean_text_for_tts(text)
+        assert expected == got, f'mismatch on {text!r}: {expected!r} != {got!r}'
+    print(f'identical output on {DIFF_CASES} random texts')
+
+
+def ns_per_char(clean, text):
+    start = time.perf_counter()
+    for _ in range(ROUNDS):
+        clean(text)
+    return (time.perf_counter() - start) / ROUNDS / len(text) * 1e9
+
+
+if __name__ == '__main__':
+    check_golden()
+    check_equivalence()
+    print(f'ns per character (average of {ROUNDS} calls)')
+    for name, text in zip(('plain', 'markdown', 'english'), SAMPLES):
+        old = ns_per_char(old_clean_text_for_tts, text)
+        new = ns_per_char(clean_text_for_tts, text)
+        print(f'  {name:8} ({len(text):3d} chars): re.sub chain {old:5.0f} ns/char, tts_text {new:5.0f} ns/char')
@@ -0,0 +1,110 @@
+"""
+WebSocket 音频编码对比：base64 JSON、pcm.v1 二进制帧与 opus.v1
+帧格式与后端 services/ws_protocol.py 一致：8 字节小端头（流 ID uint16、保留 uint16、序号 uint32）+ PCM
+分别统计下行（TTS 100ms 分片）与上行（麦克风 4096 采样）的编解码耗时、吞吐与传输字节数。
+安装了 opuslib（及系统 libopus）时追加 Opus 一行：20ms 帧、24kbps，一个分片编码为多个 Opus 包，
+传输字节为全部包加帧头之和；Opus 对随机噪声码率会偏离设定值，因此用合成语音频段的正弦信号测试
+"""
+
+import base64
+import json
+import math
+import os
+import struct
+import time
+
+try:
+    import opuslib
+except Exception:
+    opuslib = None
+
+FRAME_HEADER = struct.Struct('<HHI')
+
+CHUNKS = {
+    'downlink (24kHz, 100ms)': (24000, 24000 * 2 // 10),
+    'uplink (16kHz, 4096 samples)': (16000, 4096 * 2),
+}
+ROUNDS = 20000
+OPUS_ROUNDS = 500
+OPUS_FRAME_MS = 20
+OPUS_BITRATE = 24000
+
+
+def encode_json(pcm: bytes, sequence: int) -> str:
+    return json.dumps({'type': 'audio.delta', 'data': base64.b64encode(pcm).decode('ascii')},
+                      separators=(',', ':'))
+
+
+def decode_json(text: str) -> bytes:
+    return base64.b64decode(json.loads(text)['data'])
+
+
+def encode_binary(pcm: bytes, sequence: int) -> bytes:
+    return FRAME_HEADER.pack(1, 0, sequence) + pcm
+
+
+def decode_binary(frame: bytes) -> memoryview:
+    FRAME_HEADER.unpack_from(frame)
+    return memoryview(frame)[FRAME_HEADER.size:]
+
+
+def opus_codec(sample_rate: int):
+    """返回一组有状态的 Opus 编解码函数，分片按 20ms 切成多个包（尾部不足一帧时补静音）"""
+    encoder = opuslib.Encoder(sample_rate, 1, opuslib.APPLICATION_VOIP)
+    encoder.bitrate = OPUS_BITRATE
+    decoder = opuslib.Decoder(sample_rate, 1)
+    frame_bytes = sample_rate * 2 * OPUS_FRAME_MS // 1000
+
+    def encode(pcm: bytes, sequence: int) -> list:
+        if len(pcm) % frame_bytes:
+            pcm += bytes(frame_bytes - len(pcm) % frame_bytes)
+        return [FRAME_HEADER.pack(1, 0, sequence) + encoder.encode(pcm[offset:offset + frame_bytes], frame_bytes // 2)
+                for offset in range(0, len(pcm), frame_bytes)]
+
+    def decode(frames: list) -> bytes:
+        return b''.join(decoder.decode(bytes(memoryview(frame)[FRAME_HEADER.size:]), frame_bytes // 2)
+                        for frame in frames)
+
+    return encode, decode
+
+
+def speech_like(size: int, sample_rate: int) -> bytes:
+    samples = size // 2
+    return struct.pack(f'<{samples}h', *(
+        int(8000 * math.sin(2 * math.pi * 220 * i / sample_rate) + 3000 * math.sin(2 * math.pi * 1330 * i / sample_rate))
+        for i in range(samples)
+    ))
+
+
+def bench(encode, decode, pcm: bytes, rounds: int = ROUNDS):
+    """返回 (编码 us/帧, 解码 us/帧, 单帧平均传输字节数)"""
+    start = time.perf_counter()
+    frames = [encode(pcm, i) for i in range(rounds)]
+    encode_us = (time.perf_counter() - start) / rounds * 1e6
+
+    start = time.perf_counter()
+    for frame in frames:
+        decode(frame)
+    decode_us = (time.perf_counter() - start) / rounds * 1e6
+
+    if isinstance(frames[0], list):
+        wire = sum(len(packet) for frame in frames for packet in frame) / rounds
+    elif isinstance(frames[0], bytes):
+        wire = len(frames[0])
+    else:
+        wire = len(frames[0].encode('utf-8'))
+    return encode_us, decode_us, wire
+
+
+if __name__ == '__main__':
+    for label, (sample_rate, size) in CHUNKS.items():
+        pcm = os.urandom(size)
+        print(f'{label}: {size} bytes PCM per frame')
+        cases = [('json  ', encode_json, decode_json, pcm, ROUNDS), ('binary', encode_binary, decode_binary, pcm, ROUNDS)]
+        if opuslib is not None:
+            cases.append(('opus  ', *opus_codec(sample_rate), speech_like(size, sample_rate), OPUS_ROUNDS))
+        for name, encode, decode, payload, rounds in cases:
+            encode_us, decode_us, wire = bench(encode, decode, payload, rounds)
+            throughput = size / (encode_us + decode_us)  # bytes/us == MB/s
+            print(f'  [{name}] encode {encode_us:6.2f} us, decode {decode_us:6.2f} us, '
+                  f'wire {wire:.0f} bytes ({(wire - size) / size:+.1%}), {throughput:,.0f} MB/s')
@@ -0,0 +1,106 @@
+"""
+跨线程队列对比：5ms 轮询 queue.Queue 与 AsyncBridgeQueue
+改造前每个会话的事件、音频消费者都用 get_nowait + asyncio.sleep(0.005) 轮询，
+改造后回调线程通过 call_soon_threadsafe 投递，消费者 await get() 只在有数据时唤醒。
+- 空闲：SESSIONS 个会话、每会话两个消费者，队列无数据时统计进程 CPU 占用
+- 投递延迟：后台线程每 PRODUCE_INTERVAL 秒写入一条（模拟 ASR/TTS 回调），统计写入到消费者取出的延迟
+AsyncBridgeQueue 直接使用后端 services/async_queue.py 的实现，需在后端依赖环境中运行
+"""
+
+import asyncio
+import os
+import queue
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'aihr_test', 'backend'))
+
+from services.async_queue import AsyncBridgeQueue  # noqa: E402
+
+SESSIONS = 200
+CONSUMERS_PER_SESSION = 2       # 事件队列 + 音频队列
+IDLE_SECONDS = 3
+POLL_INTERVAL = 0.005           # 改造前的轮询间隔
+MESSAGES = 200
+PRODUCE_INTERVAL = 0.0073       # 与轮询间隔错开，避免恰好对齐
+
+
+async def poll_consumer(q: queue.Queue, on_item=None):
+    """改造前：轮询读取"""
+    while True:
+        try:
+            item = q.get_nowait()
+            if on_item:
+                on_item(item)
+        except queue.Empty:
+            pass
+        await asyncio.sleep(POLL_INTERVAL)
+
+
+async def bridge_consumer(q: AsyncBridgeQueue, on_item=None):
+    """改造后：有数据时才唤醒"""
+    while True:
+        item = await q.get()
+        if on_item:
+            on_item(item)
+
+
+CASES = (
+    ('poll 5ms', queue.Queue, poll_consumer),
+    ('AsyncBridgeQueue', lambda: AsyncBridgeQueue('bench'), bridge_consumer),
+)
+
+
+async def measure_idle(make_queue, consumer) -> float:
+    """全部消费者空闲时每个会话每秒占用的 CPU（微秒）"""
+    tasks = [
+        asyncio.create_task(consumer(make_queue()))
+        for _ in range(SESSIONS * CONSUMERS_PER_SESSION)
+    ]
+    await asyncio.sleep(0.2)
+    start = time.process_time()
+    await asyncio.sleep(IDLE_SECONDS)
+    elapsed = time.process_time() - start
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return elapsed / IDLE_SECONDS / SESSIONS * 1e6
+
+
+async def measure_latency(make_queue, consumer):
+    """后台线程写入到消费者取出的延迟（毫秒），返回 p50、p99"""
+    q = make_queue()
+    latencies = []
+    done = asyncio.get_running_loop().create_future()
+
+    def on_item(sent_at):
+        latencies.append((time.perf_counter() - sent_at) * 1000)
+        if len(latencies) == MESSAGES and not done.done():
+            done.set_result(None)
+
+    def produce():
+        for _ in range(MESSAGES):
+            q.put(time.perf_counter())
+            time.sleep(PRODUCE_INTERVAL)
+
+    task = asyncio.create_task(consumer(q, on_item))
+    threading.Thread(target=produce, daemon=True).start()
+    await done
+    task.cancel()
+    latencies.sort()
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99) - 1]
+
+
+async def main():
+    print(f'{SESSIONS} sessions x {CONSUMERS_PER_SESSION} consumers idle for {IDLE_SECONDS}s, '
+          f'{MESSAGES} messages from a callback thread every {PRODUCE_INTERVAL * 1000:.1f}ms')
+    for name, make_queue, consumer in CASES:
+        idle_us = await measure_idle(make_queue, consumer)
+        p50, p99 = await measure_latency(make_queue, consumer)
+        print(f'  [{name:16}] idle CPU {idle_us:8.1f} us/s per session ({idle_us * SESSIONS / 1e4:5.1f}% of a core), '
+              f'delivery p50 {p50:.3f} ms, p99 {p99:.3f} ms')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,145 @@
+"""
+下行音频缓冲对比：逐条保存 bytes + 分帧器拷贝 与 预分配环形缓冲区
+模拟 TTS 回调按随机长度写入 audio.delta、发送任务按 40ms 整数倍（最长 200ms）取帧的过程，
+统计每秒音频的内存分配量、发生分配的操作数与 CPU 耗时。
+两种方式都要先 base64 解码 audio.delta，这一步的分配相同，不计入对比。
+环形缓冲区直接使用后端 services/audio_output.py 的实现，需在后端依赖环境中运行
+"""
+
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', 'aihr_test', 'backend'))
+
+from services.audio_output import PcmRingBuffer, frame_bytes_for  # noqa: E402
+
+AUDIO_SECONDS = 60
+DELTA_SIZES = (1920, 2880, 4800, 9600)   # 20ms ~ 200ms
+FRAME_BYTES = frame_bytes_for(40)
+MAX_FRAME_BYTES = frame_bytes_for(200)
+RING_BYTES = frame_bytes_for(10000)
+ALLOC_THRESHOLD = 1024                   # 小于此值的分配（memoryview 对象、整数等）不计为一次 PCM 分配
+
+
+def make_deltas():
+    random.seed(1)
+    deltas, total = [], 0
+    while total < AUDIO_SECONDS * 48000:
+        delta = os.urandom(random.choice(DELTA_SIZES))
+        deltas.append(delta)
+        total += len(delta)
+    return deltas
+
+
+class QueueCoalescer:
+    """改造前：队列逐条保存 delta，分帧时拷贝进缓冲区再切出新的 bytes"""
+
+    def __init__(self):
+        self.queue = deque()
+        self.buffer = bytearray(MAX_FRAME_BYTES)
+        self.view = memoryview(self.buffer)
+        self.filled = 0
+
+    def put(self, pcm: bytes):
+        self.queue.append(pcm)
+
+    def frames(self):
+        while self.queue:
+            data = memoryview(self.queue.popleft())
+            offset = 0
+            while offset < len(data):
+                n = min(MAX_FRAME_BYTES - self.filled, len(data) - offset)
+                self.view[self.filled:self.filled + n] = data[offset:offset + n]
+                self.filled += n
+                offset += n
+                if self.filled == MAX_FRAME_BYTES:
+                    yield bytes(self.buffer)
+                    self.filled = 0
+        whole = self.filled - self.filled % FRAME_BYTES
+        if whole:
+            frame = bytes(self.view[:whole])
+            remainder = self.filled - whole
+            self.view[:remainder] = self.view[whole:self.filled]
+            self.filled = remainder
+            yield frame
+
+
+class Ring:
+    """改造后：写入预分配的环形缓冲区，发送时取切片，发完再释放"""
+
+    def __init__(self):
+        self.ring = PcmRingBuffer('bench', RING_BYTES, MAX_FRAME_BYTES, loop=object())
+
+    def put(self, pcm: bytes):
+        self.ring.put(pcm)
+
+    def frames(self):
+        while True:
+            frame = self.ring.peek(MAX_FRAME_BYTES, FRAME_BYTES)
+            if frame is None:
+                return
+            yield frame
+            self.ring.consume(len(frame))
+
+
+def run(buffer, deltas, on_step=None):
+    """每写入几条 delta 取一次帧（TTS 快于实时），返回帧数"""
+    frames = 0
+    for i in range(0, len(deltas), 4):
+        for delta in deltas[i:i + 4]:
+            buffer.put(delta)
+            if on_step:
+                on_step()
+        for frame in buffer.frames():
+            frames += 1
+            if on_step:
+                on_step()
+    return frames
+
+
+def measure_allocations(factory, deltas):
+    """逐个操作记录 tracemalloc 峰值增量：累计为分配字节数，超过阈值的计为一次 PCM 分配"""
+    buffer = factory()
+    stats = {'bytes': 0, 'allocs': 0}
+    tracemalloc.start()
+    baseline = [tracemalloc.get_traced_memory()[0]]
+
+    def on_step():
+        current, peak = tracemalloc.get_traced_memory()
+        grown = peak - baseline[0]
+        if grown >= ALLOC_THRESHOLD:
+            stats['bytes'] += grown
+            stats['allocs'] += 1
+        tracemalloc.reset_peak()
+        baseline[0] = tracemalloc.get_traced_memory()[0]
+
+    run(buffer, deltas, on_step)
+    tracemalloc.stop()
+    return stats
+
+
+def measure_cpu(factory, deltas, rounds=5):
+    best = None
+    for _ in range(rounds):
+        buffer = factory()
+        start = time.process_time()
+        frames = run(buffer, deltas)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, frames
+
+
+if __name__ == '__main__':
+    deltas = make_deltas()
+    seconds = sum(len(delta) for delta in deltas) / 48000
+    print(f'{len(deltas)} deltas, {seconds:.0f}s of 24kHz audio, frames 40ms x N (max 200ms)')
+    for name, factory in (('queue+coalescer', QueueCoalescer), ('ring buffer    ', Ring)):
+        stats = measure_allocations(factory, deltas)
+        cpu, frames = measure_cpu(factory, deltas)
+        print(f'  [{name}] {frames / seconds:5.1f} frames/s, '
+              f'{stats["allocs"] / seconds:6.1f} PCM allocations/s, {stats["bytes"] / seconds / 1024:7.1f} KiB allocated/s, '
+              f'CPU {cpu * 1e6 / seconds:6.1f} us per audio second')
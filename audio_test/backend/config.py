@@ -15,6 +15,11 @@ class Settings:
     ASR_MODEL: str = os.getenv("ASR_MODEL", "qwen3-asr-flash-realtime")
     ASR_SAMPLE_RATE: int = int(os.getenv("ASR_SAMPLE_RATE", "16000"))
     ASR_LANGUAGE: str = os.getenv("ASR_LANGUAGE", "zh")
+    ASR_VAD_SILENCE_MS: int = int(os.getenv("ASR_VAD_SILENCE_MS", "800"))              # 服务端 VAD 判定一句话结束的静音时长
+    ASR_RECONNECT_INTERVAL: float = float(os.getenv("ASR_RECONNECT_INTERVAL", "2"))    # 连接断开后的最小重连间隔（秒）
+    ASR_FINAL_TIMEOUT: float = float(os.getenv("ASR_FINAL_TIMEOUT", "3"))              # 结束输入后等待最终识别结果的上限（秒）
+    ASR_SPEECH_START_GRACE_MS: float = float(os.getenv("ASR_SPEECH_START_GRACE_MS", "500"))  # 结束输入时已发送音频但 VAD 尚未开始，等待 speech_started 的时长（毫秒）
+    ASR_BATCH_MS: float = float(os.getenv("ASR_BATCH_MS", "100"))                      # 上行音频攒够该时长（毫秒）再送入 ASR，0 表示逐块发送
     
     # LLM 配置
     LLM_MODEL: str = os.getenv("LLM_MODEL", "qwen-plus")
@@ -32,14 +37,57 @@ class Settings:
 8. 回答要简洁有重点，不要太长"""
     )
     
+    # 插话打断：识别到用户开口时停止正在生成和播放的回复
+    BARGE_IN_ENABLED: bool = os.getenv("BARGE_IN_ENABLED", "true").lower() == "true"
+    
     # TTS 配置
     TTS_MODEL: str = os.getenv("TTS_MODEL", "qwen3-tts-flash-realtime")
     TTS_VOICE: str = os.getenv("TTS_VOICE", "Maia")
     TTS_SAMPLE_RATE: int = int(os.getenv("TTS_SAMPLE_RATE", "24000"))
+    TTS_MODE: str = os.getenv("TTS_MODE", "commit")  # commit：分句后逐句提交；server_commit：LLM 片段直接追加，由服务端分段
+    TTS_SENTENCE_DELIMITERS: str = os.getenv("TTS_SENTENCE_DELIMITERS", "。！？；.!?;\n")  # 句末标点，遇到即送入 TTS
+    TTS_CLAUSE_DELIMITERS: str = os.getenv("TTS_CLAUSE_DELIMITERS", "，、：,:")             # 句内逗号
+    TTS_CLAUSE_MIN_CHARS: int = int(os.getenv("TTS_CLAUSE_MIN_CHARS", "0"))               # 累计达到该字数时在逗号处切分，0 表示不按逗号切分
+    TTS_MAX_LATENCY_MS: float = float(os.getenv("TTS_MAX_LATENCY_MS", "0"))               # 文本等待成句的最长时间（毫秒），0 表示不限制
+    TTS_FIRST_CHUNK_CHARS: int = int(os.getenv("TTS_FIRST_CHUNK_CHARS", "10"))             # 首块累计达到该字数即送入 TTS（首块遇到逗号也立即送入），0 表示关闭自适应首块
+    TTS_FIRST_CHUNK_MS: float = float(os.getenv("TTS_FIRST_CHUNK_MS", "300"))             # 首块文本最长等待时间（毫秒）
+    TTS_CHUNK_GROWTH: float = float(os.getenv("TTS_CHUNK_GROWTH", "2"))                   # 后续每块的逗号切分字数按该倍数增长
+    TTS_MAX_CHUNK_CHARS: int = int(os.getenv("TTS_MAX_CHUNK_CHARS", "40"))                # 增长超过该字数后恢复 TTS_CLAUSE_MIN_CHARS 的设置
     
     # WebSocket 配置
     WS_BASE_URL: str = os.getenv("WS_BASE_URL", "wss://dashscope.aliyuncs.com/api-ws/v1/realtime")
     
+    # 连接池配置（预建立的 ASR/TTS 实时连接）
+    POOL_MIN_IDLE: int = int(os.getenv("POOL_MIN_IDLE", "0"))                          # 每类连接至少保持的空闲数，0 表示不预建连接（会话结束归还的连接仍会复用）
+    POOL_MAX_IDLE: int = int(os.getenv("POOL_MAX_IDLE", "10"))                         # 每类连接最多保留的空闲数，0 表示不复用
+    POOL_IDLE_TIMEOUT: float = float(os.getenv("POOL_IDLE_TIMEOUT", "120"))            # 空闲超过该时长（秒）的连接被淘汰
+    POOL_MAX_AGE: float = float(os.getenv("POOL_MAX_AGE", "600"))                      # 连接最长使用时长（秒），超过后不再放回池中
+    POOL_MAINTENANCE_INTERVAL: float = float(os.getenv("POOL_MAINTENANCE_INTERVAL", "5"))  # 后台维护间隔（秒）
+    
+    # 下行音频分帧（TTS 音频凑成固定时长的帧再发送）
+    AUDIO_FRAME_MS: float = float(os.getenv("AUDIO_FRAME_MS", "40"))                  # 帧长单位（毫秒），每帧为其整数倍，0 表示逐条转发 TTS 音频
+    AUDIO_MAX_FRAME_MS: float = float(os.getenv("AUDIO_MAX_FRAME_MS", "200"))         # 单帧最长时长（毫秒）
+    AUDIO_RING_MS: float = float(os.getenv("AUDIO_RING_MS", "10000"))                # 每会话下行音频缓冲区大小（毫秒），写满后丢弃
+    AUDIO_PACING_ENABLED: bool = os.getenv("AUDIO_PACING_ENABLED", "false").lower() == "true"  # 是否按实时节奏发送
+    AUDIO_PACING_LEAD_MS: float = float(os.getenv("AUDIO_PACING_LEAD_MS", "300"))     # 按节奏发送时允许领先客户端播放的时长（毫秒）
+    
+    # 慢客户端背压（客户端收不动时限制服务端积压）
+    BACKPRESSURE_PAUSE_MS: float = float(os.getenv("BACKPRESSURE_PAUSE_MS", "4000"))    # 下行音频积压超过该时长（毫秒）时暂停提交 TTS 文本，0 表示不暂停
+    BACKPRESSURE_RESUME_MS: float = float(os.getenv("BACKPRESSURE_RESUME_MS", "2000"))  # 积压降到该时长（毫秒）以下时恢复提交
+    EVENT_QUEUE_MAX: int = int(os.getenv("EVENT_QUEUE_MAX", "200"))                     # 事件队列积压上限，达到后视为客户端停滞，0 表示不限制
+    SLOW_CLIENT_TIMEOUT: float = float(os.getenv("SLOW_CLIENT_TIMEOUT", "15"))          # 停滞持续该时长（秒）后断开连接，0 表示不断开
+    
+    # 会话清理（断开后在后台关闭 ASR/TTS 连接）
+    SESSION_TEARDOWN_CONCURRENCY: int = int(os.getenv("SESSION_TEARDOWN_CONCURRENCY", "2"))  # 同时进行的会话清理数（清理专用线程池的线程数）
+    SESSION_TEARDOWN_TIMEOUT: float = float(os.getenv("SESSION_TEARDOWN_TIMEOUT", "10"))     # 单个清理超过该时长（秒）记为超时（线程无法中止，名额保留到清理结束）
+    
+    # Opus 音频传输（客户端请求 opus.v1 子协议时启用，需安装 opuslib 与系统 libopus）
+    OPUS_ENABLED: bool = os.getenv("OPUS_ENABLED", "true").lower() == "true"
+    OPUS_BITRATE: int = int(os.getenv("OPUS_BITRATE", "24000"))              # 下行编码码率（bps）
+    OPUS_FRAME_MS: int = int(os.getenv("OPUS_FRAME_MS", "20"))               # 下行编码帧长（毫秒），取 10/20/40/60
+    OPUS_FLUSH_MS: float = float(os.getenv("OPUS_FLUSH_MS", "60"))           # 下行音频暂停超过该时长（毫秒）时补齐并发出不足一帧的尾部
+    AUDIO_CODEC_WORKERS: int = int(os.getenv("AUDIO_CODEC_WORKERS", "4"))    # 编解码线程数
+    
     # 服务器配置
     HOST: str = os.getenv("HOST", "0.0.0.0")
     PORT: int = int(os.getenv("PORT", "8000"))
@@ -5,138 +5,35 @@
 """
 
 import asyncio
-import base64
 import json
 import logging
-import queue
-import re
 import sys
 import threading
+import time
 import concurrent.futures
 from contextlib import asynccontextmanager
-from typing import Dict
+from typing import Dict, Optional
 
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 
 from config import settings
 from services import ASRService, LLMService, TTSService
+from services.asr_service import asr_pool
+from services.async_queue import AsyncBridgeQueue
+from services.metrics import metrics
+from services.text_segmenter import SentenceSegmenter
+from services.tts_service import tts_pool
+from services.ws_protocol import AudioChannel, select_subprotocol
+from services.audio_output import PcmRingBuffer, frame_bytes_for
+from services.audio_input import AudioInputBatcher
+from services.backpressure import SessionBackpressure, partial_transcript_key
+from services.turn_dispatcher import TurnDispatcher
+from services.session_scope import SessionScope
+from services.session_reaper import SessionReaper
+from services.tts_text import StreamingMarkdownCleaner, clean_fragment_for_tts, clean_text_for_tts
 
 
-def clean_text_for_tts(text: str) -> str:
-    """
-    清理并优化文本以供 TTS 朗读
-    1. 移除 Markdown 语法符号和表情符号
-    2. 优化韵律，让语音更自然
-    """
-    if not text:
-        return ""
-    
-    # ===== 第一步：移除 Markdown 语法 =====
-    
-    # 移除代码块（整块移除）
-    text = re.sub(r'```[\s\S]*?```', '', text)
-    
-    # 移除行内代码，保留内容
-    text = re.sub(r'`([^`]+)`', r'\1', text)
-    
-    # 移除标题符号，保留文字
-    text = re.sub(r'^#{1,6}\s*', '', text, flags=re.MULTILINE)
-    
-    # 移除粗体符号，保留文字
-    text = re.sub(r'\*\*(.+?)\*\*', r'\1', text)
-    text = re.sub(r'__(.+?)__', r'\1', text)
-    
-    # 移除斜体符号，保留文字
-    text = re.sub(r'\*(.+?)\*', r'\1', text)
-    text = re.sub(r'_(.+?)_', r'\1', text)
-    
-    # 移除链接，保留文字
-    text = re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', text)
-    
-    # 移除图片
-    text = re.sub(r'!\[([^\]]*)\]\([^)]+\)', '', text)
-    
-    # 移除引用符号
-    text = re.sub(r'^>\s*', '', text, flags=re.MULTILINE)
-    
-    # 移除无序列表符号
-    text = re.sub(r'^[\*\-\+]\s+', '', text, flags=re.MULTILINE)
-    
-    # 移除有序列表符号
-    text = re.sub(r'^\d+\.\s+', '', text, flags=re.MULTILINE)
-    
-    # 移除分隔线
-    text = re.sub(r'^[-*_]{3,}\s*$', '', text, flags=re.MULTILINE)
-    
-    # ===== 第二步：移除表情和特殊符号 =====
-    
-    emoji_pattern = re.compile(
-        "["
-        "\U0001F600-\U0001F64F"
-        "\U0001F300-\U0001F5FF"
-        "\U0001F680-\U0001F6FF"
-        "\U0001F1E0-\U0001F1FF"
-        "\U0001F900-\U0001F9FF"
-        "\U0001FA00-\U0001FAFF"
-        "\U00002702-\U000027B0"
-        "\U0001F004-\U0001F0CF"
-        "]+"
-    )
-    text = emoji_pattern.sub('', text)
-    
-    # 移除特殊装饰符号
-    text = re.sub(r'[◆◇●○■□▲△▼▽★☆♠♣♥♦→←↑↓↔↕【】「」『』〖〗]', '', text)
-    
-    # ===== 第三步：韵律优化 =====
-    
-    # 将英文句号转为中文句号（更自然的停顿）
-    text = re.sub(r'\.(\s|$)', '。', text)
-    
-    # 将英文逗号转为中文逗号
-    text = re.sub(r',(\s|$)', '，', text)
-    
-    # 将英文问号转为中文问号
-    text = re.sub(r'\?(\s|$)', '？', text)
-    
-    # 将英文感叹号转为中文感叹号
-    text = re.sub(r'!(\s|$)', '！', text)
-    
-    # 将冒号后添加短暂停顿（用逗号代替）
-    text = re.sub(r'：\s*', '，', text)
-    text = re.sub(r':\s*', '，', text)
-    
-    # 括号内容转为逗号分隔（让TTS能读出来）
-    text = re.sub(r'[（(]([^）)]+)[）)]', r'，\1，', text)
-    
-    # 处理破折号，转为逗号
-    text = re.sub(r'——', '，', text)
-    text = re.sub(r'--', '，', text)
-    
-    # 处理省略号，保留但限制长度
-    text = re.sub(r'\.{3,}', '...', text)
-    text = re.sub(r'。{2,}', '。', text)
-    
-    # 连续标点简化
-    text = re.sub(r'[，,]{2,}', '，', text)
-    text = re.sub(r'[。.]{2,}', '。', text)
-    
-    # ===== 第四步：清理空白 =====
-    
-    # 换行转为句号或逗号（让段落连贯）
-    text = re.sub(r'\n+', '，', text)
-    
-    # 清理多余空格
-    text = re.sub(r' {2,}', ' ', text)
-    text = re.sub(r'\s*([，。！？])\s*', r'\1', text)
-    
-    # 开头不要标点
-    text = re.sub(r'^[，。！？、]+', '', text)
-    
-    text = text.strip()
-    
-    return text
-
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -145,38 +42,68 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 每轮 TTS 文本块数的直方图分桶
+TURN_CHUNK_BUCKETS = (1, 2, 3, 5, 8, 13, 21, 34)
+
 # 线程池执行器
 executor = concurrent.futures.ThreadPoolExecutor(max_workers=10)
+# 会话清理（关闭 ASR/TTS 连接）在后台专用线程池中排队执行，不阻塞事件循环
+session_reaper = SessionReaper()
 
 
 class VoiceChatSession:
     """语音聊天会话管理"""
     
-    def __init__(self, websocket: WebSocket, session_id: str):
+    def __init__(self, websocket: WebSocket, session_id: str, audio_protocol: Optional[str] = None):
         self.websocket = websocket
         self.session_id = session_id
+        self.scope = SessionScope(session_id, executor)  # 本会话的任务与线程池调用，断开时一并取消
+        self.audio_channel = AudioChannel(websocket, audio_protocol)  # 音频按握手结果走 Opus、二进制帧或 base64 JSON
+        # TTS 音频按 AUDIO_FRAME_MS 的整数倍分帧下发，按节奏发送时每帧一个 AUDIO_FRAME_MS；为 0 时有多少发多少
+        self._frame_quantum = frame_bytes_for(settings.AUDIO_FRAME_MS) if settings.AUDIO_FRAME_MS > 0 else 0
+        self._max_frame_bytes = frame_bytes_for(
+            settings.AUDIO_FRAME_MS if settings.AUDIO_PACING_ENABLED and self._frame_quantum else settings.AUDIO_MAX_FRAME_MS
+        )
         
-        # 创建队列
-        self.event_queue = queue.Queue()  # ASR/TTS 事件队列
-        self.audio_queue = queue.Queue()  # TTS 音频数据队列
-        self.llm_queue = queue.Queue()    # LLM 输出队列
+        # 创建队列（回调线程写入，事件循环中等待读取）
+        self.event_queue = AsyncBridgeQueue(        # ASR/TTS 事件队列，积压时只保留最新的识别中间结果
+            "event", coalesce=partial_transcript_key
+        )
+        self.audio_queue = PcmRingBuffer(           # TTS 音频环形缓冲区（固定大小）
+            "audio_ring", frame_bytes_for(settings.AUDIO_RING_MS), self._max_frame_bytes
+        )
+        self.llm_queue = AsyncBridgeQueue("llm")      # LLM 输出队列
+        self.backpressure = SessionBackpressure(self.audio_queue, self.event_queue)  # 客户端收不动时暂停 TTS、超时断开
+        self.turns = TurnDispatcher(session_id)     # 按顺序处理轮次，接收循环不等待
         
         # 初始化服务
         self.asr_service = ASRService(self.event_queue)
         self.llm_service = LLMService()
-        self.tts_service = TTSService(self.audio_queue, self.event_queue)
+        self.tts_service = TTSService(self.audio_queue, self.event_queue, cancel_token=self.scope.cancelled)
+        # 上行音频攒批后由发送任务送入 ASR，接收循环不等待 SDK 调用
+        self.audio_input = AudioInputBatcher(
+            self.asr_service.send_audio,
+            self.scope,
+            frame_bytes_for(settings.ASR_BATCH_MS, settings.ASR_SAMPLE_RATE),
+            settings.ASR_BATCH_MS
+        )
         
         self.is_active = True
-        self._recognized_text = ""
+        
+        # 插话打断状态
+        self._cancel_event: Optional[threading.Event] = None  # 当前 LLM 生成的取消信号
+        self._generating = False      # 是否正在生成本轮回复
+        self._interrupted = False     # 本轮回复是否已被打断
+        self._playback_until = 0.0    # 估算的客户端播放结束时间（monotonic）
+        self._turn_started_at: Optional[float] = None  # 本轮开始处理的时间，收到首个音频后清空
+        self._turn_chunks = 0         # 本轮送入 TTS 的文本块数
         
     async def initialize(self) -> bool:
         """初始化所有服务"""
         try:
-            loop = asyncio.get_event_loop()
-            
             # 并行初始化 ASR 和 TTS
-            asr_future = loop.run_in_executor(executor, self.asr_service.create_session)
-            tts_future = loop.run_in_executor(executor, self.tts_service.create_session)
+            asr_future = self.scope.run_in_executor(self.asr_service.create_session)
+            tts_future = self.scope.run_in_executor(self.tts_service.create_session)
             
             asr_success, tts_success = await asyncio.gather(asr_future, tts_future)
             
@@ -207,11 +134,16 @@ class VoiceChatSession:
         """发送音频数据到客户端"""
         try:
             if self.is_active:
-                audio_b64 = base64.b64encode(audio_data).decode('ascii')
-                await self.websocket.send_json({
-                    "type": "audio.delta",
-                    "data": audio_b64
-                })
+                await self.audio_channel.send(audio_data)
+                if self._turn_started_at is not None:
+                    # 本轮首个音频：记录首音延迟
+                    first_audio_ms = (time.perf_counter() - self._turn_started_at) * 1000
+                    self._turn_started_at = None
+                    metrics.observe("turn.first_audio_ms", first_audio_ms)
+                    logger.info(f"Session {self.session_id}: First audio after {first_audio_ms:.0f} ms")
+                # 16bit 单声道 PCM，按时长累加估算播放结束时间
+                now = time.monotonic()
+                self._playback_until = max(self._playback_until, now) + len(audio_data) / (settings.TTS_SAMPLE_RATE * 2)
         except Exception as e:
             logger.error(f"Session {self.session_id}: Failed to send audio - {e}")
             
@@ -219,43 +151,204 @@ class VoiceChatSession:
         """处理事件队列（ASR/TTS 事件）"""
         while self.is_active:
             try:
-                try:
-                    event = self.event_queue.get_nowait()
-                    
-                    if event['type'] == 'transcription.final':
-                        self._recognized_text = event.get('text', '')
-                        
-                    await self.send_message(event)
-                    
-                except queue.Empty:
-                    pass
+                event = await self.event_queue.get()
+                
+                if event['type'] == 'speech.started' and settings.BARGE_IN_ENABLED and self._is_responding():
+                    await self._interrupt_response()
                     
-                await asyncio.sleep(0.005)
+                await self.send_message(event)
                 
             except Exception as e:
                 logger.error(f"Session {self.session_id}: Event queue error - {e}")
                 await asyncio.sleep(0.1)
                 
+    def _is_responding(self) -> bool:
+        """是否仍在生成、合成或播放回复"""
+        return (
+            self._generating
+            or not self.audio_queue.empty()
+            or self._playback_until > time.monotonic()
+            or (self.tts_service.callback is not None and not self.tts_service.callback.idle)
+        )
+        
+    async def _interrupt_response(self):
+        """
+        用户插话：停止 LLM 生成与 TTS 合成，丢弃缓冲的音频，通知客户端停止播放
+        """
+        self._interrupted = True
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self.llm_queue.put_nowait({'type': 'cancelled'})
+            
+        # 先让回调开始丢弃旧音频，再清空已投递到队列的部分
+        await self.scope.run_in_executor(self.tts_service.cancel)
+        dropped = self.audio_queue.clear()
+        self._playback_until = 0.0
+        self._turn_started_at = None
+        await self.audio_channel.next_stream(discard=True)
+        
+        metrics.incr("bargein.count")
+        metrics.incr("bargein.dropped_audio_bytes", dropped)
+        logger.info(f"Session {self.session_id}: Response interrupted by user, dropped {dropped} bytes of audio")
+        await self.send_message({"type": "response.interrupted"})
+        
+    async def disconnect_slow_client(self):
+        """
+        客户端长时间收不动：停止本轮回复、丢弃积压，主动断开连接（1013，客户端可稍后重连）
+        """
+        logger.warning(
+            f"Session {self.session_id}: Client stalled for {settings.SLOW_CLIENT_TIMEOUT:.0f}s, disconnecting "
+            f"({self.backpressure.stats()})"
+        )
+        self.is_active = False
+        self._interrupted = True
+        if self._cancel_event is not None:
+            self._cancel_event.set()
+            self.llm_queue.put_nowait({'type': 'cancelled'})
+        await self.scope.run_in_executor(self.tts_service.cancel)
+        self.audio_queue.clear()
+        self.event_queue.clear()
+        try:
+            await self.websocket.close(code=1013)
+        except Exception as e:
+            logger.debug(f"Session {self.session_id}: Close after stall failed - {e}")
+            
     async def process_audio_queue(self):
-        """处理音频队列，实时发送音频到客户端"""
+        """
+        处理音频缓冲区，实时发送音频到客户端
+        
+        按 AUDIO_FRAME_MS 的整数倍从环形缓冲区取出连续切片发送；不足 AUDIO_FRAME_MS 的尾部在
+        音频暂停一个 AUDIO_FRAME_MS 后发出，客户端已无音频可播时立即发出，不增加首音延迟
+        """
+        ring = self.audio_queue
         while self.is_active:
             try:
-                try:
-                    audio_data = self.audio_queue.get_nowait()
-                    await self.send_audio(audio_data)
-                except queue.Empty:
-                    pass
-                    
-                await asyncio.sleep(0.005)
+                align = 2
+                if self._frame_quantum and self._playback_until > time.monotonic():
+                    align = self._frame_quantum
+                if ring.readable < align:
+                    if not await ring.wait_readable(align, self._audio_flush_timeout()):
+                        await self._flush_audio()
+                    continue
+                await self._send_ring_frame(align)
                 
             except Exception as e:
                 logger.error(f"Session {self.session_id}: Audio queue error - {e}")
                 await asyncio.sleep(0.1)
                 
-    async def handle_audio_input(self, audio_data: bytes):
-        """处理音频输入"""
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(executor, self.asr_service.send_audio, audio_data)
+    def _audio_flush_timeout(self) -> Optional[float]:
+        """有未发出的尾部时等待新音频的超时（秒），没有时返回 None"""
+        if not self.audio_queue.empty():
+            return settings.AUDIO_FRAME_MS / 1000
+        if self.audio_channel.pending:
+            # Opus 编码器里还有不足一帧的尾部
+            return settings.OPUS_FLUSH_MS / 1000
+        return None
+        
+    async def _flush_audio(self):
+        """音频暂停：发出缓冲区与编码器中的尾部"""
+        if not self.audio_queue.empty():
+            await self._send_ring_frame(2)
+        await self.audio_channel.flush()
+        
+    async def _send_ring_frame(self, align: int):
+        """
+        从环形缓冲区取一帧发送，发送完成后再释放
+        
+        启用 AUDIO_PACING_ENABLED 时按实时节奏发送：客户端缓冲超过 AUDIO_PACING_LEAD_MS 就等待，
+        等待期间被打断的帧直接丢弃
+        """
+        ring = self.audio_queue
+        generation = ring.generation
+        frame = ring.peek(self._max_frame_bytes, align)
+        if frame is None:
+            return
+        if settings.AUDIO_PACING_ENABLED:
+            delay = self._playback_until - settings.AUDIO_PACING_LEAD_MS / 1000 - time.monotonic()
+            if delay > 0:
+                metrics.observe("audio_out.pacing_wait_ms", delay * 1000)
+                await asyncio.sleep(delay)
+        if generation != ring.generation:
+            metrics.incr("audio_out.stale_frames")
+            return
+        metrics.incr("audio_out.frames")
+        if self._frame_quantum and len(frame) % self._frame_quantum:
+            metrics.incr("audio_out.partial_frames")
+        await self.send_audio(frame)
+        if generation == ring.generation:
+            ring.consume(len(frame))
+            
+    def handle_audio_input(self, audio_data: bytes):
+        """处理音频输入（写入攒批缓冲区，由发送任务送入 ASR）"""
+        self.audio_input.feed(audio_data)
+        
+    def _record_turn_chunks(self):
+        """记录本轮送入 TTS 的文本块数"""
+        if self._turn_chunks:
+            metrics.observe("turn.tts_chunks", self._turn_chunks, buckets=TURN_CHUNK_BUCKETS)
+            logger.info(f"Session {self.session_id}: Turn sent {self._turn_chunks} chunks to TTS")
+            
+    def _new_segmenter(self) -> SentenceSegmenter:
+        """按配置创建分句器"""
+        return SentenceSegmenter(
+            delimiters=settings.TTS_SENTENCE_DELIMITERS,
+            clause_delimiters=settings.TTS_CLAUSE_DELIMITERS,
+            min_clause_chars=settings.TTS_CLAUSE_MIN_CHARS,
+            max_latency_ms=settings.TTS_MAX_LATENCY_MS,
+            first_chunk_chars=settings.TTS_FIRST_CHUNK_CHARS,
+            first_chunk_ms=settings.TTS_FIRST_CHUNK_MS,
+            chunk_growth=settings.TTS_CHUNK_GROWTH,
+            max_chunk_chars=settings.TTS_MAX_CHUNK_CHARS
+        )
+        
+    async def _speak_sentence(self, sentence: str):
+        """清理文本后送入 TTS"""
+        if not sentence.strip() or self._interrupted:
+            return
+        clean_sentence = clean_text_for_tts(sentence)
+        if clean_sentence.strip():
+            await self.backpressure.wait_for_room()
+            if self._interrupted:
+                return
+            self._turn_chunks += 1
+            await self.scope.run_in_executor(
+                self.tts_service.synthesize_text_nowait,
+                clean_sentence
+            )
+            
+    async def _speak_fragment(self, text: str):
+        """server_commit 模式：清理后的片段直接追加，由服务端分段合成"""
+        if self._interrupted:
+            return
+        fragment = clean_fragment_for_tts(text)
+        if fragment:
+            await self.backpressure.wait_for_room()
+            if self._interrupted:
+                return
+            self._turn_chunks += 1
+            await self.scope.run_in_executor(
+                self.tts_service.append_text_nowait,
+                fragment
+            )
+            
+    async def _speak_text(self, text: str, segmenter: SentenceSegmenter):
+        """按 TTS 模式送出已清理 Markdown 的文本：server_commit 直接追加，commit 分句提交"""
+        if self.tts_service.server_commit:
+            await self._speak_fragment(text)
+            return
+        for sentence in segmenter.feed(text):
+            await self._speak_sentence(sentence)
+            
+    async def _finish_speaking(self, segmenter: SentenceSegmenter, cleaner: StreamingMarkdownCleaner):
+        """送出剩余文本；server_commit 模式提交缓冲区，让服务端合成最后一段"""
+        await self._speak_text(cleaner.flush(), segmenter)
+        if self.tts_service.server_commit:
+            if not self._interrupted:
+                await self.scope.run_in_executor(self.tts_service.commit_pending)
+        else:
+            await self._speak_sentence(segmenter.flush())
+        if cleaner.dropped:
+            metrics.incr("tts.markup_chars_dropped", cleaner.dropped)
             
     async def process_user_input(self, text: str):
         """
@@ -264,101 +357,84 @@ class VoiceChatSession:
         LLM 流式生成 → 实时分句 → TTS 流式合成 → 音频实时发送
         """
         try:
+            self._interrupted = False
+            self._generating = True
+            self._turn_started_at = time.perf_counter()
+            self._turn_chunks = 0
+            await self.audio_channel.next_stream()
             await self.send_message({"type": "response.started"})
             
-            loop = asyncio.get_event_loop()
-            
             # 清空 LLM 队列
-            while not self.llm_queue.empty():
-                try:
-                    self.llm_queue.get_nowait()
-                except queue.Empty:
-                    break
+            self.llm_queue.clear()
             
             # 在线程池中启动 LLM 流式生成
-            llm_future = loop.run_in_executor(
-                executor,
+            self._cancel_event = self.scope.new_token()
+            llm_future = self.scope.run_in_executor(
                 self.llm_service.generate_stream_sync,
                 text,
-                self.llm_queue
+                self.llm_queue,
+                self._cancel_event
             )
             
             # 流水线处理：从 LLM 队列读取 → 分句 → TTS 合成
-            buffer = ""
+            segmenter = self._new_segmenter()
+            cleaner = StreamingMarkdownCleaner()
+            self.tts_service.begin_reply()
             full_response = []
-            sentence_delimiters = ["。", "！", "？", "；", ".", "!", "?", ";", "\n"]
             llm_done = False
             
             while not llm_done:
                 try:
-                    # 非阻塞读取 LLM 输出
-                    try:
-                        item = self.llm_queue.get_nowait()
-                        
-                        if item['type'] == 'text':
-                            content = item['content']
-                            full_response.append(content)
-                            buffer += content
-                            
-                            # 发送文本到客户端
-                            await self.send_message({
-                                "type": "response.delta",
-                                "text": content
-                            })
-                            
-                        elif item['type'] == 'done':
-                            llm_done = True
+                    # 等待 LLM 输出（有数据时才唤醒；开启延迟上限时到点强制分句）
+                    timeout = segmenter.time_until_flush()
+                    if timeout is None:
+                        item = await self.llm_queue.get()
+                    else:
+                        try:
+                            item = await asyncio.wait_for(self.llm_queue.get(), timeout)
+                        except asyncio.TimeoutError:
+                            for sentence in segmenter.poll():
+                                await self._speak_sentence(sentence)
+                            continue
                             
-                        elif item['type'] == 'error':
-                            await self.send_message({
-                                "type": "error",
-                                "source": "llm",
-                                "message": item['content']
-                            })
-                            llm_done = True
-                            
-                    except queue.Empty:
-                        await asyncio.sleep(0.01)
-                        continue
-                    
-                    # 检查是否有完整的句子，立即发送给 TTS
-                    while True:
-                        earliest_pos = -1
-                        for delimiter in sentence_delimiters:
-                            pos = buffer.find(delimiter)
-                            if pos != -1 and (earliest_pos == -1 or pos < earliest_pos):
-                                earliest_pos = pos
-                                
-                        if earliest_pos == -1:
-                            break
-                            
-                        sentence = buffer[:earliest_pos + 1]
-                        buffer = buffer[earliest_pos + 1:]
+                    speak_text = ""
+                    if item['type'] == 'text':
+                        content = item['content']
+                        full_response.append(content)
+                        # 先去掉 Markdown 结构再分句，跨句的代码块、粗体、括号也能处理
+                        speak_text = cleaner.feed(content)
                         
-                        if sentence.strip():
-                            # 清理文本后发送给 TTS
-                            clean_sentence = clean_text_for_tts(sentence)
-                            if clean_sentence.strip():
-                                await loop.run_in_executor(
-                                    executor,
-                                    self.tts_service.synthesize_text_nowait,
-                                    clean_sentence
-                                )
-                            
+                        # 发送文本到客户端
+                        await self.send_message({
+                            "type": "response.delta",
+                            "text": content
+                        })
+                        
+                    elif item['type'] == 'done':
+                        llm_done = True
+                        
+                    elif item['type'] == 'cancelled':
+                        # 用户插话，剩余文本不再合成
+                        break
+                        
+                    elif item['type'] == 'error':
+                        await self.send_message({
+                            "type": "error",
+                            "source": "llm",
+                            "message": item['content']
+                        })
+                        llm_done = True
+                        
+                    # 完整的句子立即发送给 TTS（server_commit 模式下片段直接发送）
+                    await self._speak_text(speak_text, segmenter)
+                    
                 except Exception as e:
                     logger.error(f"Pipeline error: {e}")
                     break
                     
             # 处理剩余的文本
-            if buffer.strip():
-                clean_buffer = clean_text_for_tts(buffer)
-                if clean_buffer.strip():
-                    await loop.run_in_executor(
-                        executor,
-                        self.tts_service.synthesize_text_nowait,
-                        clean_buffer
-                    )
-                
+            await self._finish_speaking(segmenter, cleaner)
+            
             # 等待 LLM 线程完成
             await llm_future
             
@@ -375,30 +451,36 @@ class VoiceChatSession:
                 "source": "processing",
                 "message": str(e)
             })
+        finally:
+            self._generating = False
+            self._record_turn_chunks()
+            self._cancel_event = None
             
-    async def end_asr_and_process(self):
-        """结束 ASR 会话并处理识别结果"""
-        loop = asyncio.get_event_loop()
+    async def clear_history(self):
+        """清空对话历史"""
+        self.llm_service.clear_history()
+        await self.send_message({"type": "history.cleared"})
         
-        await loop.run_in_executor(executor, self.asr_service.end_session)
-        await asyncio.sleep(0.5)
+    async def end_asr_and_process(self):
+        """结束本轮语音输入并处理识别结果（ASR 连接保持，供下一轮继续使用）"""
         
-        recognized_text = self._recognized_text
-        self._recognized_text = ""
+        # 已收到的音频全部送入 ASR 后再结束本轮
+        await self.audio_input.drain()
+        await self.scope.run_in_executor(self.asr_service.end_turn)
+        recognized_text = await self.asr_service.wait_for_turn_transcript(settings.ASR_FINAL_TIMEOUT)
         
         if recognized_text:
             await self.process_user_input(recognized_text)
             
-        # 重新初始化 ASR
-        await loop.run_in_executor(executor, self.asr_service.create_session)
-            
     def cleanup(self):
-        """清理资源"""
+        """清理资源（阻塞调用，由 session_reaper 在线程池中执行）"""
         self.is_active = False
         try:
-            self.asr_service.close()
-            self.tts_service.finish()
-            self.tts_service.close()
+            # 连接归还连接池，仍在识别或合成的连接直接关闭
+            self.asr_service.release()
+            self.tts_service.release()
+            logger.info(f"Session {self.session_id}: {self.audio_channel.report()}")
+            logger.info(f"Session {self.session_id}: {self.backpressure.report()}")
             logger.info(f"Session {self.session_id}: Cleaned up")
         except Exception as e:
             logger.error(f"Session {self.session_id}: Cleanup error - {e}")
@@ -409,6 +491,20 @@ active_sessions: Dict[str, VoiceChatSession] = {}
 session_counter = 0
 
 
+async def maintain_connection_pools():
+    """后台维护连接池：淘汰过期连接，补足预建立的空闲连接"""
+    loop = asyncio.get_event_loop()
+    while True:
+        try:
+            await asyncio.gather(
+                loop.run_in_executor(executor, asr_pool.maintain),
+                loop.run_in_executor(executor, tts_pool.maintain)
+            )
+        except Exception as e:
+            logger.error(f"Connection pool maintenance error - {e}")
+        await asyncio.sleep(settings.POOL_MAINTENANCE_INTERVAL)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """应用生命周期管理"""
@@ -416,9 +512,17 @@ async def lifespan(app: FastAPI):
     logger.info(f"ASR Model: {settings.ASR_MODEL}")
     logger.info(f"LLM Model: {settings.LLM_MODEL}")
     logger.info(f"TTS Model: {settings.TTS_MODEL}")
+    maintenance_task = asyncio.create_task(maintain_connection_pools())
+    reaper_task = session_reaper.start()
     yield
-    for session in active_sessions.values():
-        session.cleanup()
+    maintenance_task.cancel()
+    for session_id, session in active_sessions.items():
+        session_reaper.submit(session_id, session.cleanup)
+    await session_reaper.drain(settings.SESSION_TEARDOWN_TIMEOUT)
+    reaper_task.cancel()
+    session_reaper.close()
+    asr_pool.close_all()
+    tts_pool.close_all()
     executor.shutdown(wait=False)
     logger.info("Voice Chat API shutdown complete")
 
@@ -446,7 +550,18 @@ async def root():
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "active_sessions": len(active_sessions)}
+    return {"status": "healthy", "active_sessions": len(active_sessions), "pending_teardowns": session_reaper.pending}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    return metrics.snapshot()
+
+
+@app.get("/sessions")
+async def get_sessions():
+    """各会话的缓冲区积压与峰值"""
+    return {session_id: session.backpressure.stats() for session_id, session in active_sessions.items()}
 
 
 @app.websocket("/ws/voice-chat")
@@ -454,12 +569,15 @@ async def voice_chat_websocket(websocket: WebSocket):
     """语音聊天 WebSocket 接口"""
     global session_counter
     
-    await websocket.accept()
+    # 客户端请求了 opus.v1 / pcm.v1 子协议时音频走二进制帧
+    subprotocol = select_subprotocol(websocket.scope.get("subprotocols", []))
+    await websocket.accept(subprotocol=subprotocol)
+    accepted_at = time.perf_counter()
     
     session_counter += 1
     session_id = f"session_{session_counter}"
     
-    session = VoiceChatSession(websocket, session_id)
+    session = VoiceChatSession(websocket, session_id, audio_protocol=subprotocol)
     active_sessions[session_id] = session
     
     try:
@@ -475,33 +593,52 @@ async def voice_chat_websocket(websocket: WebSocket):
             "type": "session.created",
             "session_id": session_id
         })
+        metrics.observe("session.init_ms", (time.perf_counter() - accepted_at) * 1000)
         
         # 启动队列处理任务
-        event_task = asyncio.create_task(session.process_event_queue())
-        audio_task = asyncio.create_task(session.process_audio_queue())
+        session.scope.spawn(session.process_event_queue())
+        session.scope.spawn(session.process_audio_queue())
+        session.scope.spawn(session.audio_input.run())
+        session.scope.spawn(session.backpressure.watch(session.disconnect_slow_client))
+        session.scope.spawn(session.turns.run())
         
         while True:
             try:
-                data = await websocket.receive_json()
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+                    
+                frame = message.get("bytes")
+                if frame is not None:
+                    # 二进制音频帧
+                    audio_data = await session.audio_channel.decode_frame(frame)
+                    if audio_data:
+                        session.handle_audio_input(audio_data)
+                    continue
+                    
+                text = message.get("text") or ""
+                received_at = time.perf_counter()
+                data = json.loads(text)
                 msg_type = data.get("type", "")
                 
                 if msg_type == "audio.input":
+                    # 未协商二进制子协议的客户端
                     audio_b64 = data.get("data", "")
                     if audio_b64:
-                        audio_data = base64.b64decode(audio_b64)
-                        await session.handle_audio_input(audio_data)
+                        audio_data = session.audio_channel.decode_message(audio_b64, len(text), received_at)
+                        session.handle_audio_input(audio_data)
                         
                 elif msg_type == "audio.end":
-                    await session.end_asr_and_process()
-                        
+                    session.turns.submit(msg_type, session.end_asr_and_process)
+                    
                 elif msg_type == "text.input":
                     text = data.get("text", "")
                     if text:
-                        await session.process_user_input(text)
+                        session.turns.submit(msg_type, session.process_user_input, text)
                         
                 elif msg_type == "clear.history":
-                    session.llm_service.clear_history()
-                    await websocket.send_json({"type": "history.cleared"})
+                    # 排在进行中的轮次之后，避免清空后又写入本轮对话
+                    session.turns.submit(msg_type, session.clear_history)
                     
             except WebSocketDisconnect:
                 logger.info(f"Session {session_id}: Client disconnected")
@@ -516,11 +653,12 @@ async def voice_chat_websocket(websocket: WebSocket):
     except Exception as e:
         logger.error(f"Session {session_id}: WebSocket error - {e}")
     finally:
-        if 'event_task' in locals():
-            event_task.cancel()
-        if 'audio_task' in locals():
-            audio_task.cancel()
-        session.cleanup()
+        # 取消本会话的全部任务，进行中的 LLM 生成与 TTS 发送随取消信号停止
+        leaked = await session.scope.close()
+        if leaked:
+            logger.info(f"Session {session_id}: {leaked} executor jobs still running after disconnect")
+        # 关闭连接交给后台回收任务，不在事件循环中等待
+        session_reaper.submit(session_id, session.cleanup)
         if session_id in active_sessions:
             del active_sessions[session_id]
         logger.info(f"Session {session_id}: Closed")
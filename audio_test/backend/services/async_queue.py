@@ -0,0 +1,106 @@
+"""
+线程安全的异步队列
+ASR/TTS 回调线程通过 put() 写入，事件循环中的消费者 await get() 读取，
+消费者只在有数据时才会被唤醒，不再需要轮询
+"""
+
+import asyncio
+import logging
+import queue
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncBridgeQueue:
+    """
+    跨线程投递到事件循环的队列
+    
+    指定 coalesce 时，它返回条目的合并键：同一键的新条目到达，队列中尚未取出的旧条目即作废，
+    消费者跟不上时只送达最新的一条（如识别中间结果）。作废的条目留在队列中，取出时跳过
+    """
+    
+    def __init__(self, name: str, loop: Optional[asyncio.AbstractEventLoop] = None,
+                 coalesce: Optional[Callable[[Any], Optional[str]]] = None):
+        self.name = name
+        self.high_water = 0             # 排队条目数的峰值
+        self._loop = loop or asyncio.get_running_loop()
+        self._items: deque = deque()    # [条目, 入队时间, 是否有效]
+        self._waiter: Optional[asyncio.Future] = None
+        self._coalesce = coalesce
+        self._latest: Dict[str, List] = {}
+        self._stale = 0                 # 队列中已作废的条目数
+        
+    def put(self, item: Any):
+        """写入数据（任意线程可调用）"""
+        try:
+            self._loop.call_soon_threadsafe(self._put_on_loop, item, time.perf_counter())
+        except RuntimeError:
+            # 事件循环已关闭，会话已结束，直接丢弃
+            logger.debug(f"Queue {self.name}: loop closed, item dropped")
+            
+    def put_nowait(self, item: Any):
+        """在事件循环线程内直接写入"""
+        self._put_on_loop(item, time.perf_counter())
+        
+    def _put_on_loop(self, item: Any, enqueued_at: float):
+        entry = [item, enqueued_at, True]
+        if self._coalesce is not None:
+            key = self._coalesce(item)
+            if key is not None:
+                previous = self._latest.get(key)
+                if previous is not None and previous[2]:
+                    previous[2] = False
+                    self._stale += 1
+                    metrics.incr(f"queue.{self.name}.superseded")
+                self._latest[key] = entry
+        self._items.append(entry)
+        size = len(self._items) - self._stale
+        if size > self.high_water:
+            self.high_water = size
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+            
+    async def get(self) -> Any:
+        """等待并取出一条数据"""
+        while self.empty():
+            self._waiter = self._loop.create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._pop()
+        
+    def get_nowait(self) -> Any:
+        """立即取出一条数据，队列为空时抛出 queue.Empty"""
+        if self.empty():
+            raise queue.Empty
+        return self._pop()
+        
+    def _pop(self) -> Any:
+        while True:
+            entry = self._items.popleft()
+            if entry[2]:
+                break
+            self._stale -= 1
+        item, enqueued_at, _ = entry
+        entry[2] = False
+        metrics.observe(f"queue.{self.name}.delivery_ms", (time.perf_counter() - enqueued_at) * 1000)
+        return item
+        
+    def clear(self):
+        """清空队列"""
+        self._items.clear()
+        self._latest.clear()
+        self._stale = 0
+        
+    def empty(self) -> bool:
+        return len(self._items) == self._stale
+        
+    def qsize(self) -> int:
+        return len(self._items) - self._stale
@@ -0,0 +1,132 @@
+"""
+上行音频批量送入 ASR
+客户端音频块长短取决于录音端（Opus 解码后每包只有 20ms），逐块调用 ASRService.send_audio
+意味着每块一次线程池切换、一次 base64 编码和一次 SDK 发送，接收循环还要等这些调用逐个完成。
+这里把音频攒进可复用的缓冲区，凑满 ASR_BATCH_MS 再交给专门的发送任务，接收循环只做内存拷贝
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import time
+from typing import Callable, Optional
+
+from .async_queue import AsyncBridgeQueue
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 发送任务的唤醒标记：缓冲区开始积攒不足一批的音频，需要按时限发出
+_KICK = object()
+
+
+class AudioInputBatcher:
+    """
+    每会话一个的上行音频攒批器
+    
+    feed 在接收循环中调用，只写缓冲区、不等待；凑满一批后交给 run 所在的发送任务，
+    由它在线程池中按顺序调用 send。不足一批的音频最多等待一个批次时长就发出，
+    避免服务端 VAD 晚于说话人开口太多。drain 在结束输入时调用，等已收到的音频全部发完
+    """
+    
+    def __init__(self, send: Callable[[bytes], bool], executor: concurrent.futures.Executor,
+                 batch_bytes: int, batch_ms: float):
+        self._send = send
+        self._executor = executor
+        self.batch_bytes = batch_bytes
+        self._batch_seconds = batch_ms / 1000
+        self._buffer = bytearray(max(batch_bytes, 0))
+        self._view = memoryview(self._buffer)
+        self._filled = 0
+        self._deadline: Optional[float] = None  # 缓冲区中不足一批的音频最晚发出时间（monotonic）
+        self._queue = AsyncBridgeQueue("asr_input")
+        
+    @property
+    def pending(self) -> bool:
+        """缓冲区中是否有不足一批的音频"""
+        return self._filled > 0
+        
+    def feed(self, pcm: bytes):
+        """写入客户端音频（事件循环线程中调用，不等待发送）"""
+        metrics.incr("asr_input.chunks")
+        if self.batch_bytes <= 0:
+            self._queue.put_nowait(bytes(pcm))
+            return
+            
+        data = memoryview(pcm)
+        offset = 0
+        size = len(data)
+        batch_bytes = self.batch_bytes
+        emitted = False
+        while offset < size:
+            if self._filled == 0 and size - offset >= batch_bytes:
+                # 缓冲区为空时整批直接切出，不经过缓冲区
+                self._queue.put_nowait(bytes(data[offset:offset + batch_bytes]))
+                offset += batch_bytes
+                emitted = True
+                continue
+            n = min(batch_bytes - self._filled, size - offset)
+            self._view[self._filled:self._filled + n] = data[offset:offset + n]
+            self._filled += n
+            offset += n
+            if self._filled == batch_bytes:
+                self._queue.put_nowait(bytes(self._buffer))
+                self._filled = 0
+                emitted = True
+                
+        if not self._filled:
+            self._deadline = None
+        elif emitted or self._deadline is None:
+            # 开始积攒新的一批，通知发送任务按时限发出
+            self._deadline = time.monotonic() + self._batch_seconds
+            self._queue.put_nowait(_KICK)
+            
+    async def drain(self):
+        """发出缓冲区中的剩余音频，并等待此前收到的音频全部送入 ASR"""
+        partial = self._take_partial()
+        if partial:
+            self._queue.put_nowait(partial)
+        done = asyncio.get_event_loop().create_future()
+        self._queue.put_nowait(done)
+        await done
+        
+    async def run(self):
+        """发送任务：按顺序把每批音频送入 ASR（会话期间常驻，会话结束时取消）"""
+        loop = asyncio.get_event_loop()
+        while True:
+            try:
+                if not self._queue.empty():
+                    # 先发已排队的整批，剩余部分的时限到了也排在它们之后
+                    item = self._queue.get_nowait()
+                elif self._deadline is None:
+                    item = await self._queue.get()
+                else:
+                    try:
+                        item = await asyncio.wait_for(self._queue.get(), max(0.0, self._deadline - time.monotonic()))
+                    except asyncio.TimeoutError:
+                        item = self._take_partial()
+                        
+                if item is None or item is _KICK:
+                    continue
+                if isinstance(item, asyncio.Future):
+                    if not item.done():
+                        item.set_result(None)
+                    continue
+                    
+                await loop.run_in_executor(self._executor, self._send, item)
+                metrics.incr("asr_input.batches")
+                metrics.incr("asr_input.bytes", len(item))
+                
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"ASR input sender error: {e}")
+                
+    def _take_partial(self) -> Optional[bytes]:
+        if not self._filled:
+            return None
+        data = bytes(self._view[:self._filled])
+        self._filled = 0
+        self._deadline = None
+        metrics.incr("asr_input.partial_batches")
+        return data
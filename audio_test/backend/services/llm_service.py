@@ -4,13 +4,14 @@ LLM 大语言模型服务
 """
 
 import logging
-import queue
+import threading
 from http import HTTPStatus
-from typing import Generator, List, Dict
+from typing import Generator, List, Dict, Optional
 import dashscope
 from dashscope import Generation
 
 from config import settings
+from .async_queue import AsyncBridgeQueue
 
 logger = logging.getLogger(__name__)
 
@@ -47,7 +48,8 @@ class LLMService:
         self.conversation_history = []
         logger.info("Conversation history cleared")
         
-    def generate_stream_sync(self, user_input: str, output_queue: queue.Queue):
+    def generate_stream_sync(self, user_input: str, output_queue: AsyncBridgeQueue,
+                             cancel_event: Optional[threading.Event] = None):
         """
         同步流式生成回复，将结果放入队列
         
@@ -56,6 +58,7 @@ class LLMService:
         Args:
             user_input: 用户输入
             output_queue: 输出队列，用于传递生成的文本片段
+            cancel_event: 取消信号，置位后停止生成（用户插话）
         """
         messages = self._get_messages(user_input)
         
@@ -71,6 +74,14 @@ class LLMService:
             full_response = []
             
             for resp in responses:
+                if cancel_event is not None and cancel_event.is_set():
+                    # 关闭流，不再接收剩余输出
+                    close = getattr(responses, 'close', None)
+                    if close:
+                        close()
+                    logger.info("LLM generation cancelled")
+                    break
+                    
                 if resp.status_code == HTTPStatus.OK:
                     content = resp.output.choices[0].message.content
                     if content:
@@ -97,7 +108,7 @@ class LLMService:
                     })
                     break
                     
-            # 保存到历史记录
+            # 保存到历史记录（被打断时保存已生成的部分）
             full_text = "".join(full_response)
             if full_text:
                 self.add_to_history("user", user_input)
@@ -0,0 +1,94 @@
+"""
+运行指标
+进程内的轻量计数器与直方图，通过 /metrics 接口查看
+"""
+
+import threading
+from typing import Dict, Optional, Sequence
+
+
+# 默认直方图分桶（毫秒）
+DEFAULT_BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """固定分桶直方图"""
+    
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS_MS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        
+    def observe(self, value: float):
+        """记录一个观测值"""
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.total += value
+        if value > self.max:
+            self.max = value
+            
+    def snapshot(self) -> Dict:
+        """导出当前统计"""
+        buckets = {f"le_{upper:g}": n for upper, n in zip(self.buckets, self.counts)}
+        buckets["le_inf"] = self.counts[-1]
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 3) if self.count else 0.0,
+            "max": round(self.max, 3),
+            "buckets": buckets
+        }
+
+
+class MetricsRegistry:
+    """指标注册表（线程安全，回调线程与事件循环都可以写入）"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._gauges: Dict[str, float] = {}
+        self._histograms: Dict[str, Histogram] = {}
+        
+    def incr(self, name: str, value: float = 1):
+        """累加计数器"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+            
+    def set_gauge(self, name: str, value: float):
+        """设置瞬时值"""
+        with self._lock:
+            self._gauges[name] = value
+            
+    def observe(self, name: str, value: float, buckets: Optional[Sequence[float]] = None):
+        """记录直方图观测值"""
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = Histogram(buckets or DEFAULT_BUCKETS_MS)
+                self._histograms[name] = histogram
+            histogram.observe(value)
+            
+    def snapshot(self) -> Dict:
+        """导出全部指标"""
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+                "histograms": {name: h.snapshot() for name, h in self._histograms.items()}
+            }
+            
+    def reset(self):
+        """清空全部指标"""
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._histograms.clear()
+
+
+metrics = MetricsRegistry()
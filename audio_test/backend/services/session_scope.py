@@ -0,0 +1,125 @@
+"""
+会话范围的任务与线程池调用
+会话的常驻任务、每轮处理与后台任务都通过 spawn 创建，线程池调用都通过 run_in_executor 提交，
+客户端断开时 close 统一取消：任务被取消，取消信号置位，线程池中的 LLM 生成循环与 TTS 发送据此提前退出。
+已经在线程中执行的调用无法强行中止，close 时仍未结束的记为泄漏，并记录它们比会话多占用线程的时长
+"""
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+import time
+import weakref
+from typing import Any, Callable, Coroutine, Optional, Set
+
+from .metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# close 时等待被取消任务执行完清理逻辑的上限（秒）
+CLOSE_TIMEOUT = 2.0
+
+
+class SessionScope(concurrent.futures.Executor):
+    """
+    每会话一个：登记任务与线程池调用，断开时一并取消
+    
+    本身也是 Executor：需要传入线程池的组件（上行音频攒批器）传入 scope，
+    提交的调用转交共用线程池执行，并计入断开时的泄漏统计；
+    需要在专用线程池中执行的调用（如异步评估）传入 bind() 返回的视图，同样计入泄漏统计
+    """
+    
+    def __init__(self, session_id: str, executor: concurrent.futures.Executor):
+        self.session_id = session_id
+        self.cancelled = threading.Event()   # 会话级取消信号，线程中的调用可直接检查
+        self._executor = executor
+        self._tasks: Set[asyncio.Task] = set()
+        self._tokens: "weakref.WeakSet[threading.Event]" = weakref.WeakSet()
+        self._pending: Set[concurrent.futures.Future] = set()
+        self._lock = threading.Lock()
+        
+    @property
+    def closed(self) -> bool:
+        return self.cancelled.is_set()
+        
+    def new_token(self) -> threading.Event:
+        """创建一个取消信号（如单次 LLM 生成），可单独置位，会话结束时一并置位"""
+        token = threading.Event()
+        if self.closed:
+            token.set()
+        else:
+            self._tokens.add(token)
+        return token
+        
+    def spawn(self, coro: Coroutine, name: Optional[str] = None) -> asyncio.Task:
+        """创建属于本会话的任务"""
+        task = asyncio.get_running_loop().create_task(coro, name=name)
+        if self.closed:
+            task.cancel()
+            return task
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+        
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> concurrent.futures.Future:
+        """提交到共用线程池并登记，close 时仍未结束的计为泄漏"""
+        return self._track(self._executor.submit(func, *args, **kwargs))
+        
+    def bind(self, executor: concurrent.futures.Executor) -> concurrent.futures.Executor:
+        """提交到指定线程池的视图，调用同样登记在本会话中"""
+        return _BoundExecutor(self, executor)
+        
+    def _track(self, future: concurrent.futures.Future) -> concurrent.futures.Future:
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard_pending)
+        return future
+        
+    def run_in_executor(self, func: Callable[..., Any], *args) -> asyncio.Future:
+        """在线程池中执行同步调用；等待方被取消时调用本身仍会执行完，close 时据此统计泄漏"""
+        return asyncio.wrap_future(self.submit(func, *args))
+        
+    def _discard_pending(self, future: concurrent.futures.Future):
+        with self._lock:
+            self._pending.discard(future)
+            
+    async def close(self, timeout: float = CLOSE_TIMEOUT) -> int:
+        """
+        取消本会话的全部任务与取消信号，等待任务退出
+        
+        Returns:
+            仍在线程池中执行的调用数（泄漏）
+        """
+        self.cancelled.set()
+        for token in list(self._tokens):
+            token.set()
+        tasks = [task for task in self._tasks if not task.done() and task is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            _, still_running = await asyncio.wait(tasks, timeout=timeout)
+            if still_running:
+                logger.warning(f"Session {self.session_id}: {len(still_running)} tasks did not exit after cancel")
+                
+        with self._lock:
+            leaked = [future for future in self._pending if not future.done()]
+        if leaked:
+            closed_at = time.perf_counter()
+            metrics.incr("executor.leaked_jobs", len(leaked))
+            for future in leaked:
+                future.add_done_callback(
+                    lambda _: metrics.observe("executor.leaked_ms", (time.perf_counter() - closed_at) * 1000)
+                )
+        return len(leaked)
+
+
+class _BoundExecutor(concurrent.futures.Executor):
+    """SessionScope.bind() 返回的视图：调用提交到指定线程池，登记在所属会话中"""
+    
+    def __init__(self, scope: SessionScope, executor: concurrent.futures.Executor):
+        self._scope = scope
+        self._executor = executor
+        
+    def submit(self, func: Callable[..., Any], *args, **kwargs) -> concurrent.futures.Future:
+        return self._scope._track(self._executor.submit(func, *args, **kwargs))
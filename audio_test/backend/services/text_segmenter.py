@@ -0,0 +1,173 @@
+"""
+流式分句
+LLM 增量输出的文本按标点切分成句子送入 TTS，
+每次只扫描新到达的字符，已扫描过的文本不再重复查找
+"""
+
+import re
+import time
+from typing import List, Optional
+
+# 默认句末标点（与原分句逻辑一致）
+DEFAULT_SENTENCE_DELIMITERS = "。！？；.!?;\n"
+
+# 默认分句逗号（中文逗号、顿号、冒号等），仅在达到最小长度时才切分
+DEFAULT_CLAUSE_DELIMITERS = "，、：,:"
+
+
+def _char_class(chars: str) -> Optional["re.Pattern"]:
+    """把一组标点编译为字符类正则，为空时返回 None"""
+    if not chars:
+        return None
+    return re.compile("[" + "".join(re.escape(c) for c in sorted(set(chars))) + "]")
+
+
+class SentenceSegmenter:
+    """
+    增量分句器
+    
+    feed() 追加文本并返回新产生的完整句子；每个字符只被扫描一次，
+    未成句的部分以片段列表保存，成句时才拼接，整体为线性复杂度。
+    
+    - delimiters: 句末标点，遇到即切分
+    - clause_delimiters / min_clause_chars: 句内逗号，当前句已累计到 min_clause_chars 个字符时才在此切分，
+      min_clause_chars 为 0 时不按逗号切分
+    - max_latency_ms: 首个未成句字符等待超过该时长时强制切出（优先切在最近的逗号处），0 表示不限制
+    
+    自适应首块（first_chunk_chars / first_chunk_ms 任一大于 0 时开启）：
+    - 第一块遇到任意逗号即切出，累计达到 first_chunk_chars 个字符或等待超过 first_chunk_ms 时也立即切出，尽早开始合成
+    - 之后第 k 块的逗号切分字数为 first_chunk_chars × chunk_growth^k，逐块变长以保证语调自然；
+      超过 max_chunk_chars 后恢复为 min_clause_chars / max_latency_ms 的设置
+    """
+    
+    def __init__(self, delimiters: str = DEFAULT_SENTENCE_DELIMITERS,
+                 clause_delimiters: str = DEFAULT_CLAUSE_DELIMITERS,
+                 min_clause_chars: int = 0, max_latency_ms: float = 0,
+                 first_chunk_chars: int = 0, first_chunk_ms: float = 0,
+                 chunk_growth: float = 2.0, max_chunk_chars: int = 40):
+        self._sentence_chars = frozenset(delimiters)
+        self._sentence_re = _char_class(delimiters)
+        self._clause_boundary_re = _char_class(delimiters + clause_delimiters)
+        self._latency_clause_re = _char_class(clause_delimiters)
+        self._base_min_clause = min_clause_chars
+        self._base_latency = max_latency_ms / 1000 if max_latency_ms else 0
+        
+        self.first_chunk_chars = first_chunk_chars
+        self.chunk_growth = chunk_growth
+        self.max_chunk_chars = max_chunk_chars
+        self.adaptive = first_chunk_chars > 0 or first_chunk_ms > 0
+        self.chunks = 0                  # 已切出的块数
+        
+        if self.adaptive:
+            self._set_thresholds(1, first_chunk_ms / 1000 if first_chunk_ms else self._base_latency)
+        else:
+            self._set_thresholds(self._base_min_clause, self._base_latency)
+            
+        self._parts: List[str] = []      # 未成句的文本片段
+        self._pending_len = 0            # 未成句文本长度
+        self._last_clause: Optional[int] = None   # 未成句文本中最后一个逗号之后的位置
+        self._started_at: Optional[float] = None  # 未成句文本首个字符到达时间
+        
+    def _set_thresholds(self, min_clause_chars: int, max_latency: float):
+        """设置当前块的逗号切分字数与等待上限"""
+        self.min_clause_chars = min_clause_chars
+        self.max_latency = max_latency
+        self._boundary_re = self._clause_boundary_re if min_clause_chars > 0 else self._sentence_re
+        
+    def _advance(self):
+        """切出一块后更新下一块的阈值"""
+        self.chunks += 1
+        if not self.adaptive:
+            return
+        target = self.first_chunk_chars * self.chunk_growth ** self.chunks
+        if 0 < target <= self.max_chunk_chars:
+            self._set_thresholds(int(target), self._base_latency)
+        else:
+            self._set_thresholds(self._base_min_clause, self._base_latency)
+            
+    def feed(self, text: str) -> List[str]:
+        """追加一段文本，返回新切出的句子"""
+        if not text:
+            return []
+            
+        sentences: List[str] = []
+        start = 0
+        pos = 0
+        # 切出一块后阈值可能变化，每次都用当前的边界正则继续查找
+        while self._boundary_re is not None:
+            match = self._boundary_re.search(text, pos)
+            if match is None:
+                break
+            pos = match.end()
+            if match.group() in self._sentence_chars or self._pending_len + pos - start >= self.min_clause_chars:
+                sentences.append(self._take(text[start:pos]))
+                start = pos
+                
+        rest = text[start:]
+        if rest:
+            self._append(rest)
+            # 首块累计到足够字数时不再等标点
+            if self.chunks == 0 and self.first_chunk_chars and self._pending_len >= self.first_chunk_chars:
+                sentences.append(self._take(""))
+        return sentences
+        
+    def _append(self, text: str):
+        """把未成句的文本加入片段列表，并记录最后一个逗号位置供延迟切分使用"""
+        if self.max_latency and self._latency_clause_re is not None:
+            last = None
+            for match in self._latency_clause_re.finditer(text):
+                last = match.end()
+            if last is not None:
+                self._last_clause = self._pending_len + last
+        if self._started_at is None:
+            self._started_at = time.monotonic()
+        self._parts.append(text)
+        self._pending_len += len(text)
+        
+    def _take(self, tail: str) -> str:
+        """取出未成句片段加上 tail 组成的句子，并重置状态"""
+        if self._parts:
+            self._parts.append(tail)
+            sentence = "".join(self._parts)
+            self._parts = []
+        else:
+            sentence = tail
+        self._pending_len = 0
+        self._last_clause = None
+        self._started_at = None
+        self._advance()
+        return sentence
+        
+    def time_until_flush(self) -> Optional[float]:
+        """距离强制切分还有多少秒，没有等待中的文本或未开启时返回 None"""
+        if not self.max_latency or self._started_at is None:
+            return None
+        return max(0.0, self._started_at + self.max_latency - time.monotonic())
+        
+    def poll(self) -> List[str]:
+        """等待超时时强制切出已累计的文本"""
+        remaining = self.time_until_flush()
+        if remaining is None or remaining > 0 or not self._parts:
+            return []
+            
+        pending = "".join(self._parts)
+        cut = self._last_clause
+        if cut is None or cut >= len(pending):
+            self._parts = []
+            return [self._take(pending)]
+            
+        # 切在最近的逗号处，逗号之后的部分继续等待
+        self._parts = []
+        sentence = self._take(pending[:cut])
+        self._append(pending[cut:])
+        return [sentence]
+        
+    def flush(self) -> str:
+        """取出剩余的全部文本"""
+        if not self._parts:
+            return ""
+        return self._take("")
+        
+    @property
+    def pending(self) -> str:
+        return "".join(self._parts)
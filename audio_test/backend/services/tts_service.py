@@ -1,18 +1,22 @@
 """
 TTS 语音合成服务
 基于 DashScope qwen3-tts-flash-realtime 模型实现实时语音合成
-使用 commit 模式提高实时性和准确性
+支持 commit（按句提交）与 server_commit（逐片段追加，由服务端决定分段）两种模式
 """
 
 import base64
 import logging
-import queue
 import threading
-from typing import Optional
+import time
+from typing import Optional, Set
 import dashscope
 from dashscope.audio.qwen_tts_realtime import QwenTtsRealtime, QwenTtsRealtimeCallback, AudioFormat
 
 from config import settings
+from .async_queue import AsyncBridgeQueue
+from .audio_output import PcmRingBuffer
+from .connection_pool import ConnectionPool, PooledConnection
+from .metrics import metrics
 
 logger = logging.getLogger(__name__)
 
@@ -20,14 +24,76 @@ logger = logging.getLogger(__name__)
 class TTSCallback(QwenTtsRealtimeCallback):
     """TTS 回调处理类"""
     
-    def __init__(self, audio_queue: queue.Queue, event_queue: queue.Queue):
+    def __init__(self, audio_queue: Optional[PcmRingBuffer] = None,
+                 event_queue: Optional[AsyncBridgeQueue] = None):
         super().__init__()
         self.audio_queue = audio_queue
         self.event_queue = event_queue
         self.session_id: Optional[str] = None
         self._is_connected = False
         self.session_finished_event = threading.Event()
+        self._lock = threading.Lock()
+        self._pending_responses = 0  # 已提交、尚未合成完成的文本段数
+        self._current_response_id: Optional[str] = None
+        self._discarding = False                 # 被打断后、下一次提交前创建的响应都要丢弃
+        self._cancelled_responses: Set[str] = set()
+        # server_commit 模式下文本由服务端自行分段，按服务端创建的响应计数
+        self.server_commit = settings.TTS_MODE == "server_commit"
+        # 本次回复的计时（首段文本发出、首个音频、最后一个响应完成）
+        self._reply_text_at: Optional[float] = None
+        self._reply_first_audio_at: Optional[float] = None
+        self._reply_done_at: Optional[float] = None
         
+    def bind(self, audio_queue: Optional[PcmRingBuffer], event_queue: Optional[AsyncBridgeQueue]):
+        """绑定到会话的队列（连接池租出/归还时调用）"""
+        self.audio_queue = audio_queue
+        self.event_queue = event_queue
+        
+    def _emit(self, event: dict):
+        """投递事件，未绑定会话（在连接池中空闲）时丢弃"""
+        event_queue = self.event_queue
+        if event_queue is not None:
+            event_queue.put(event)
+            
+    def mark_committed(self):
+        """记录一次文本提交"""
+        with self._lock:
+            if not self.server_commit:
+                self._pending_responses += 1
+            self._discarding = False
+            self._mark_text_sent()
+            
+    def mark_appended(self):
+        """记录一次文本追加（server_commit 模式，不提交）"""
+        with self._lock:
+            self._discarding = False
+            self._mark_text_sent()
+            
+    def _mark_text_sent(self):
+        if self._reply_text_at is None:
+            self._reply_text_at = time.perf_counter()
+            
+    def start_reply(self):
+        """开始新一轮回复：结算上一轮的合成耗时并重新计时"""
+        with self._lock:
+            if self._reply_text_at is not None and self._reply_done_at is not None:
+                metrics.observe(
+                    f"tts.synthesis_ms.{settings.TTS_MODE}",
+                    (self._reply_done_at - self._reply_text_at) * 1000
+                )
+            self._reply_text_at = None
+            self._reply_first_audio_at = None
+            self._reply_done_at = None
+            
+    def begin_discard(self):
+        """打断时调用：丢弃当前响应及之后排队响应的音频，直到下一次提交新文本"""
+        with self._lock:
+            self._discarding = True
+            if self._current_response_id and self._pending_responses > 0:
+                self._cancelled_responses.add(self._current_response_id)
+            # 被打断的回复不计入合成耗时
+            self._reply_text_at = None
+            
     def on_open(self) -> None:
         """连接打开时的回调"""
         self._is_connected = True
@@ -48,26 +114,53 @@ class TTSCallback(QwenTtsRealtimeCallback):
                 self.session_id = response['session']['id']
                 logger.info(f"TTS session created: {self.session_id}")
                 
+            elif event_type == 'response.created':
+                response_id = response.get('response', {}).get('id')
+                with self._lock:
+                    self._current_response_id = response_id
+                    if self.server_commit:
+                        self._pending_responses += 1
+                    if self._discarding and response_id:
+                        self._cancelled_responses.add(response_id)
+                        
             elif event_type == 'response.audio.delta':
                 # 接收音频数据，立即放入队列
                 audio_b64 = response.get('delta', '')
-                if audio_b64:
+                response_id = response.get('response_id') or self._current_response_id
+                if response_id in self._cancelled_responses:
+                    # 已被打断的响应，音频不再下发
+                    metrics.incr("tts.discarded_bytes", len(audio_b64) * 3 // 4)
+                    return
+                if self._reply_text_at is not None and self._reply_first_audio_at is None:
+                    self._reply_first_audio_at = time.perf_counter()
+                    metrics.observe(
+                        f"tts.first_audio_delay_ms.{settings.TTS_MODE}",
+                        (self._reply_first_audio_at - self._reply_text_at) * 1000
+                    )
+                audio_queue = self.audio_queue
+                if audio_b64 and audio_queue is not None:
                     audio_data = base64.b64decode(audio_b64)
-                    self.audio_queue.put(audio_data)
+                    audio_queue.put(audio_data)
                     
             elif event_type == 'response.done':
                 logger.debug("TTS response done")
                 # 不再等待，只记录日志
+                with self._lock:
+                    self._pending_responses = max(0, self._pending_responses - 1)
+                    if self._pending_responses == 0:
+                        self._cancelled_responses.clear()
+                    if self._reply_text_at is not None:
+                        self._reply_done_at = time.perf_counter()
                     
             elif event_type == 'session.finished':
                 logger.info("TTS session finished")
                 self.session_finished_event.set()
-                self.event_queue.put({'type': 'audio.finished'})
+                self._emit({'type': 'audio.finished'})
                     
             elif event_type == 'error':
                 error_msg = response.get('error', {}).get('message', 'Unknown error')
                 logger.error(f"TTS error: {error_msg}")
-                self.event_queue.put({
+                self._emit({
                     'type': 'error',
                     'source': 'tts',
                     'message': error_msg
@@ -80,15 +173,61 @@ class TTSCallback(QwenTtsRealtimeCallback):
     def is_connected(self) -> bool:
         return self._is_connected
 
+    @property
+    def idle(self) -> bool:
+        """没有进行中的合成，可以安全地交给下一个会话"""
+        with self._lock:
+            return self._pending_responses == 0
+
+
+def open_tts_connection(callback: TTSCallback) -> QwenTtsRealtime:
+    """建立 TTS 连接并完成会话配置（阻塞）"""
+    tts_client = QwenTtsRealtime(
+        model=settings.TTS_MODEL,
+        callback=callback,
+        url=settings.WS_BASE_URL
+    )
+    
+    tts_client.connect()
+    
+    tts_client.update_session(
+        voice=settings.TTS_VOICE,
+        response_format=AudioFormat.PCM_24000HZ_MONO_16BIT,
+        mode=settings.TTS_MODE
+    )
+    return tts_client
+
+
+def _open_pooled_tts_connection() -> PooledConnection:
+    callback = TTSCallback()
+    return PooledConnection(client=open_tts_connection(callback), callback=callback)
+
+
+# 进程级 TTS 连接池
+tts_pool = ConnectionPool(
+    "tts",
+    factory=_open_pooled_tts_connection,
+    min_idle=settings.POOL_MIN_IDLE,
+    max_idle=settings.POOL_MAX_IDLE,
+    idle_timeout=settings.POOL_IDLE_TIMEOUT,
+    max_age=settings.POOL_MAX_AGE
+)
+
 
 class TTSService:
-    """TTS 语音合成服务（使用 commit 模式）"""
+    """TTS 语音合成服务（commit / server_commit 模式由 TTS_MODE 决定）"""
     
-    def __init__(self, audio_queue: queue.Queue, event_queue: queue.Queue):
+    def __init__(self, audio_queue: PcmRingBuffer, event_queue: AsyncBridgeQueue,
+                 cancel_token: Optional[threading.Event] = None):
         self.audio_queue = audio_queue
         self.event_queue = event_queue
         self.tts_client: Optional[QwenTtsRealtime] = None
         self.callback: Optional[TTSCallback] = None
+        self._connected_at = 0.0
+        # 会话级取消信号：客户端断开后线程池中尚未执行的发送直接放弃
+        self._cancel_token = cancel_token
+        # 发送与归还连接互斥，避免向已归还连接池（可能已租给其他会话）的连接发送文本
+        self._send_lock = threading.Lock()
         self._setup_dashscope()
         
     def _setup_dashscope(self):
@@ -96,54 +235,132 @@ class TTSService:
         dashscope.api_key = settings.DASHSCOPE_API_KEY
         
     def create_session(self) -> bool:
-        """创建 TTS 会话"""
+        """创建 TTS 会话（优先从连接池租用）"""
         try:
+            lease = tts_pool.acquire()
+            if lease is not None:
+                lease.callback.bind(self.audio_queue, self.event_queue)
+                self.tts_client = lease.client
+                self.callback = lease.callback
+                self._connected_at = lease.created_at
+                logger.info("TTS session leased from pool")
+                return True
+                
             self.callback = TTSCallback(self.audio_queue, self.event_queue)
+            self.tts_client = open_tts_connection(self.callback)
+            self._connected_at = time.monotonic()
             
-            self.tts_client = QwenTtsRealtime(
-                model=settings.TTS_MODEL,
-                callback=self.callback,
-                url=settings.WS_BASE_URL
-            )
-            
-            self.tts_client.connect()
-            
-            self.tts_client.update_session(
-                voice=settings.TTS_VOICE,
-                response_format=AudioFormat.PCM_24000HZ_MONO_16BIT,
-                mode='commit'
-            )
-            
-            logger.info("TTS session created successfully with commit mode")
+            logger.info(f"TTS session created successfully with {settings.TTS_MODE} mode")
             return True
             
         except Exception as e:
             logger.error(f"Failed to create TTS session: {e}")
             return False
             
+    def _send_cancelled(self) -> bool:
+        """会话已断开：放弃发送"""
+        if self._cancel_token is not None and self._cancel_token.is_set():
+            metrics.incr("tts.sends_after_close")
+            return True
+        return False
+        
     def synthesize_text_nowait(self, text: str) -> bool:
         """
         合成文本（不等待完成，立即返回）
         
         用于流水线处理，发送后立即返回，音频数据通过队列异步接收
         """
-        try:
-            if not self.tts_client or not self.callback or not self.callback.is_connected:
-                logger.error("TTS session not connected")
-                return False
+        if self._send_cancelled():
+            return False
+        with self._send_lock:
+            try:
+                if not self.tts_client or not self.callback or not self.callback.is_connected:
+                    logger.error("TTS session not connected")
+                    return False
+                    
+                if not text or not text.strip():
+                    return True
+                    
+                # 发送文本并立即提交
+                self.tts_client.append_text(text)
+                self.tts_client.commit()
+                self.callback.mark_committed()
                 
-            if not text or not text.strip():
+                logger.debug(f"TTS synthesizing: {text[:30]}...")
                 return True
                 
-            # 发送文本并立即提交
-            self.tts_client.append_text(text)
-            self.tts_client.commit()
+            except Exception as e:
+                logger.error(f"Failed to synthesize text: {e}")
+                return False
+            
+    @property
+    def server_commit(self) -> bool:
+        """是否为 server_commit 模式（文本片段直接追加，由服务端分段合成）"""
+        return settings.TTS_MODE == "server_commit"
+        
+    def append_text_nowait(self, text: str) -> bool:
+        """
+        追加文本片段但不提交（server_commit 模式）
+        
+        LLM 增量输出直接转发，服务端根据已累计的文本自行决定合成时机
+        """
+        if self._send_cancelled():
+            return False
+        with self._send_lock:
+            try:
+                if not self.tts_client or not self.callback or not self.callback.is_connected:
+                    logger.error("TTS session not connected")
+                    return False
+                    
+                if not text:
+                    return True
+                    
+                self.tts_client.append_text(text)
+                self.callback.mark_appended()
+                return True
+                
+            except Exception as e:
+                logger.error(f"Failed to append text: {e}")
+                return False
             
-            logger.debug(f"TTS synthesizing: {text[:30]}...")
+    def commit_pending(self) -> bool:
+        """提交缓冲区中剩余的文本（server_commit 模式下一轮回复结束时调用）"""
+        if self._send_cancelled():
+            return False
+        with self._send_lock:
+            try:
+                if not self.tts_client or not self.callback or not self.callback.is_connected:
+                    return False
+                self.tts_client.commit()
+                return True
+            except Exception as e:
+                logger.error(f"Failed to commit pending text: {e}")
+                return False
+            
+    def begin_reply(self):
+        """开始新一轮回复，用于统计首音延迟与合成耗时"""
+        if self.callback:
+            self.callback.start_reply()
+            
+    def cancel(self) -> bool:
+        """
+        打断合成（用户插话时调用）
+        
+        清空尚未提交的文本、取消服务端进行中的响应，
+        已提交但未播放的音频在回调中丢弃
+        """
+        try:
+            if not self.tts_client or not self.callback or not self.callback.is_connected:
+                return False
+                
+            self.callback.begin_discard()
+            self.tts_client.clear_appended_text()
+            self.tts_client.cancel_response()
+            logger.info("TTS response cancelled")
             return True
             
         except Exception as e:
-            logger.error(f"Failed to synthesize text: {e}")
+            logger.error(f"Failed to cancel TTS response: {e}")
             return False
             
     def finish(self):
@@ -157,6 +374,31 @@ class TTSService:
         except Exception as e:
             logger.error(f"Error finishing TTS session: {e}")
             
+    def release(self):
+        """会话结束时归还连接，仍在合成时直接关闭"""
+        with self._send_lock:
+            tts_client, callback = self.tts_client, self.callback
+            self.tts_client = None
+            self.callback = None
+        if tts_client is None or callback is None:
+            return
+            
+        try:
+            callback.start_reply()
+            if callback.is_connected and callback.idle:
+                if callback.server_commit:
+                    # 丢弃尚未被服务端分段的文本，避免带入下一个会话
+                    tts_client.clear_appended_text()
+                callback.bind(None, None)
+                if tts_pool.release(PooledConnection(tts_client, callback, created_at=self._connected_at)):
+                    logger.info("TTS connection returned to pool")
+                    return
+            else:
+                tts_client.close()
+            logger.info("TTS connection closed")
+        except Exception as e:
+            logger.error(f"Error releasing TTS connection: {e}")
+            
     def close(self):
         """关闭连接"""
         try:
@@ -0,0 +1,529 @@
+"""
+TTS 文本清理
+移除 Markdown 语法和表情符号，并调整标点让语音更自然。
+正则在模块加载时编译，逐字符的删除用 str.translate 一次完成，
+相互独立的替换合并为一次扫描，文本中不含相关符号时直接跳过对应步骤
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+# ===== Markdown 语法（按顺序执行，前一步的结果会影响后一步） =====
+
+_CODE_BLOCK_RE = re.compile(r'```[\s\S]*?```')
+_INLINE_CODE_RE = re.compile(r'`([^`]+)`')
+_HEADING_RE = re.compile(r'^#{1,6}\s*', re.MULTILINE)
+_BOLD_STAR_RE = re.compile(r'\*\*(.+?)\*\*')
+_BOLD_UNDERSCORE_RE = re.compile(r'__(.+?)__')
+_ITALIC_STAR_RE = re.compile(r'\*(.+?)\*')
+_ITALIC_UNDERSCORE_RE = re.compile(r'_(.+?)_')
+_LINK_RE = re.compile(r'\[([^\]]+)\]\([^)]+\)')
+_IMAGE_RE = re.compile(r'!\[([^\]]*)\]\([^)]+\)')
+_QUOTE_RE = re.compile(r'^>\s*', re.MULTILINE)
+_BULLET_RE = re.compile(r'^[\*\-\+]\s+', re.MULTILINE)
+_ORDERED_RE = re.compile(r'^\d+\.\s+', re.MULTILINE)
+_RULE_RE = re.compile(r'^[-*_]{3,}\s*$', re.MULTILINE)
+
+# ===== 表情与装饰符号：逐字符删除 =====
+
+_EMOJI_RANGES = (
+    (0x1F600, 0x1F64F),
+    (0x1F300, 0x1F5FF),
+    (0x1F680, 0x1F6FF),
+    (0x1F1E0, 0x1F1FF),
+    (0x1F900, 0x1F9FF),
+    (0x1FA00, 0x1FAFF),
+    (0x2702, 0x27B0),
+    (0x1F004, 0x1F0CF),
+)
+_DECORATIONS = "◆◇●○■□▲△▼▽★☆♠♣♥♦→←↑↓↔↕【】「」『』〖〗"
+
+_DELETE_TABLE = {code: None for start, end in _EMOJI_RANGES for code in range(start, end + 1)}
+_DELETE_TABLE.update({ord(ch): None for ch in _DECORATIONS})
+
+# 流式片段只做逐字符替换：片段边界处无法判断前后文，标点的整句规则不适用
+_FRAGMENT_TABLE = dict(_DELETE_TABLE)
+_FRAGMENT_TABLE.update({ord('\n'): '，', ord('：'): '，', ord(':'): '，', ord('—'): '，'})
+
+# ===== 韵律优化 =====
+
+# 英文句末标点后跟空白或位于结尾时转为中文标点（连同空白一起替换）
+_ASCII_PUNCT_RE = re.compile(r'([.,?!])(\s|$)')
+_ASCII_PUNCT_MAP = {'.': '。', ',': '，', '?': '？', '!': '！'}
+_COLON_RE = re.compile(r'[：:]\s*')
+_PAREN_RE = re.compile(r'[（(]([^）)]+)[）)]')
+_DASH_RE = re.compile(r'——|--')
+# 连续句号/省略号统一为一个句号，连续逗号统一为一个逗号
+_REPEATED_PUNCT_RE = re.compile(r'[。.]{2,}|[，,]{2,}')
+# 换行转为逗号，多个空格合并为一个
+_WHITESPACE_RE = re.compile(r'\n+| {2,}')
+_PUNCT_SPACE_RE = re.compile(r'\s*([，。！？])\s*')
+
+_LEADING_PUNCT = '，。！？、'
+
+
+def _ascii_punct(match: "re.Match") -> str:
+    return _ASCII_PUNCT_MAP[match.group(1)]
+
+
+def _repeated_punct(match: "re.Match") -> str:
+    return '。' if match.group()[0] in '。.' else '，'
+
+
+def _whitespace(match: "re.Match") -> str:
+    return '，' if match.group()[0] == '\n' else ' '
+
+
+def _strip_markdown(text: str) -> str:
+    """移除 Markdown 语法，不含相关符号的步骤直接跳过"""
+    if '`' in text:
+        text = _CODE_BLOCK_RE.sub('', text)
+        text = _INLINE_CODE_RE.sub(r'\1', text)
+    if '#' in text:
+        text = _HEADING_RE.sub('', text)
+    if '*' in text:
+        text = _BOLD_STAR_RE.sub(r'\1', text)
+    if '__' in text:
+        text = _BOLD_UNDERSCORE_RE.sub(r'\1', text)
+    if '*' in text:
+        text = _ITALIC_STAR_RE.sub(r'\1', text)
+    if '_' in text:
+        text = _ITALIC_UNDERSCORE_RE.sub(r'\1', text)
+    if '](' in text:
+        text = _LINK_RE.sub(r'\1', text)
+        text = _IMAGE_RE.sub('', text)
+    if '>' in text:
+        text = _QUOTE_RE.sub('', text)
+    if '*' in text or '-' in text or '+' in text:
+        text = _BULLET_RE.sub('', text)
+    if '.' in text:
+        text = _ORDERED_RE.sub('', text)
+    if '-' in text or '*' in text or '_' in text:
+        text = _RULE_RE.sub('', text)
+    return text
+
+
+def clean_text_for_tts(text: str) -> str:
+    """
+    清理并优化文本以供 TTS 朗读
+    1. 移除 Markdown 语法符号和表情符号
+    2. 优化韵律，让语音更自然
+    """
+    if not text:
+        return ""
+        
+    # ===== 第一步：移除 Markdown 语法 =====
+    text = _strip_markdown(text)
+    
+    # ===== 第二步：移除表情和特殊符号 =====
+    text = text.translate(_DELETE_TABLE)
+    
+    # ===== 第三步：韵律优化 =====
+    text = _ASCII_PUNCT_RE.sub(_ascii_punct, text)
+    if '：' in text or ':' in text:
+        text = _COLON_RE.sub('，', text)
+    if '(' in text or '（' in text:
+        text = _PAREN_RE.sub(r'，\1，', text)
+    if '——' in text or '--' in text:
+        text = _DASH_RE.sub('，', text)
+    text = _REPEATED_PUNCT_RE.sub(_repeated_punct, text)
+    
+    # ===== 第四步：清理空白 =====
+    text = _WHITESPACE_RE.sub(_whitespace, text)
+    text = _PUNCT_SPACE_RE.sub(r'\1', text)
+    
+    # 开头不要标点
+    text = text.lstrip(_LEADING_PUNCT)
+    
+    return text.strip()
+
+
+def clean_fragment_for_tts(text: str) -> str:
+    """
+    清理 LLM 增量片段（server_commit 模式直接转发时使用）
+    只移除表情和装饰符号、把换行/冒号/破折号转为逗号，不依赖前后文
+    """
+    return text.translate(_FRAGMENT_TABLE) if text else ""
+
+
+# ===== 流式清理（跨片段保持 Markdown 状态） =====
+
+# 需要特殊处理的字符，其余字符整段原样输出
+_STREAM_SPECIAL_RE = re.compile(r'[\n`*_\[!()（）]')
+
+# 行首语法
+_HEADING_PREFIX_RE = re.compile(r'#{1,6}[ \t]*')
+_QUOTE_PREFIX_RE = re.compile(r'>[ \t]*')
+_BULLET_PREFIX_RE = re.compile(r'[*\-+][ \t]+')
+_ORDERED_PREFIX_RE = re.compile(r'\d+\.[ \t]+')
+_ORDERED_HEAD_RE = re.compile(r'\d+\.?')
+_RULE_HEAD_RE = re.compile(r'([-*_]*)[ \t]*')
+
+# 链接文字与链接地址最长等待字符数，超过后按普通文本输出
+_MAX_LINK_TEXT = 200
+# 强调、行内代码、括号最长暂存字符数，超过后开始标记按普通文本输出，没有配对的标记不会一直挡住后续文本
+_MAX_SPAN_TEXT = 80
+
+
+def _ascii_alnum(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+@dataclass
+class _OpenSpan:
+    """尚未闭合的标记：闭合后按语法输出其中的文本，遇到换行（强调）或回复结束时连同开始标记原样输出"""
+    kind: str                                   # '*'、'_' 或 '('
+    opener: str                                 # 原文中的开始标记
+    parts: List[str] = field(default_factory=list)
+
+
+class StreamingMarkdownCleaner:
+    """
+    流式 Markdown 清理器
+    
+    LLM 的增量输出先经过 feed()，再交给分句器。Markdown 状态（代码块、强调、链接、括号、行首）
+    跨片段保持，跨句子的代码块、粗体与括号也能正确处理。
+    开始标记（强调符号、反引号、括号、代码块、链接）在收到对应的结束标记前连同其后的文本一起暂存，
+    配对后才删除或转换；没有配对的标记原样输出，与整段调用 clean_text_for_tts 的结果一致（如乘号、未闭合的括号）。
+    片段末尾暂时无法判断的字符（如单个反引号、行首的数字）会留到下一片段，flush() 时全部输出。
+    
+    只处理 Markdown 结构，标点与表情仍由 clean_text_for_tts 按句处理
+    """
+    
+    def __init__(self):
+        self._carry = ""            # 上一片段末尾尚未判断的字符
+        self._prev_char = ""        # _carry 之前的最后一个字符，用于判断下划线是否在词内
+        self._line_start = True
+        self._spans: List[_OpenSpan] = []   # 尚未闭合的强调与括号，由外到内
+        self._code_open = False     # 已删除行内代码的开始反引号，下一个反引号为结束标记
+        self._fence: Optional[List[str]] = None     # 未闭合的 ``` 代码块原文
+        self._link: Optional[Tuple[str, str, List[str]]] = None  # 链接地址 (...) 内：开始部分原文、保留的文字、地址
+        self.dropped = 0            # 被丢弃的字符数
+        
+    def feed(self, text: str) -> str:
+        """追加一段文本，返回可以送入分句器的清理结果"""
+        if not text:
+            return ""
+        return self._process(self._carry + text, final=False)
+        
+    def flush(self) -> str:
+        """输出剩余字符（未闭合的标记原样输出），结束本次回复"""
+        out = [self._process(self._carry, final=True)] if self._carry else []
+        while self._link is not None:
+            # 链接地址没有结束：方括号部分原样输出，从左括号起按普通文本处理（其中可能又有未结束的链接）
+            opener, _, url = self._link
+            self._link = None
+            self._emit(out, opener[:-1])
+            out.append(self._process(opener[-1] + "".join(url), final=True))
+        if self._fence is not None:
+            self._emit(out, "".join(self._fence))
+        while self._spans:
+            self._release(len(self._spans) - 1, out)
+        self._carry = ""
+        self._prev_char = ""
+        self._line_start = True
+        self._code_open = False
+        self._fence = None
+        self._link = None
+        return "".join(out)
+        
+    def _emit(self, out: List[str], text: str):
+        """输出文本：有未闭合的标记时先暂存在最内层"""
+        if self._spans:
+            self._spans[-1].parts.append(text)
+        else:
+            out.append(text)
+            
+    def _find_span(self, kind: str, opener: Optional[str] = None) -> int:
+        """最内层的同类未闭合标记的位置，没有时返回 -1"""
+        for index in range(len(self._spans) - 1, -1, -1):
+            span = self._spans[index]
+            if span.kind == kind and (opener is None or span.opener == opener):
+                return index
+        return -1
+        
+    def _release(self, index: int, out: List[str]):
+        """放弃配对：把第 index 层标记连同暂存的文本原样并入外层"""
+        span = self._spans.pop(index)
+        text = span.opener + "".join(span.parts)
+        if index > 0:
+            self._spans[index - 1].parts.append(text)
+        else:
+            out.append(text)
+            
+    def _buffered(self) -> int:
+        """未闭合的标记暂存的字符数"""
+        return sum(len(span.opener) + sum(len(part) for part in span.parts) for span in self._spans)
+        
+    def _close(self, index: int, out: List[str]) -> str:
+        """配对成功：内层未闭合的标记原样保留，返回第 index 层暂存的文本"""
+        while len(self._spans) > index + 1:
+            self._release(len(self._spans) - 1, out)
+        return "".join(self._spans.pop(index).parts)
+        
+    def _process(self, data: str, final: bool) -> str:
+        out: List[str] = []
+        n = len(data)
+        i = 0
+        
+        while i < n:
+            if self._fence is not None:
+                j = data.find('```', i)
+                if j < 0:
+                    # 末尾的反引号可能属于结束标记，保留到下一片段
+                    keep = 0 if final else min(len(data) - len(data.rstrip('`')), 2)
+                    self._fence.append(data[i:n - keep])
+                    i = n - keep
+                    break
+                end = j + 3
+                while end < n and data[end] == '`':
+                    end += 1
+                if end == n and not final:
+                    # 反引号可能还没结束，连同结束标记留到下一片段
+                    self._fence.append(data[i:j])
+                    i = j
+                    break
+                self.dropped += sum(len(part) for part in self._fence) + end - i
+                self._fence = None
+                i = end
+                continue
+                
+            if self._link is not None:
+                opener, text, url = self._link
+                remaining = _MAX_LINK_TEXT - sum(len(part) for part in url)
+                j = data.find(')', i, i + remaining + 1)
+                if j < 0 and n - i <= remaining:
+                    url.append(data[i:])
+                    i = n
+                    break
+                self._link = None
+                if j >= 0:
+                    url.append(data[i:j])
+                if j >= 0 and any(url):
+                    # 链接保留文字，图片整体删除
+                    self._emit(out, text)
+                    self.dropped += len(opener) - len(text) + sum(len(part) for part in url) + 1
+                    i = j + 1
+                else:
+                    # 地址为空或过长，不是链接：方括号部分原样输出，从左括号起按普通文本重新处理
+                    self._emit(out, opener[:-1])
+                    data = opener[-1] + "".join(url) + data[i if j < 0 else j:]
+                    n = len(data)
+                    i = 0
+                continue
+                
+            if self._line_start:
+                drop = self._line_prefix(data, i, final)
+                if drop is None:
+                    break
+                # 引用符号之后可能还有列表等行首语法
+                if not (drop and data[i] == '>'):
+                    self._line_start = False
+                self.dropped += drop
+                i += drop
+                continue
+                
+            match = _STREAM_SPECIAL_RE.search(data, i)
+            if match is None:
+                self._emit(out, data[i:])
+                i = n
+                break
+            j = match.start()
+            if j > i:
+                self._emit(out, data[i:j])
+            next_i = self._special(data, j, final, out)
+            if next_i is None:
+                i = j
+                break
+            i = next_i
+            
+        if not final:
+            while self._spans and self._buffered() > _MAX_SPAN_TEXT:
+                self._release(0, out)
+        if i > 0:
+            self._prev_char = data[i - 1]
+        self._carry = data[i:]
+        return "".join(out)
+        
+    def _line_prefix(self, data: str, i: int, final: bool) -> Optional[int]:
+        """
+        行首语法（标题、引用、列表、分隔线）需要删除的字符数，
+        还需要更多字符才能判断时返回 None
+        """
+        n = len(data)
+        c = data[i]
+        
+        def more(end: int) -> bool:
+            return end == n and not final
+            
+        if c == '#' or c == '>':
+            match = (_HEADING_PREFIX_RE if c == '#' else _QUOTE_PREFIX_RE).match(data, i)
+            return None if more(match.end()) else match.end() - i
+            
+        if c in '*-+':
+            match = _BULLET_PREFIX_RE.match(data, i)
+            if match:
+                return None if more(match.end()) else match.end() - i
+            if more(i + 1):
+                return None
+                
+        if c in '-*_':
+            match = _RULE_HEAD_RE.match(data, i)
+            end = match.end()
+            if more(end):
+                return None
+            if len(match.group(1)) >= 3 and (end == n or data[end] == '\n'):
+                # 其后的空行一并删除，只保留最后一个换行（与 ^[-*_]{3,}\s*$ 一致）
+                k = end
+                while k < n and data[k] in ' \t\n':
+                    k += 1
+                if more(k):
+                    return None
+                return k - i if k == n else data.rfind('\n', end, k) - i
+            return 0
+            
+        if c.isdigit():
+            match = _ORDERED_PREFIX_RE.match(data, i)
+            if match:
+                return None if more(match.end()) else match.end() - i
+            if more(_ORDERED_HEAD_RE.match(data, i).end()):
+                return None
+                
+        return 0
+        
+    def _special(self, data: str, j: int, final: bool, out: List[str]) -> Optional[int]:
+        """处理位置 j 的特殊字符，返回下一个位置；需要更多字符才能判断时返回 None"""
+        n = len(data)
+        c = data[j]
+        
+        if c == '\n':
+            # 强调不跨行：未闭合的强调符号原样输出
+            for index in range(len(self._spans) - 1, -1, -1):
+                if self._spans[index].kind in '*_':
+                    self._release(index, out)
+            self._emit(out, c)
+            self._line_start = True
+            return j + 1
+            
+        if c == '`' and self._code_open:
+            # 行内代码的结束反引号（开始时已确认存在）
+            self._code_open = False
+            self.dropped += 1
+            return j + 1
+            
+        if c in '`*_':
+            end = j
+            while end < n and data[end] == c:
+                end += 1
+            run = data[j:end]
+            if end == n and not final:
+                return None
+            nxt = data[end] if end < n else ""
+            
+            if c == '`':
+                if len(run) >= 3:
+                    # ``` 开始代码块，收到结束标记后整块删除
+                    self._fence = [run]
+                    return end
+                # 单个反引号：有配对时是行内代码，删除两侧的反引号，内容按普通文本继续处理
+                close = self._inline_code_end(data, j, final) if len(run) == 1 else -1
+                if close is None:
+                    return None
+                if close < 0:
+                    self._emit(out, run)
+                    return end
+                self._code_open = True
+                self.dropped += 1
+                return end
+                
+            index = self._find_span(c, run)
+            prev = data[j - 1] if j > 0 else self._prev_char
+            if c == '*':
+                closes = index >= 0
+                # 乘号等普通星号：后面紧跟空白，或夹在英文字母、数字之间（如 3*4）
+                opens = not closes and nxt and not nxt.isspace() and not (_ascii_alnum(prev) and _ascii_alnum(nxt))
+            else:
+                # 词内下划线（如变量名）原样输出
+                closes = index >= 0 and not nxt.isalnum()
+                opens = not closes and not prev.isalnum() and nxt and not nxt.isspace()
+            if closes:
+                self._emit(out, self._close(index, out))
+                self.dropped += 2 * len(run)
+            elif opens:
+                self._spans.append(_OpenSpan(c, run))
+            else:
+                self._emit(out, run)
+            return end
+            
+        if c == '[' or c == '!':
+            # 只有说明文字为空的图片整体删除，其余的 ! 原样输出，其后的 [文字](地址) 按链接处理
+            start = j + 1 if c == '!' else j
+            if c == '!' and data[j + 1:j + 3] != '[]':
+                if not final and n - j < 3 and '![]'.startswith(data[j:]):
+                    return None
+                self._emit(out, c)
+                return j + 1
+            close = self._link_text_end(data, start, final, allow_empty=c == '!')
+            if close is None:
+                return None
+            if close < 0:
+                self._emit(out, c)
+                return j + 1
+            # 收到地址的右括号后才输出链接文字
+            self._link = (data[j:close + 2], data[start + 1:close], [])
+            return close + 2
+            
+        if c in '(（':
+            # 括号不嵌套，括号内的左括号原样输出
+            if self._find_span('(') >= 0:
+                self._emit(out, c)
+            else:
+                self._spans.append(_OpenSpan('(', c))
+            return j + 1
+            
+        # 右括号：与左括号配对且括号内有文字时两侧转为逗号，否则原样保留
+        index = self._find_span('(')
+        if index < 0:
+            self._emit(out, c)
+            return j + 1
+        opener = self._spans[index].opener
+        text = self._close(index, out)
+        self._emit(out, '，' + text + '，' if text else opener + c)
+        return j + 1
+        
+    def _inline_code_end(self, data: str, j: int, final: bool) -> Optional[int]:
+        """
+        data[j] 为单个反引号，返回行内代码结束的反引号位置，
+        不是行内代码时返回 -1，需要更多字符才能判断时返回 None
+        """
+        n = len(data)
+        k = data.find('`', j + 2, j + 2 + _MAX_SPAN_TEXT)
+        if k < 0:
+            return -1 if final or n >= j + 2 + _MAX_SPAN_TEXT else None
+        end = k
+        while end < n and data[end] == '`':
+            end += 1
+        if end == n and not final:
+            return None
+        # 后面是 ``` 时属于代码块
+        return k if end - k < 3 else -1
+        
+    def _link_text_end(self, data: str, start: int, final: bool, allow_empty: bool) -> Optional[int]:
+        """
+        data[start] 为 '['，返回链接文字结束的 ']' 位置（其后紧跟 '('），
+        不是链接时返回 -1，需要更多字符才能判断时返回 None；allow_empty 时文字可以为空（图片）
+        """
+        n = len(data)
+        limit = min(n, start + 1 + _MAX_LINK_TEXT)
+        for k in range(start + 1, limit):
+            ch = data[k]
+            if ch == '\n' or ch == '[':
+                return -1
+            if ch == ']':
+                if k + 1 == n:
+                    return -1 if final else None
+                return k if data[k + 1] == '(' and (allow_empty or k > start + 1) else -1
+        if limit == n and not final:
+            return None
+        return -1
@@ -1,8 +1,17 @@
 /**
  * WebSocket 连接管理器
  * 处理与后端的实时通信
+ * 
+ * 握手时请求 pcm.v1 子协议，协商成功后音频以二进制帧收发：
+ * 8 字节小端头（流 ID uint16、保留 uint16、序号 uint32）+ 16bit PCM，控制消息仍为 JSON。
+ * 浏览器支持 WebCodecs 时优先请求 opus.v1，帧头不变，帧体为一个 Opus 包（见 opusCodec.js）
  */
 
+import { OPUS_SUBPROTOCOL, OpusCodec, opusSupported } from './opusCodec'
+
+export const BINARY_SUBPROTOCOL = 'pcm.v1'
+const AUDIO_FRAME_HEADER_BYTES = 8
+
 export class WebSocketManager {
   constructor(options = {}) {
     this.url = options.url || `ws://${window.location.hostname}:8000/ws/voice-chat`
@@ -13,6 +22,10 @@ export class WebSocketManager {
     this.reconnectAttempts = 0
     this.isConnected = false
     this.sessionId = null
+    this.binaryAudio = false
+    this.opus = null
+    this.inputStreamId = 0
+    this.inputSequence = 0
     
     // 事件回调
     this.onConnect = options.onConnect || null
@@ -30,10 +43,14 @@ export class WebSocketManager {
   connect() {
     return new Promise((resolve, reject) => {
       try {
-        this.ws = new WebSocket(this.url)
+        const protocols = opusSupported() ? [OPUS_SUBPROTOCOL, BINARY_SUBPROTOCOL] : [BINARY_SUBPROTOCOL]
+        this.ws = new WebSocket(this.url, protocols)
+        this.ws.binaryType = 'arraybuffer'
         
         this.ws.onopen = () => {
-          console.log('WebSocket connected')
+          this.binaryAudio = this.ws.protocol === BINARY_SUBPROTOCOL || this.ws.protocol === OPUS_SUBPROTOCOL
+          this.setupOpus(this.ws.protocol === OPUS_SUBPROTOCOL)
+          console.log('WebSocket connected', this.binaryAudio ? `(${this.ws.protocol})` : '')
           this.isConnected = true
           this.reconnectAttempts = 0
           
@@ -70,8 +87,16 @@ export class WebSocketManager {
         }
         
         this.ws.onmessage = (event) => {
+          if (event.data instanceof ArrayBuffer) {
+            this.handleAudioFrame(event.data)
+            return
+          }
           try {
             const message = JSON.parse(event.data)
+            if (message.type === 'audio.delta' && message.data) {
+              // JSON 音频统一转换为 Uint8Array，与二进制帧的处理方式一致
+              message.audio = this.base64ToArrayBuffer(message.data)
+            }
             this.handleMessage(message)
           } catch (error) {
             console.error('Failed to parse message:', error)
@@ -146,6 +171,19 @@ export class WebSocketManager {
    * @param {Uint8Array} audioData - PCM 音频数据
    */
   sendAudio(audioData) {
+    if (this.binaryAudio) {
+      if (!this.isConnected || !this.ws) {
+        console.error('WebSocket not connected')
+        return false
+      }
+      if (this.opus) {
+        this.opus.encode(audioData)
+        return true
+      }
+      this.ws.send(this.packAudioFrame(audioData))
+      return true
+    }
+    
     // 转换为 Base64
     const base64 = this.arrayBufferToBase64(audioData)
     return this.send({
@@ -155,12 +193,79 @@ export class WebSocketManager {
   }
   
   /**
-   * 结束音频输入
+   * 结束音频输入，下一段录音使用新的流 ID
    */
-  endAudio() {
-    return this.send({
+  async endAudio() {
+    if (this.opus) {
+      // 编码器中剩余的尾部先发出，再通知结束
+      await this.opus.flushEncoder()
+    }
+    const sent = this.send({
       type: 'audio.end'
     })
+    this.inputStreamId = (this.inputStreamId + 1) & 0xffff
+    this.inputSequence = 0
+    return sent
+  }
+  
+  /**
+   * 处理二进制音频帧，以 audio.delta 消息分发
+   */
+  handleAudioFrame(buffer) {
+    if (buffer.byteLength < AUDIO_FRAME_HEADER_BYTES) {
+      console.warn('Dropped malformed audio frame')
+      return
+    }
+    const header = new DataView(buffer, 0, AUDIO_FRAME_HEADER_BYTES)
+    const meta = {
+      streamId: header.getUint16(0, true),
+      sequence: header.getUint32(4, true)
+    }
+    if (this.opus) {
+      // 解码完成后再分发
+      this.opus.decode(new Uint8Array(buffer, AUDIO_FRAME_HEADER_BYTES), meta)
+      return
+    }
+    this.handleMessage({
+      type: 'audio.delta',
+      ...meta,
+      audio: new Uint8Array(buffer, AUDIO_FRAME_HEADER_BYTES)
+    })
+  }
+  
+  /**
+   * 按握手结果创建或释放 Opus 编解码器
+   */
+  setupOpus(enabled) {
+    if (this.opus) {
+      this.opus.close()
+      this.opus = null
+    }
+    if (!enabled) return
+    this.opus = new OpusCodec({
+      inputSampleRate: 16000,
+      outputSampleRate: 24000,
+      onPacket: (packet) => {
+        if (this.isConnected && this.ws) {
+          this.ws.send(this.packAudioFrame(packet))
+        }
+      },
+      onPcm: (pcm, meta) => this.handleMessage({ type: 'audio.delta', ...meta, audio: new Uint8Array(pcm) })
+    })
+  }
+  
+  /**
+   * 打包上行音频帧
+   * @param {Uint8Array} audioData - PCM 音频数据或 Opus 包
+   */
+  packAudioFrame(audioData) {
+    const frame = new Uint8Array(AUDIO_FRAME_HEADER_BYTES + audioData.byteLength)
+    const header = new DataView(frame.buffer, 0, AUDIO_FRAME_HEADER_BYTES)
+    header.setUint16(0, this.inputStreamId, true)
+    header.setUint32(4, this.inputSequence, true)
+    this.inputSequence = (this.inputSequence + 1) >>> 0
+    frame.set(audioData, AUDIO_FRAME_HEADER_BYTES)
+    return frame.buffer
   }
   
   /**
@@ -192,6 +297,7 @@ export class WebSocketManager {
       this.ws.close()
       this.ws = null
     }
+    this.setupOpus(false)
     
     this.isConnected = false
     this.sessionId = null